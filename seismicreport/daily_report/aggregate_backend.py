@@ -0,0 +1,203 @@
+''' module to aggregate day, week, month and project totals in the database
+'''
+from datetime import timedelta
+import numpy as np
+from django.db.models import Q, Sum, Count, Avg
+from daily_report.models.daily_models import (
+    SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather,
+)
+from seismicreport.vars import (
+    WEEKDAYS, source_prod_schema, receiver_prod_schema, time_breakdown_schema,
+    hse_weather_schema, ops_time_keys, standby_keys, downtime_keys,
+)
+
+PERIODS = ['day', 'week', 'month', 'proj']
+
+
+def get_period_filters(production_date, prefix='daily__'):
+    ''' returns a dict with a Q filter for each period (day, week, month and proj)
+        ending on the production_date. prefix is the lookup path to the Daily model
+    '''
+    date_key = f'{prefix}production_date'
+    week_start = production_date - timedelta(days=WEEKDAYS-1)
+    month_start = production_date.replace(day=1)
+    return {
+        'day': Q(**{date_key: production_date}),
+        'week': Q(**{f'{date_key}__range': (week_start, production_date)}),
+        'month': Q(**{f'{date_key}__range': (month_start, production_date)}),
+        'proj': Q(**{f'{date_key}__lte': production_date}),
+    }
+
+
+def get_filter_aggregates(fields, period_filters):
+    ''' returns the conditional aggregates for the fields for the period filters,
+        including a row count per period to distinguish an empty period from a zero
+        total
+    '''
+    aggregates = {}
+    for period, period_filter in period_filters.items():
+        aggregates[f'{period}_count'] = Count('id', filter=period_filter)
+        for key in fields:
+            aggregates[f'{period}_{key}'] = Sum(key, filter=period_filter)
+
+    return aggregates
+
+
+def get_period_aggregates(fields, production_date, prefix='daily__'):
+    ''' returns the conditional aggregates for the fields for all periods ending on
+        the production_date
+    '''
+    return get_filter_aggregates(
+        fields, get_period_filters(production_date, prefix=prefix))
+
+
+class Mixin:
+
+    @staticmethod
+    def aggregate_prod_totals(daily, sourcetypes, rows=None):
+        ''' calculates the day, week, month and project production totals for all
+            sourcetypes in a single query, unless the period totals by sourcetype id
+            are given in rows
+            returns: dict with the production totals by sourcetype name
+        '''
+        prod_by_id = rows if rows is not None else {}
+        if rows is None and daily:
+            prod_query = SourceProduction.objects.filter(
+                sourcetype__in=sourcetypes,
+                daily__production_date__lte=daily.production_date,
+            ).values('sourcetype').order_by('sourcetype').annotate(
+                **get_period_aggregates(source_prod_schema, daily.production_date)
+            )
+            prod_by_id = {row['sourcetype']: row for row in prod_query}
+
+        prod_total_by_type = {}
+        for stype in sourcetypes:
+            row = prod_by_id.get(stype.id, {})
+            prod_total = {}
+            for period in PERIODS:
+                if not row.get(f'{period}_count'):
+                    prod_total.update({
+                        f'{period}_{key[:5]}': np.nan for key in source_prod_schema})
+                    prod_total[f'{period}_total'] = np.nan
+                    continue
+
+                prod_total.update({
+                    f'{period}_{key[:5]}': np.nan_to_num(row[f'{period}_{key}'])
+                    for key in source_prod_schema
+                })
+                # exclude last key for skips
+                prod_total[f'{period}_total'] = np.sum([
+                    prod_total[f'{period}_{key[:5]}'] for key in source_prod_schema[:-1]
+                ])
+
+            prod_total_by_type[stype.sourcetype_name] = prod_total
+
+        return prod_total_by_type
+
+    @staticmethod
+    def aggregate_time_totals(daily, row=None):
+        ''' calculates the day, week, month and project time breakdown totals in a
+            single query, unless the period totals are given in row
+        '''
+        if row is None and daily:
+            row = TimeBreakdown.objects.filter(
+                daily__project=daily.project,
+                daily__production_date__lte=daily.production_date,
+            ).aggregate(
+                **get_period_aggregates(time_breakdown_schema, daily.production_date)
+            )
+
+        row = row or {}
+        times_total = {}
+        for period in PERIODS:
+            if not row.get(f'{period}_count'):
+                times_total.update(
+                    {f'{period}_{key}': np.nan for key in time_breakdown_schema})
+                times_total[f'{period}_rec_time'] = np.nan
+                times_total[f'{period}_ops_time'] = np.nan
+                times_total[f'{period}_standby'] = np.nan
+                times_total[f'{period}_downtime'] = np.nan
+                times_total[f'{period}_total_time'] = np.nan
+                continue
+
+            tt = {f'{period}_{key}': np.nan_to_num(row[f'{period}_{key}'])
+                  for key in time_breakdown_schema}
+            tt[f'{period}_rec_time'] = tt[f'{period}_rec_hours']
+            tt[f'{period}_ops_time'] = np.nansum(
+                [tt[f'{period}_{key}'] for key in ops_time_keys])
+            tt[f'{period}_standby'] = np.nansum(
+                [tt[f'{period}_{key}'] for key in standby_keys])
+            tt[f'{period}_downtime'] = np.nansum(
+                [tt[f'{period}_{key}'] for key in downtime_keys])
+            tt[f'{period}_total_time'] = np.nansum([
+                tt[f'{period}_ops_time'], tt[f'{period}_standby'],
+                tt[f'{period}_downtime'],
+            ])
+            times_total.update(tt)
+
+        return times_total
+
+    @staticmethod
+    def aggregate_receiver_totals(daily, receivertype, row=None):
+        ''' calculates the day, week, month and project receiver totals in a single
+            query, unless the period totals are given in row. Field qc is averaged
+            over the days with a non zero value.
+        '''
+        sum_keys = [key for key in receiver_prod_schema if key != 'qc_field']
+        if row is None and daily and receivertype:
+            aggregates = get_period_aggregates(sum_keys, daily.production_date)
+            period_filters = get_period_filters(daily.production_date)
+            aggregates['day_qc_field'] = Sum('qc_field', filter=period_filters['day'])
+            for period in PERIODS[1:]:
+                aggregates[f'{period}_qc_field'] = Avg(
+                    'qc_field', filter=period_filters[period] & ~Q(qc_field=0))
+
+            row = ReceiverProduction.objects.filter(
+                receivertype=receivertype,
+                daily__production_date__lte=daily.production_date,
+            ).aggregate(**aggregates)
+
+        row = row or {}
+        rcvr_total = {}
+        for period in PERIODS:
+            if not row.get(f'{period}_count'):
+                rcvr_total.update({f'{period}_{key}': 0 for key in receiver_prod_schema})
+                continue
+
+            rcvr_total.update({f'{period}_{key}': np.nan_to_num(row[f'{period}_{key}'])
+                               for key in sum_keys})
+            qc_field = row[f'{period}_qc_field']
+            if period == 'day':
+                rcvr_total['day_qc_field'] = np.nan_to_num(qc_field)
+
+            else:
+                rcvr_total[f'{period}_qc_field'] = (
+                    qc_field if qc_field is not None else np.nan)
+
+        return rcvr_total
+
+    @staticmethod
+    def aggregate_hse_totals(daily, row=None):
+        ''' calculates the week, month and project hse totals in a single query,
+            unless the period totals are given in row. The day values are taken from
+            the day record as these include the weather and toolboxes.
+        '''
+        if row is None and daily:
+            row = HseWeather.objects.filter(
+                daily__project=daily.project,
+                daily__production_date__lte=daily.production_date,
+            ).aggregate(
+                **get_period_aggregates(hse_weather_schema[:12], daily.production_date)
+            )
+
+        row = row or {}
+        hse_total = {}
+        for period in PERIODS[1:]:
+            if not row.get(f'{period}_count'):
+                hse_total.update({f'{period}_{key}': '' for key in hse_weather_schema})
+                continue
+
+            hse_total.update({f'{period}_{key}': np.nan_to_num(row[f'{period}_{key}'])
+                              for key in hse_weather_schema[:12]})
+
+        return hse_total
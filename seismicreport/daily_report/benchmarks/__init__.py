@@ -0,0 +1,8 @@
+''' benchmarks for the daily_report backends, the benchmarks run as django tests
+    on a synthetic project, for example:
+        python manage.py test daily_report.benchmarks.bench_weekly
+    the suite of the whole report pipeline runs as a management command and writes
+    the results as json, to compare them between commits:
+        python manage.py run_benchmarks --output before.json
+        python manage.py run_benchmarks --compare before.json
+'''
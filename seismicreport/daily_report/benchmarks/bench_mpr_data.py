@@ -0,0 +1,31 @@
+''' benchmark of the mpr data from a single query in one DataFrame, on a synthetic
+    project of two years. The number of queries does not grow with the length of the
+    project, the timings are reported by the benchmark suite.
+'''
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from daily_report.models.daily_models import Daily
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.suite import measure
+from daily_report.benchmarks.generate import generate_project
+
+PROJECT_DAYS = 730
+
+
+def measure_mpr_data(production_date):
+    ''' returns: result of measure for calc_mpr_data without the cached totals
+    '''
+    day = Daily.objects.select_related('project').get(production_date=production_date)
+    return measure(lambda: ReportInterface('').calc_mpr_data(day), 1, cache.clear)
+
+
+class MprDataBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(days=PROJECT_DAYS, start_date=date(2020, 1, 1))
+
+    def test_calc_mpr_data(self):
+        self.assertEqual(
+            measure_mpr_data(date(2020, 2, 1))['queries'],
+            measure_mpr_data(date(2021, 12, 30))['queries'])
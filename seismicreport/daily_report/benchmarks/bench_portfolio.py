@@ -0,0 +1,35 @@
+''' benchmark of the portfolio aggregated for all projects with queries grouped by
+    project against calc_totals for the latest report of each project, on synthetic
+    projects of a crew each
+'''
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.suite import measure
+from daily_report.benchmarks.generate import generate_project
+
+PROJECTS = 12
+PROJECT_DAYS = 120
+
+
+def legacy_portfolio():
+    ''' calc_totals for the latest report of each project
+    '''
+    r_iface = ReportInterface('')
+    return [r_iface.calc_totals(day) for day in r_iface.get_latest_reports()]
+
+
+class PortfolioBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(PROJECTS):
+            generate_project(
+                project_name=f'crew {i}', days=PROJECT_DAYS - i,
+                start_date=date(2021, 1, 1), seed=i)
+
+    def test_calc_portfolio(self):
+        # without the cached totals, the timings are reported by the benchmark suite
+        legacy = measure(legacy_portfolio, 1, cache.clear)
+        result = measure(ReportInterface('').calc_portfolio, 1, cache.clear)
+        self.assertLess(result['queries'], legacy['queries'])
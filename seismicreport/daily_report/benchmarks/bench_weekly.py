@@ -0,0 +1,31 @@
+''' benchmark of the weekly collation in one pass over a six week window, on a
+    synthetic project of one year. The number of queries does not grow with the
+    length of the project, the timings are reported by the benchmark suite.
+'''
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from daily_report.models.daily_models import Daily
+from daily_report.week_backend import WeekInterface
+from daily_report.benchmarks.suite import measure
+from daily_report.benchmarks.generate import generate_project
+
+PROJECT_DAYS = 365
+
+
+def measure_weekdata(production_date):
+    ''' returns: result of measure for collate_weekdata
+    '''
+    day = Daily.objects.select_related('project').get(production_date=production_date)
+    return measure(lambda: WeekInterface('').collate_weekdata(day), 1, cache.clear)
+
+
+class WeeklyBenchmark(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(days=PROJECT_DAYS, start_date=date(2021, 1, 1))
+
+    def test_collate_weekdata(self):
+        self.assertEqual(
+            measure_weekdata(date(2021, 2, 15))['queries'],
+            measure_weekdata(date(2021, 12, 31))['queries'])
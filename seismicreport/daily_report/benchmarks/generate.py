@@ -0,0 +1,195 @@
+''' generator of synthetic projects and daily report workbooks for the tests and
+    benchmarks, the daily reports are created directly through the models with bulk
+    queries, so a project of several years takes seconds to create. The values are
+    drawn from a seeded random generator, so the same settings give the same project.
+'''
+import random
+from datetime import date, datetime, timedelta
+from openpyxl import Workbook
+from django.core.cache import cache
+from daily_report.models.project_models import (
+    Project, Block, SourceType, ReceiverType,
+)
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather, ToolBox,
+)
+from daily_report.models.service_models import Service, ServiceTask, TaskQuantity
+from daily_report.report_backend import ReportInterface
+from seismicreport.vars import BGP_DR_table, time_breakdown_schema
+
+# the BGP daily report has columns for three source types
+BGP_SOURCETYPES = ['a', 'b', 'c']
+TASKS_PER_SERVICE = 5
+
+
+def random_production(rnd):
+    return {
+        'sp_t1_flat': rnd.randint(0, 3000), 'sp_t2_rough': rnd.randint(0, 1500),
+        'sp_t3_facilities': rnd.randint(0, 200), 'sp_t4_dunes': rnd.randint(0, 800),
+        'sp_t5_sabkha': rnd.choice([0, rnd.randint(0, 400)]),
+        'skips': rnd.randint(0, 50),
+    }
+
+
+def random_receivers(rnd):
+    return {
+        'layout': rnd.randint(0, 5000), 'pickup': rnd.randint(0, 5000),
+        'node_download': rnd.randint(0, 5000), 'node_charged': rnd.randint(0, 5000),
+        'node_failure': rnd.randint(0, 20), 'node_repair': rnd.randint(0, 20),
+        'qc_field': rnd.choice([None, 0.0, round(rnd.uniform(0.5, 1.0), 3)]),
+    }
+
+
+def random_times(rnd):
+    times = {key: 0.0 for key in time_breakdown_schema}
+    times['rec_hours'] = round(rnd.uniform(14, 22), 2)
+    times['rec_moveup'] = round(rnd.uniform(0, 1), 2)
+    times['logistics'] = round(rnd.uniform(0, 1), 2)
+    times['company_suspension'] = rnd.choice([0.0, 2.5])
+    times['vibrator_fault'] = rnd.choice([0.0, 0.5])
+    return times
+
+
+def random_hse(rnd):
+    return {
+        'stop': rnd.randint(0, 12), 'fac': rnd.choice([0, 1]),
+        'incident_nm': rnd.choice([0, 1]), 'drills': rnd.choice([0, 1]),
+        'audits': rnd.choice([0, 1]), 'headcount': rnd.randint(200, 250),
+        'exposure_hours': rnd.randint(2000, 3000), 'weather_condition': 'sunny',
+        'rain': 'no', 'temp_min': 18.0, 'temp_max': 31.5,
+    }
+
+
+def generate_project(project_name='test', days=40, start_date=date(2021, 1, 20),
+                     sourcetypes=('vib_a', 'vib_b'), receivertypes=('node',),
+                     service_tasks=0, toolboxes=1, skip_days=(), seed=1,
+                     rebuild_totals=False):
+    ''' creates a project with a block, the source and receiver types by name and
+        service tasks, and a daily report with toolboxes for each of days, except
+        for the days in skip_days (day numbers counting from zero). With
+        rebuild_totals the cumulative totals and kpis are rebuilt as after an import,
+        otherwise the totals are aggregated from the rows.
+        returns: project
+    '''
+    rnd = random.Random(seed)
+    # ids are reused after the rollback of a test, do not take the cached totals of
+    # a project of an earlier test
+    cache.clear()
+    project = Project.objects.create(
+        project_prefix=project_name[:10], project_name=project_name,
+        crew_name='crew 1', planned_vp=1_000_000, planned_area=1000.0,
+        planned_start_date=start_date, start_report=start_date,
+        standby_rate=0.75, cap_rate=1.05, cap_app_ctm=1.10,
+    )
+    block = Block.objects.create(
+        project=project, block_name='block 1', block_planned_vp=500_000,
+        block_planned_area=500.0,
+    )
+    stypes = [
+        SourceType.objects.create(
+            project=project, sourcetype_name=name, sourcetype=name[:10],
+            mpr_vibes=12 + s, mpr_sweep_length=8, mpr_moveup=18, mpr_rec_hours=22.0)
+        for s, name in enumerate(sourcetypes)]
+    rtypes = [
+        ReceiverType.objects.create(
+            project=project, receivertype_name=name, receivertype='node')
+        for name in receivertypes]
+
+    day_numbers = [i for i in range(days) if i not in skip_days]
+    Daily.objects.bulk_create([
+        Daily(production_date=start_date + timedelta(days=i), project=project,
+              block=block)
+        for i in day_numbers])
+    dailies = list(Daily.objects.filter(project=project).order_by('production_date'))
+
+    # the values are drawn day by day, so a project is the start of a longer project
+    # with the same seed
+    source_prods, receiver_prods, time_breakdowns, hse_weathers = [], [], [], []
+    for day in dailies:
+        source_prods += [
+            SourceProduction(daily=day, sourcetype=stype, **random_production(rnd))
+            for stype in stypes]
+        receiver_prods += [
+            ReceiverProduction(daily=day, receivertype=rtype, **random_receivers(rnd))
+            for rtype in rtypes]
+        time_breakdowns.append(TimeBreakdown(daily=day, **random_times(rnd)))
+        hse_weathers.append(HseWeather(daily=day, **random_hse(rnd)))
+
+    SourceProduction.objects.bulk_create(source_prods)
+    ReceiverProduction.objects.bulk_create(receiver_prods)
+    TimeBreakdown.objects.bulk_create(time_breakdowns)
+    HseWeather.objects.bulk_create(hse_weathers)
+    ToolBox.objects.bulk_create([
+        ToolBox(hse=hse, toolbox=f'toolbox topic {t} of day {i}')
+        for i, hse in zip(day_numbers, HseWeather.objects.filter(
+            daily__project=project).order_by('daily__production_date'))
+        for t in range(toolboxes)])
+
+    tasks = []
+    for s in range(0, service_tasks, TASKS_PER_SERVICE):
+        service = Service.objects.create(
+            project=project, service_contract=f'contract {s // TASKS_PER_SERVICE}',
+            description='synthetic service')
+        tasks += [
+            ServiceTask.objects.create(
+                service=service, task_name=f'task {t}', task_unit='hours')
+            for t in range(min(TASKS_PER_SERVICE, service_tasks - s))]
+
+    TaskQuantity.objects.bulk_create([
+        TaskQuantity(task=task, date=day.production_date,
+                     quantity=rnd.randint(1, 40) / 4)
+        for task in tasks for day in dailies if rnd.random() < 0.5])
+
+    if rebuild_totals:
+        r_iface = ReportInterface('')
+        r_iface.update_cumulative_totals(project)
+        r_iface.rebuild_project_kpis(project)
+
+    return project
+
+
+def create_report_file(file_name, report_values):
+    ''' creates a daily report xlsx workbook with the values by keyword of
+        BGP_DR_table, as read by read_report_cells
+    '''
+    wb = Workbook()
+    ws = wb.active
+    for kw, value in report_values.items():
+        row, col = BGP_DR_table[kw]
+        ws.cell(row=row + 1, column=col + 1, value=value)
+
+    # make sure the sheet covers all fields in the table
+    ws.cell(row=50, column=16, value='end')
+    wb.save(file_name)
+
+
+def generate_bgp_workbook(file_name, project, production_date, seed=1):
+    ''' creates a BGP daily report workbook for project with random values, the
+        project can have at most three source types and one receiver type
+    '''
+    rnd = random.Random(seed)
+    report_values = {
+        'date': datetime.combine(production_date, datetime.min.time()),
+        'project': project.project_prefix,
+        'block': project.blocks.order_by('block_name').first().block_name,
+        'rec hours': round(rnd.uniform(14, 22), 2), 'rec moveup': 0.5,
+        'logistics': 1.0, 'vibrator fault': rnd.choice([0.0, 2.0]),
+        'layout': rnd.randint(0, 5000), 'pickup': rnd.randint(0, 5000),
+        'node failure': rnd.randint(0, 20), 'node qc': 0.95,
+        'comment 1': 'synthetic production', 'comment 3': 'windy',
+        'weather condition': 'sunny', 'rain': 'no', 'temp min': 19.0, 'temp max': 33.0,
+        'hse stop cards': rnd.randint(0, 12), 'hse drills': 1, 'headcount': 230,
+        'exposure hours': 2760,
+    }
+    for i in range(1, 9):
+        report_values[f'toolbox {i}'] = f'toolbox topic {i}'
+
+    stypes = project.sourcetypes.order_by('id')
+    for col, stype in zip(BGP_SOURCETYPES, stypes):
+        report_values[f'source_{col}'] = stype.sourcetype_name
+        report_values[f'sp_t1_{col}'] = rnd.randint(0, 3000)
+        report_values[f'sp_t2_{col}'] = rnd.randint(0, 1500)
+        report_values[f'sp_t4_{col}'] = rnd.randint(0, 800)
+        report_values[f'skips_{col}'] = rnd.randint(0, 50)
+
+    create_report_file(file_name, report_values)
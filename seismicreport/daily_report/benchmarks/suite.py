@@ -0,0 +1,211 @@
+''' benchmark suite of the report pipeline on a generated project. Each stage is run
+    cold, with the totals and graph caches cleared, and is measured for the number
+    of queries, the best wall clock time of the repeats and the peak memory of a
+    separate run traced by tracemalloc, so the tracing does not affect the timing.
+'''
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from daily_report.models.daily_models import Daily
+from daily_report.report_backend import ReportInterface
+from daily_report.week_backend import WeekInterface
+from daily_report.graph_backend import GRAPH_DIR
+from daily_report.excel_daily_backend import ExcelDayReport, collate_excel_dailyreport_data
+from daily_report.excel_weekly_backend import (
+    ExcelWeekReport, collate_excel_weekreport_data,
+)
+from daily_report.excel_mpr_backend import ExcelMprReport
+from daily_report.excel_services_backend import ExcelServiceReport
+from daily_report.report_reader import read_report_cells
+from daily_report.benchmarks.generate import (
+    generate_project, generate_bgp_workbook, BGP_SOURCETYPES,
+)
+
+DEFAULT_SETTINGS = {
+    'days': 730, 'sourcetypes': 2, 'receivertypes': 1, 'service_tasks': 10,
+    'toolboxes': 3, 'seed': 1, 'repeats': 3,
+}
+
+
+def clear_caches():
+    ''' clears the cached totals and the rendered graphs
+    '''
+    cache.clear()
+    shutil.rmtree(Path(settings.MEDIA_ROOT) / GRAPH_DIR, ignore_errors=True)
+
+
+def measure(func, repeats, setup=clear_caches):
+    ''' runs func repeats times and once more with tracemalloc, setup is run before
+        each run and not timed
+        returns: dict with the number of queries of a run, the best wall clock time
+                 in seconds and the peak memory in MB
+    '''
+    queries = []
+
+    def count_queries(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    wall_times = []
+    for _ in range(repeats):
+        setup()
+        queries.clear()
+        with connection.execute_wrapper(count_queries):
+            start = time.perf_counter()
+            func()
+            wall_times.append(time.perf_counter() - start)
+
+    setup()
+    tracemalloc.start()
+    try:
+        func()
+        _, peak_memory = tracemalloc.get_traced_memory()
+
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'queries': len(queries),
+        'wall_time': round(min(wall_times), 4),
+        'peak_memory_mb': round(peak_memory / 2**20, 2),
+    }
+
+
+def get_revision():
+    ''' returns: the git commit of the code, None if it is not known
+    '''
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            check=True, cwd=Path(__file__).parent).stdout.strip()
+
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(**suite_settings):
+    ''' generates a project with suite_settings and measures the stages of the
+        report pipeline for its last day. Must be run on an empty (test) database
+        with MEDIA_ROOT set to a scratch directory.
+        returns: dict with the revision, the settings and the results by stage
+    '''
+    suite_settings = {**DEFAULT_SETTINGS, **suite_settings}
+    repeats = suite_settings['repeats']
+    project = generate_project(
+        project_name='benchmark', days=suite_settings['days'],
+        start_date=date(2020, 1, 1),
+        sourcetypes=[f'vib_{s}' for s in range(suite_settings['sourcetypes'])],
+        receivertypes=[f'node_{r}' for r in range(suite_settings['receivertypes'])],
+        service_tasks=suite_settings['service_tasks'],
+        toolboxes=suite_settings['toolboxes'], seed=suite_settings['seed'],
+        rebuild_totals=True)
+    day = Daily.objects.filter(project=project).select_related('project').latest(
+        'production_date')
+    r_iface = ReportInterface(settings.MEDIA_ROOT)
+    w_iface = WeekInterface(settings.MEDIA_ROOT)
+
+    graph_reports = {}
+
+    def graphs_setup():
+        clear_caches()
+        # the graphs are rendered from the totals, which are not part of the timing,
+        # the weekly graphs need the week terrain of the weekly report
+        graph_reports['week'] = ExcelWeekReport(
+            collate_excel_weekreport_data(day), settings.MEDIA_ROOT,
+            settings.STATIC_ROOT)
+
+    def excel_daily():
+        report_data = collate_excel_dailyreport_data(day)
+        ExcelDayReport(
+            report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT,
+        ).create_dailyreport().close()
+
+    def excel_weekly():
+        report_data = collate_excel_weekreport_data(day)
+        ExcelWeekReport(
+            report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT,
+        ).create_weekreport().close()
+
+    stages = {
+        'calc_totals': (lambda: r_iface.calc_totals(day), clear_caches),
+        'collate_weekdata': (lambda: w_iface.collate_weekdata(day), clear_caches),
+        'calc_mpr_data': (lambda: r_iface.calc_mpr_data(day), clear_caches),
+        'calc_portfolio': (r_iface.calc_portfolio, clear_caches),
+        'create_daily_graphs': (
+            lambda: r_iface.create_daily_graphs(graph_reports['week'].report_totals),
+            graphs_setup),
+        'create_weekly_graphs': (
+            lambda: graph_reports['week'].create_weekly_graphs(
+                graph_reports['week'].report_totals),
+            graphs_setup),
+        'excel_daily_report': (excel_daily, clear_caches),
+        'excel_weekly_report': (excel_weekly, clear_caches),
+        'excel_mpr_report': (
+            lambda: ExcelMprReport(day).create_mprreport().close(), clear_caches),
+        'excel_services_report': (
+            lambda: ExcelServiceReport(day).create_servicereport(
+                day.production_date.year, day.production_date.month).close(),
+            clear_caches),
+    }
+    results = {
+        name: measure(func, repeats, setup) for name, (func, setup) in stages.items()}
+
+    # the bgp workbook has columns for three source types and one receiver type
+    if (suite_settings['sourcetypes'] <= len(BGP_SOURCETYPES)
+            and suite_settings['receivertypes'] == 1):
+        with tempfile.TemporaryDirectory() as report_dir:
+            report_file = str(Path(report_dir) / 'daily_report.xlsx')
+            generate_bgp_workbook(
+                report_file, project, day.production_date, seed=suite_settings['seed'])
+            results['read_report_cells'] = measure(
+                lambda: read_report_cells(report_file), repeats, lambda: None)
+
+            # each run populates a new day after the last day of the project
+            production_dates = iter(
+                day.production_date + timedelta(days=i + 1) for i in range(repeats + 1))
+
+            def populate_setup():
+                clear_caches()
+                generate_bgp_workbook(
+                    report_file, project, next(production_dates),
+                    seed=suite_settings['seed'])
+
+            results['populate_report'] = measure(
+                lambda: r_iface.populate_report(project, report_file), repeats,
+                populate_setup)
+
+    return {
+        'revision': get_revision(),
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'database': connection.vendor,
+        'settings': suite_settings,
+        'results': results,
+    }
+
+
+def compare_results(previous, current):
+    ''' returns: list of lines with the ratio of the current to the previous wall
+                 time, queries and peak memory of each stage
+    '''
+    lines = [
+        f'{"stage":24} {"wall time":>10} {"queries":>10} {"memory":>10}'
+        f'   {previous.get("revision")} -> {current.get("revision")}']
+    for stage, result in current['results'].items():
+        before = previous['results'].get(stage)
+        if not before:
+            lines.append(f'{stage:24} {"new":>10}')
+            continue
+
+        ratios = [
+            result[key] / before[key] if before[key] else float('nan')
+            for key in ['wall_time', 'queries', 'peak_memory_mb']]
+        lines.append(f'{stage:24} ' + ' '.join(f'{ratio:>9.2f}x' for ratio in ratios))
+
+    return lines
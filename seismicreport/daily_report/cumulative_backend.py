@@ -0,0 +1,221 @@
+''' module to maintain the cumulative totals (CumulativeTotals) of a project. The
+    totals of a period are the difference between the cumulative totals at the
+    production date and the cumulative totals before the start of the period
+'''
+from copy import deepcopy
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Q, Subquery
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather,
+    CumulativeTotals,
+)
+from seismicreport.vars import (
+    WEEKDAYS, source_prod_schema, receiver_prod_schema, time_breakdown_schema,
+    hse_weather_schema,
+)
+from seismicreport.utils.plogger import Logger, timed
+
+logger = Logger.getlogger()
+rcvr_sum_keys = [key for key in receiver_prod_schema if key != 'qc_field']
+
+
+def add_values(totals, values):
+    ''' adds values to totals, where None and nan are taken as zero
+    '''
+    for key, val in values.items():
+        if val is None or val != val:
+            val = 0
+
+        totals[key] = totals.get(key, 0) + val
+
+
+def get_day_values(project, from_date):
+    ''' gets the values of each day of the project from from_date onwards
+        returns: dict by daily id with the values by section
+    '''
+    date_filter = Q(daily__project=project)
+    if from_date:
+        date_filter &= Q(daily__production_date__gte=from_date)
+
+    day_values = {}
+
+    def get_section(daily_id, section):
+        return day_values.setdefault(
+            daily_id, {'source': {}, 'receiver': {}, 'time': {}, 'hse': {}}
+        )[section]
+
+    for row in SourceProduction.objects.filter(date_filter).values(
+            'daily_id', 'sourcetype_id', *source_prod_schema):
+        values = {key: row[key] for key in source_prod_schema}
+        values['count'] = 1
+        get_section(row['daily_id'], 'source')[str(row['sourcetype_id'])] = values
+
+    for row in ReceiverProduction.objects.filter(date_filter).values(
+            'daily_id', 'receivertype_id', *receiver_prod_schema):
+        values = {key: row[key] for key in rcvr_sum_keys}
+        values['count'] = 1
+        # qc field is averaged over days with a value other than zero
+        values['qc_sum'] = row['qc_field']
+        values['qc_values'] = 0 if row['qc_field'] is None else 1
+        values['qc_count'] = 1 if row['qc_field'] else 0
+        get_section(row['daily_id'], 'receiver')[str(row['receivertype_id'])] = values
+
+    for row in TimeBreakdown.objects.filter(date_filter).values(
+            'daily_id', *time_breakdown_schema):
+        values = {key: row[key] for key in time_breakdown_schema}
+        values['count'] = 1
+        get_section(row['daily_id'], 'time').update(values)
+
+    for row in HseWeather.objects.filter(date_filter).values(
+            'daily_id', *hse_weather_schema[:12]):
+        values = {key: row[key] for key in hse_weather_schema[:12]}
+        values['count'] = 1
+        get_section(row['daily_id'], 'hse').update(values)
+
+    return day_values
+
+
+def get_period_row(period, end_totals, base_totals, keys):
+    ''' returns the totals for the period as the difference of the cumulative totals
+        in the same format as the database aggregates of aggregate_backend
+    '''
+    row = {f'{period}_count': end_totals.get('count', 0) - base_totals.get('count', 0)}
+    for key in keys:
+        row[f'{period}_{key}'] = end_totals.get(key, 0) - base_totals.get(key, 0)
+
+    return row
+
+
+def get_receiver_period_row(period, end_totals, base_totals):
+    row = get_period_row(period, end_totals, base_totals, rcvr_sum_keys)
+    qc_sum = end_totals.get('qc_sum', 0) - base_totals.get('qc_sum', 0)
+    qc_count = end_totals.get('qc_count', 0) - base_totals.get('qc_count', 0)
+    if period == 'day':
+        qc_values = end_totals.get('qc_values', 0) - base_totals.get('qc_values', 0)
+        row['day_qc_field'] = qc_sum if qc_values > 0 else None
+
+    else:
+        row[f'{period}_qc_field'] = qc_sum / qc_count if qc_count > 0 else None
+
+    return row
+
+
+class Mixin:
+
+    @staticmethod
+    @timed(logger, print_log=True)
+    def update_cumulative_totals(project, from_date=None):
+        ''' (re)calculates the cumulative totals of project from from_date onwards,
+            or for all days if from_date is None
+        '''
+        base = None
+        if from_date:
+            base = CumulativeTotals.objects.filter(
+                project=project, production_date__lt=from_date,
+            ).order_by('-production_date').first()
+            # earlier cumulative totals are missing, recalculate all days
+            if not base and Daily.objects.filter(
+                    project=project, production_date__lt=from_date).exists():
+                from_date = None
+
+        date_filter = Q(project=project)
+        if from_date:
+            date_filter &= Q(production_date__gte=from_date)
+
+        totals = deepcopy(base.totals) if base else {}
+        day_values = get_day_values(project, from_date)
+        cumulative_totals = []
+        for daily_id, production_date in Daily.objects.filter(date_filter).order_by(
+                'production_date').values_list('id', 'production_date'):
+            for section, values in day_values.get(daily_id, {}).items():
+                section_totals = totals.setdefault(section, {})
+                if section in ['source', 'receiver']:
+                    for type_id, type_values in values.items():
+                        add_values(section_totals.setdefault(type_id, {}), type_values)
+
+                else:
+                    add_values(section_totals, values)
+
+            cumulative_totals.append(CumulativeTotals(
+                daily_id=daily_id, project=project, production_date=production_date,
+                totals=deepcopy(totals),
+            ))
+
+        with transaction.atomic():
+            CumulativeTotals.objects.filter(date_filter).delete()
+            CumulativeTotals.objects.bulk_create(cumulative_totals)
+
+    @staticmethod
+    def get_cumulative_rows(daily):
+        ''' gets the day, week, month and project totals from the cumulative totals
+            in a single query.
+            returns: dict by section with the period totals in the format of the
+                     database aggregates, sections source and receiver are by type
+                     id. None if the cumulative totals are not available
+        '''
+        production_date = daily.production_date
+        period_starts = {
+            'day': production_date,
+            'week': production_date - timedelta(days=WEEKDAYS-1),
+            'month': production_date.replace(day=1),
+        }
+        project_totals = CumulativeTotals.objects.filter(project=daily.project)
+        date_filter = Q(production_date=production_date)
+        for start_date in period_starts.values():
+            date_filter |= Q(production_date=Subquery(
+                project_totals.filter(production_date__lt=start_date).order_by(
+                    '-production_date').values('production_date')[:1]
+            ))
+
+        totals_by_date = {
+            row.production_date: row.totals for row in project_totals.filter(date_filter)
+        }
+        end_totals = totals_by_date.pop(production_date, None)
+        if end_totals is None:
+            return None
+
+        # the base for a period are the last cumulative totals before its start
+        base_totals = {'proj': {}}
+        for period, start_date in period_starts.items():
+            base_dates = [key for key in totals_by_date if key < start_date]
+            base_totals[period] = totals_by_date[max(base_dates)] if base_dates else {}
+
+        rows = {
+            'source': {}, 'receiver': {}, 'time': {}, 'hse': {},
+        }
+        for period, base in base_totals.items():
+            for type_id, type_totals in end_totals.get('source', {}).items():
+                rows['source'].setdefault(int(type_id), {}).update(get_period_row(
+                    period, type_totals, base.get('source', {}).get(type_id, {}),
+                    source_prod_schema,
+                ))
+
+            for type_id, type_totals in end_totals.get('receiver', {}).items():
+                rows['receiver'].setdefault(int(type_id), {}).update(
+                    get_receiver_period_row(
+                        period, type_totals, base.get('receiver', {}).get(type_id, {})
+                    ))
+
+            rows['time'].update(get_period_row(
+                period, end_totals.get('time', {}), base.get('time', {}),
+                time_breakdown_schema,
+            ))
+            rows['hse'].update(get_period_row(
+                period, end_totals.get('hse', {}), base.get('hse', {}),
+                hse_weather_schema[:12],
+            ))
+
+        return rows
+
+
+@receiver(post_delete, sender=Daily)
+def repair_cumulative_totals(sender, instance, **kwargs):
+    ''' the cumulative totals after a deleted daily must be recalculated
+    '''
+    if CumulativeTotals.objects.filter(
+            project_id=instance.project_id,
+            production_date__gt=instance.production_date).exists():
+        Mixin.update_cumulative_totals(instance.project, instance.production_date)
@@ -1,11 +1,12 @@
 ''' module to generate excel version of daily report
 '''
 from pathlib import Path
+from django.conf import settings
 from openpyxl import Workbook, drawing
-from openpyxl.styles import Border, Side, Alignment, Font
 from daily_report.report_backend import ReportInterface
 from seismicreport.utils.utils_excel import (
-    conditional_format, set_vertical_cells, set_outer_border, save_excel
+    register_styles, set_row, set_column, format_range, set_outer_border_range,
+    get_border, conditional_format, set_column_widths, save_excel,
 )
 from seismicreport.vars import (
     AVG_PERIOD, NO_DATE_STR, SS_2, IMG_SIZE, STOP_TARGET, PROD_TARGET, REC_TARGET
@@ -19,6 +20,7 @@ class ExcelDayReport:
         self.media_root = Path(media_root)
         self.static_root = Path(static_root)
         self.wb = Workbook()
+        register_styles(self.wb)
         self.ws = self.wb.active
         self.ws.sheet_view.showGridLines = False
         self.parse_data(report_data)
@@ -33,208 +35,132 @@ class ExcelDayReport:
         self.block_stats_table = report_data['block_stats_table']
         self.hse_stats_table = report_data['hse_stats_table']
         self.csr_comment_table = report_data['csr_comment_table']
+        self.graph_files = report_data['graph_files']
 
     def create_dailyreport(self):
         ''' method to create excel daily report
         '''
-        fontname = 'Tahoma'
         red = '00FF0000'
         orange = 'FFA500'
         green = '0000FF00'
-        font_large_bold = Font(name=fontname, bold=True, size=11)
-        font_normal = Font(name=fontname, size=9)
-        font_bold = Font(name=fontname, bold=True, size=9)
-
-        self.ws.column_dimensions['A'].width = 0.94
-        self.ws.column_dimensions['B'].width = 0.75
-        self.ws.column_dimensions['C'].width = 11.78
-        self.ws.column_dimensions['D'].width = 10.89
-        self.ws.column_dimensions['E'].width = 20.89
-        self.ws.column_dimensions['F'].width = 0.56
-        self.ws.column_dimensions['G'].width = 0.75
-        self.ws.column_dimensions['H'].width = 14.11
-        self.ws.column_dimensions['I'].width = 10.56
-        self.ws.column_dimensions['J'].hidden = True
-        self.ws.column_dimensions['K'].width = 13.22
-        self.ws.column_dimensions['L'].width = 11.00
+        ws = self.ws
+
+        set_column_widths(
+            ws, 'A', [0.94, 0.75, 11.78, 10.89, 20.89, 0.56, 0.75, 14.11, 10.56])
+        ws.column_dimensions['J'].hidden = True
+        set_column_widths(ws, 'K', [13.22, 11.00])
 
         # set logo
         img_logo = drawing.image.Image(self.static_root / 'img/client_icon.png')
         img_logo.width = 75
         img_logo.height = 75
-        self.ws.add_image(img_logo, 'C4')
+        ws.add_image(img_logo, 'C4')
 
         # set title
-        self.ws.merge_cells('B2:K2')
-        self.ws['B2'].value = 'CSR DAILY REPORT'
-        self.ws['B2'].alignment = Alignment(horizontal='center')
-        self.ws['B2'].font = font_large_bold
+        ws.merge_cells('B2:K2')
+        set_row(ws, 2, 2, ['CSR DAILY REPORT'], 'title_center')
 
         # set date
-        self.ws.merge_cells('H3:I3')
-        self.ws.merge_cells('K3:L3')
-        set_vertical_cells(
-            self.ws, 'H3', ['DATE'], font_large_bold, Alignment(horizontal='right'))
-        set_vertical_cells(
-            self.ws, 'K3', [self.report_date], font_large_bold, Alignment())
-        self.ws['K3'].font = Font(name=fontname, bold=True, size=11, color=red)
+        ws.merge_cells('H3:I3')
+        ws.merge_cells('K3:L3')
+        set_row(ws, 3, 8, ['DATE'], 'title_right')
+        set_row(ws, 3, 11, [self.report_date], 'title_red')
 
         # general project info
-        set_vertical_cells(
-            self.ws, 'D4', [key for key in self.project_table], font_bold, Alignment())
-        set_vertical_cells(
-            self.ws, 'E4', [val for _, val in self.project_table.items()], font_normal,
-            Alignment(horizontal='right'))
-        self.ws['E4'].font = font_bold
-        self.ws['E5'].number_format = '#,##0'
+        set_column(ws, 4, 4, list(self.project_table), 'bold')
+        set_column(ws, 4, 5, list(self.project_table.values()), 'normal_right')
+        ws['E4'].style = 'bold_right'
+        ws['E5'].number_format = '#,##0'
 
         # daily stats
-        set_vertical_cells(
-            self.ws, 'H4', [key for key in self.daily_table], font_bold, Alignment())
-        set_vertical_cells(
-            self.ws, 'I4', [val for _, val in self.daily_table.items()], font_normal,
-            Alignment(horizontal='right'))
-        self.ws['I5'].number_format = '#,##0'
-        self.ws['I6'].number_format = '#,##0'
-        self.ws['I7'].number_format = '0.00%'
-        self.ws['I8'].number_format = '0.00'
-        self.ws['I9'].number_format = '0.00'
-        self.ws['I10'].number_format = '0.00'
-        self.ws['I11'].number_format = '0.00'
-        self.ws['I12'].number_format = '#,##0'
-        conditional_format(self.ws, 'I7', PROD_TARGET, (red, orange, green))
-        conditional_format(self.ws, 'I8', REC_TARGET, (red, orange, green))
+        set_column(ws, 4, 8, list(self.daily_table), 'bold')
+        set_column(ws, 4, 9, list(self.daily_table.values()), 'normal_right')
+        format_range(ws, 5, 9, 6, 9, number_format='#,##0')
+        format_range(ws, 7, 9, 7, 9, number_format='0.00%')
+        format_range(ws, 8, 9, 11, 9, number_format='0.00')
+        format_range(ws, 12, 9, 12, 9, number_format='#,##0')
+        conditional_format(ws, 'I7', PROD_TARGET, (red, orange, green))
+        conditional_format(ws, 'I8', REC_TARGET, (red, orange, green))
 
         # receiver stats
         not_shown = ['Node charged', 'Node repair']
-        set_vertical_cells(
-            self.ws, 'H13', [key for key in self.recvr_table
-            if key not in not_shown], font_bold, Alignment())
-        set_vertical_cells(
-            self.ws, 'I13', [val for key, val in self.recvr_table.items()
-            if key not in not_shown], font_normal, Alignment(horizontal='right'))
-        self.ws['I13'].number_format = '#,##0'
-        self.ws['I14'].number_format = '#,##0'
-        self.ws['I15'].number_format = '#,##0'
-        self.ws['I16'].number_format = '#,##0'
+        recvr_table = {
+            key: val for key, val in self.recvr_table.items() if key not in not_shown}
+        set_column(ws, 13, 8, list(recvr_table), 'bold')
+        set_column(ws, 13, 9, list(recvr_table.values()), 'normal_right')
+        format_range(ws, 13, 9, 16, 9, number_format='#,##0')
 
         # XGO and CSR
-        set_vertical_cells(
-            self.ws, 'D10', [key[:-3] for key in self.csr_table], font_bold,
-            Alignment(horizontal='right'))
-        set_vertical_cells(
-            self.ws, 'E10', [val for _, val in self.csr_table.items()], font_normal,
-            Alignment())
+        set_column(ws, 10, 4, [key[:-3] for key in self.csr_table], 'bold_right')
+        set_column(ws, 10, 5, list(self.csr_table.values()), 'normal')
 
         # project stats
-        self.ws.merge_cells('K4:L4')
-        set_vertical_cells(
-            self.ws, 'K4', ['Project Statistics'], font_large_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(
-            self.ws, 'K5', [key for key in self.proj_stats_table], font_bold,
-            Alignment())
-        set_vertical_cells(
-            self.ws, 'L5', [val for _, val in self.proj_stats_table.items()], font_normal,
-            Alignment(horizontal='right'))
-        self.ws['L5'].number_format = '#,##0'
-        self.ws['L6'].number_format = '0.00'
-        self.ws['L7'].number_format = '#,##0'
-        self.ws['L8'].number_format = '0.00%'
+        ws.merge_cells('K4:L4')
+        set_row(ws, 4, 11, ['Project Statistics'], 'title_center')
+        set_column(ws, 5, 11, list(self.proj_stats_table), 'bold')
+        set_column(ws, 5, 12, list(self.proj_stats_table.values()), 'normal_right')
+        ws['L5'].number_format = '#,##0'
+        ws['L6'].number_format = '0.00'
+        ws['L7'].number_format = '#,##0'
+        ws['L8'].number_format = '0.00%'
 
         # block stats
-        self.ws.merge_cells('K10:L10')
-        set_vertical_cells(
-            self.ws, 'K10', ['Block Statistics'], font_large_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(
-            self.ws, 'K11', [key for key in self.block_stats_table], font_bold,
-            Alignment())
-        set_vertical_cells(
-            self.ws, 'L11', [val for _, val in self.block_stats_table.items()],
-            font_normal, Alignment(horizontal='right'))
-        self.ws['L12'].number_format = '0.00'
-        self.ws['L13'].number_format = '0.00%'
+        ws.merge_cells('K10:L10')
+        set_row(ws, 10, 11, ['Block Statistics'], 'title_center')
+        set_column(ws, 11, 11, list(self.block_stats_table), 'bold')
+        set_column(ws, 11, 12, list(self.block_stats_table.values()), 'normal_right')
+        ws['L12'].number_format = '0.00'
+        ws['L13'].number_format = '0.00%'
 
         # hse stats
-        self.ws.merge_cells('K15:L15')
-        set_vertical_cells(
-            self.ws, 'K15', ['HSE Statistics'], font_large_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(
-            self.ws, 'K16', [key for key in self.hse_stats_table], font_bold, Alignment())
-        set_vertical_cells(
-            self.ws, 'L16', [val for _, val in self.hse_stats_table.items()], font_normal,
-            Alignment(horizontal='right'))
-
-        for i in range(16, 26):
-            self.ws['L'+str(i)].number_format = '0;-0;;@'
-        conditional_format(self.ws, 'L22', STOP_TARGET, (None, None, green))
+        ws.merge_cells('K15:L15')
+        set_row(ws, 15, 11, ['HSE Statistics'], 'title_center')
+        set_column(ws, 16, 11, list(self.hse_stats_table), 'bold')
+        set_column(ws, 16, 12, list(self.hse_stats_table.values()), 'normal_right')
+        format_range(ws, 16, 12, 25, 12, number_format='0;-0;;@')
+        conditional_format(ws, 'L22', STOP_TARGET, (None, None, green))
 
         # csr comment
-        self.ws.merge_cells('B17:I27')
-        set_vertical_cells(
-            self.ws, 'B16', [key for key in self.csr_comment_table], font_bold,
-            Alignment())
-        set_vertical_cells(
-            self.ws, 'B17', [val for _, val in self.csr_comment_table.items()],
-            font_normal, Alignment(vertical='top', wrap_text=True))
+        ws.merge_cells('B17:I27')
+        set_column(ws, 16, 2, list(self.csr_comment_table), 'bold')
+        set_column(ws, 17, 2, list(self.csr_comment_table.values()), 'normal_wrap')
 
         # add graphs
         width, height = IMG_SIZE
-        img_daily_prod = drawing.image.Image(self.media_root / 'images/daily_prod.png')
-        img_daily_prod.width = width
-        img_daily_prod.height = height
-        self.ws.add_image(img_daily_prod, 'C29')
-
-        img_cumul_prod = drawing.image.Image(self.media_root / 'images/cumul_prod.png')
-        img_cumul_prod.width = width
-        img_cumul_prod.height = height
-        self.ws.add_image(img_cumul_prod, 'H29')
-
-        img_rec_hours = drawing.image.Image(self.media_root / 'images/rec_hours.png')
-        img_rec_hours.width = width
-        img_rec_hours.height = height
-        self.ws.add_image(img_rec_hours, 'C42')
-
-        img_app_ctm = drawing.image.Image(self.media_root / 'images/app_ctm_ratio.png')
-        img_app_ctm.width = width
-        img_app_ctm.height = height
-        self.ws.add_image(img_app_ctm, 'H42')
+        for graph_name, anchor in [
+                ('daily_prod', 'C29'), ('cumul_prod', 'H29'), ('rec_hours', 'C42'),
+                ('app_ctm_ratio', 'H42')]:
+            img_graph = drawing.image.Image(self.graph_files[graph_name])
+            img_graph.width = width
+            img_graph.height = height
+            ws.add_image(img_graph, anchor)
 
         # set borders
-        set_outer_border(self.ws, 'B2:L55')
-        set_outer_border(self.ws, 'B2:L2')
-        set_outer_border(self.ws, 'B3:I16')
-        set_outer_border(self.ws, 'H4:I12')
-        set_outer_border(self.ws, 'H13:I16')
-        set_outer_border(self.ws, 'K4:L9')
-        set_outer_border(self.ws, 'K4:L4')
-        set_outer_border(self.ws, 'K10:L14')
-        set_outer_border(self.ws, 'K10:L10')
-        set_outer_border(self.ws, 'K15:L27')
-        set_outer_border(self.ws, 'K15:L15')
-        set_outer_border(self.ws, 'B17:I27')
-        self.ws['I3'].border = Border(top=Side(style='thin'), bottom=Side(style='thin'))
+        for min_row, min_col, max_row, max_col in [
+                (2, 2, 55, 12), (2, 2, 2, 12), (3, 2, 16, 9), (4, 8, 12, 9),
+                (13, 8, 16, 9), (4, 11, 9, 12), (4, 11, 4, 12), (10, 11, 14, 12),
+                (10, 11, 10, 12), (15, 11, 27, 12), (15, 11, 15, 12), (17, 2, 27, 9)]:
+            set_outer_border_range(ws, min_row, min_col, max_row, max_col)
+
+        ws['I3'].border = get_border(top='thin', bottom='thin')
 
         return save_excel(self.wb)
 
 
 def collate_excel_dailyreport_data(day):
-    r_iface = ReportInterface('')
-    (
-        _,
-        totals_production,
-        totals_time,
-        totals_receiver,
-        totals_hse,
-    ) = r_iface.calc_totals(day)
-    # no need to call create_daily_graphs as this has been done in DailyView
+    r_iface = ReportInterface(settings.MEDIA_ROOT)
+    report_totals = r_iface.calc_totals(day)
+    totals_production = report_totals.prod_total
+    totals_time = report_totals.times_total
+    totals_receiver = report_totals.rcvr_total
+    totals_hse = report_totals.hse_total
 
     project = day.project
 
     report_data = {}
     report_data['report_date'] = day.production_date.strftime('%#d %b %Y')
+    # graphs are taken from the cache if already created in DailyView
+    report_data['graph_files'] = r_iface.create_daily_graphs(report_totals)
 
     if project.start_report:
         ops_days = (day.production_date - project.start_report).days + 1
@@ -1,29 +1,20 @@
 ''' module to generate excel version of mpr
 '''
 import calendar
-import numpy as np
-import pandas as pd
 from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font
 from openpyxl.utils.dataframe import dataframe_to_rows
 from daily_report.report_backend import ReportInterface
 import daily_report.excel_services_backend as _excel_services_backend
 from seismicreport.utils.utils_excel import (
-    set_vertical_cells, set_horizontal_cells, format_vertical, format_horizontal,
-    set_column_widths, set_color, save_excel,
+    register_styles, styled_cell, set_column_widths, save_excel,
 )
-from seismicreport.vars import (
-    CONTRACT, source_prod_schema, receiver_prod_schema, time_breakdown_schema,
-    hse_weather_schema
-)
-
-fontname = 'Tahoma'
-font_large_bold = Font(name=fontname, bold=True, size=11)
-font_normal = Font(name=fontname, size=9)
-font_bold = Font(name=fontname, bold=True, size=9)
-lightblue = 'D8EFF8'
+from seismicreport.vars import CONTRACT
 
-#pylint: disable=line-too-long
+# number formats of the columns A to X of the mpr table
+table_formats = (
+    [None] * 8 + ['#,##0'] * 2 + ['0.00'] * 5 + ['0.0%'] * 6 + ['#,##0'] + ['0.0%'] * 2)
+# number formats of the sum row, that has the VP terrain totals formatted as well
+sum_formats = [None] * 2 + ['#,##0'] * 6 + table_formats[8:]
 
 
 class ExcelMprReport(_excel_services_backend.Mixin):
@@ -31,17 +22,15 @@ class ExcelMprReport(_excel_services_backend.Mixin):
     '''
     def __init__(self, day):
         self.day = day
-        self.sourcetype_names = [
-            stype.sourcetype_name for stype in self.day.project.sourcetypes.all()
-        ]
-        self.wb = Workbook()
-        self.wb.remove_sheet(self.wb.get_sheet_by_name('Sheet'))
+        self.sourcetypes = list(self.day.project.sourcetypes.all())
+        self.wb = Workbook(write_only=True)
         self.ws_mpr = self.wb.create_sheet('MPR')
         self.ws_mpr.sheet_view.showGridLines = False
 
         self.ws_stypes = {}
-        if len(self.sourcetype_names) > 1:
-            for stype_name in self.sourcetype_names:
+        if len(self.sourcetypes) > 1:
+            for stype in self.sourcetypes:
+                stype_name = stype.sourcetype_name
                 self.ws_stypes[stype_name] = self.wb.create_sheet(stype_name)
                 self.ws_stypes[stype_name].sheet_view.showGridLines = False
 
@@ -51,12 +40,7 @@ class ExcelMprReport(_excel_services_backend.Mixin):
         self.ws_service = self.wb.create_sheet('Services')
         self.ws_service.sheet_view.showGridLines = False
 
-        r_iface = ReportInterface('')
-        _, self.prod_total, self.times_total, _, _ = r_iface.calc_totals(self.day)
-        (
-            self.prod_series_by_type, self.prod_series,
-            self.time_series, self.rcvr_series, self.hse_series
-        ) = r_iface.series
+        self.mpr_data = ReportInterface('').calc_mpr_data(self.day)
 
     def get_parameters(self, header_sourcetype):
         params = {}
@@ -74,166 +58,62 @@ class ExcelMprReport(_excel_services_backend.Mixin):
         params['ctm'] = header_sourcetype['ctm']
         params['appctm'] = header_sourcetype['appctm']
         params['rate'] = header_sourcetype['rate']
-        params['production_days'] = (
-            self.day.production_date - self.day.project.planned_start_date).days + 1
         return params
 
-    def collate_mpr_data(self, prod_series, rcvr_series, time_series, hse_series):
-        prod_keys = ['date_series']
-        prod_keys += [f'{key[:5]}_series' for key in source_prod_schema]
-        prod_keys += ['total_sp_series', 'tcf_series', 'ctm_series', 'appctm_series']
-        p_series = {f'{key[:-7]}':prod_series[key] for key in prod_keys}
-
-        rcvr_keys = [f'{key}_series' for key in receiver_prod_schema]
-        r_series = {f'{key[:-7]}':rcvr_series[key] for key in rcvr_keys}
-
-        time_keys = [f'{key}_series' for key in time_breakdown_schema]
-        time_keys += [
-            'ops_series', 'standby_series', 'downtime_series', 'total_time_series']
-        t_series = {f'{key[:-7]}': time_series[key] for key in time_keys}
-        proj_df = pd.DataFrame({**p_series, **r_series, **t_series})
-
-        if hse_series:
-            hse_keys = ['date_series']
-            hse_keys += [f'{key}_series' for key in hse_weather_schema[:12]]
-            h_series = {f'{key[:-7]}': hse_series[key] for key in hse_keys}
-            hse_df = pd.DataFrame(h_series)
-            proj_df = proj_df.merge(hse_df, how='left', left_on='date', right_on='date')
-
-        proj_df['date'] = pd.to_datetime(proj_df['date'])
-
-        return proj_df
-
     @staticmethod
-    def create_tab_mpr(ws, params, proj_df):
-        ''' method to create excel mpr report tab
+    def create_tab_mpr(ws, params, table, sums):
+        ''' method to create excel mpr report tab from the table and sums of
+            calc_mpr_data
         '''
-        def calc_mpr_values():
-            # calculate month values
-            m_df = proj_df[
-                (proj_df.date.dt.month == params['month']) &
-                (proj_df.date.dt.year == params['year'])
-            ]
-
-            dates = m_df.date.dt.strftime('%d-%b-%y').to_list()
-            m_day = params['days'] - 1
-            prod_days = [
-                params['production_days'] - m_day + d for d in range(m_day + 1)]
-
-            vp_type = {}
-            vp_typesum = {}
-            vp_type['total'] = np.array(m_df.total_sp.to_list(), dtype=float)
-            vp_type['cumtotal'] = np.cumsum(vp_type['total'])
-            vp_type['tcf'] = np.array(m_df.tcf.to_list(), dtype=float)
-            vp_type['ctm'] = np.array(m_df.ctm.to_list(), dtype=float)
-            vp_type['appctm'] = np.array(m_df.appctm.to_list(), dtype=float)
-            vp_typesum['total'] = np.sum(vp_type['total'])
-
-            # calculate the vp terrain distributions and sums
-            vp_dist = {}
-            vp_distsum = {}
-            for col in ['sp_t1', 'sp_t2', 'sp_t3', 'sp_t4', 'sp_t5', 'skips']:
-                vp_type[col] = np.array(m_df[col].to_list(), dtype=float)
-                vp_typesum[col] = np.sum(vp_type[col])
-                vp_dist[col] = np.divide(
-                    vp_type[col], vp_type['total'], out=np.zeros_like(
-                        vp_type[col]), where=vp_type['total']!=0)
-
-                if vp_typesum['total'] > 0:
-                    vp_distsum[col] = vp_typesum[col] / vp_typesum['total']
-
-                else:
-                    vp_distsum[col] = 0
-
-            # calculate times and sums
-            tm_type = {}
-            tm_typesum = {}
-            for col in ['rec_hours', 'ops', 'standby', 'downtime']:
-                tm_type[col] = np.array(m_df[col].to_list())
-                tm_typesum[col] = np.sum(tm_type[col])
-
-            tm_type['other_ops'] = tm_type['ops'] - tm_type['rec_hours']
-            tm_typesum['other_ops'] = np.sum(tm_type['other_ops'])
-
-            if params['rechours']:
-                tm_type['padtime'] = tm_type['rec_hours'] / params['rechours']
-                tm_typesum['padtime'] = (
-                    tm_typesum['rec_hours'] / (params['rechours'] * params['days']))
-
-            else:
-                tm_type['padtime'] = tm_type['rec_hours'] * 0
-                tm_typesum['padtime'] = 0
-
-            return (
-                dates, prod_days, vp_type, vp_typesum, vp_dist, vp_distsum,
-                tm_type, tm_typesum
-            )
-
-        (
-            dates, prod_days, vp_type, vp_typesum, vp_dist, vp_distsum,
-            tm_type, tm_typesum
-        ) = calc_mpr_values()
-
-        # set the titles
-        ws.merge_cells('I1:M1')
-        ws['I1'].value = 'Production Record and Bonus Calculator'
-        ws['I1'].font = font_large_bold
-
-        for r in range(2, 12):
-            ws.merge_cells(f'A{r}:C{r}')
-            ws.merge_cells(f'D{r}:E{r}')
-
+        # the rows are appended in order to the write only worksheet
+        register_styles(ws.parent)
         monthyear = f'{calendar.month_name[params["month"]]}, {params["year"]}'
 
-        set_vertical_cells(ws, 'A2', ['Contract'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A3', ['Project'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A4', ['Crew'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A5', ['Month, Year'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A6', ['Days in month'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A7', ['Sourcetype name'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A8', ['Sweep length'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A9', ['Contractual vibrators'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A10', ['Contractual recording hours'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'A11', ['Move up time'], font_bold, Alignment(horizontal='left'))
-
-        set_vertical_cells(ws, 'D2', [CONTRACT], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D3', [f'{params["project"]}'], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D4', [f'{params["crew"]}'], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D5', [monthyear], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D6', [params['days']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D7', [params['sourcetype_name']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D8', [params['sweep']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D9', [params['vibes']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D10', [params['rechours']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'D11', [params['moveup']], font_normal, Alignment(horizontal='right'))
-
-        for r in range(5, 11):
-            ws.merge_cells(f'H{r}:J{r}')
-            ws.merge_cells(f'K{r}:L{r}')
-
-        set_vertical_cells(ws, 'H5', ['Terrain correction factor'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'H6', ['CTM month'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'H7', ['APP month'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'H8', ['APP / CTM'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'H9', ['Standby days for month'], font_bold, Alignment(horizontal='left'))
-        set_vertical_cells(ws, 'H10', ['Effective month rate'], font_bold, Alignment(horizontal='left'))
-
-        set_vertical_cells(ws, 'K5', [params['tcf']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'K6', [params['ctm']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'K7', [vp_typesum['total']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'K8', [params['appctm']], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'K9', [tm_typesum['standby'] / 24], font_normal, Alignment(horizontal='right'))
-        set_vertical_cells(ws, 'K10', [params['rate']], font_normal, Alignment(horizontal='right'))
-
-        # and some formatting ...
-        for r in [5, 10]:
-            ws[f'K{r}'].number_format = '0.00%'
+        # set the titles
+        ws.merged_cells.add('I1:M1')
+        ws.append(
+            [None] * 8 +
+            [styled_cell(ws, 'Production Record and Bonus Calculator', 'title')])
+
+        titles = [
+            ('Contract', CONTRACT),
+            ('Project', f'{params["project"]}'),
+            ('Crew', f'{params["crew"]}'),
+            ('Month, Year', monthyear),
+            ('Days in month', params['days']),
+            ('Sourcetype name', params['sourcetype_name']),
+            ('Sweep length', params['sweep']),
+            ('Contractual vibrators', params['vibes']),
+            ('Contractual recording hours', params['rechours']),
+            ('Move up time', params['moveup']),
+        ]
+        month_values = {
+            5: ('Terrain correction factor', params['tcf'], '0.00%'),
+            6: ('CTM month', params['ctm'], '#,##0'),
+            7: ('APP month', sums['total_sp'], '#,##0'),
+            8: ('APP / CTM', params['appctm'], '0.000'),
+            9: ('Standby days for month', sums['standby'] / 24, '0.000'),
+            10: ('Effective month rate', params['rate'], '0.00%'),
+        }
+        for r, (label, value) in enumerate(titles, 2):
+            ws.merged_cells.add(f'A{r}:C{r}')
+            ws.merged_cells.add(f'D{r}:E{r}')
+            row = [
+                styled_cell(ws, label, 'bold_left'), None, None,
+                styled_cell(ws, value, 'normal_right'),
+            ]
+            if r in month_values:
+                ws.merged_cells.add(f'H{r}:J{r}')
+                ws.merged_cells.add(f'K{r}:L{r}')
+                label, value, number_format = month_values[r]
+                row += [
+                    None, None, None, styled_cell(ws, label, 'bold_left'), None, None,
+                    styled_cell(ws, value, 'normal_right', number_format=number_format),
+                ]
 
-        for r in [8, 9]:
-            ws[f'K{r}'].number_format = '0.000'
+            ws.append(row)
 
-        for r in [6, 7]:
-            ws[f'K{r}'].number_format = '#,##0'
+        ws.append([])
 
         # set the table
         header = [
@@ -242,74 +122,51 @@ class ExcelMprReport(_excel_services_backend.Mixin):
             'Standby', 'Down', 'Flat', 'Rough', 'Facilities', 'Dunes', 'Sabkha',
             'TCF', 'CTM', 'APP/CTM', 'PAD time',
         ]
-        set_horizontal_cells(ws, 'A13', header, font_bold,
-            Alignment(horizontal='center', wrap_text=True, vertical='top'))
-        set_color(ws, 'A13:X13', color=lightblue)
+        ws.append([
+            styled_cell(ws, value, 'bold_header_fill', number_format=number_format)
+            for value, number_format in zip(header, table_formats)
+        ])
 
-        set_vertical_cells(ws, 'A14', dates, font_normal, Alignment())
-        set_vertical_cells(ws, 'B14', prod_days, font_normal, Alignment())
-        set_vertical_cells(ws, 'C14', vp_type['sp_t1'], font_normal, Alignment())
-        set_vertical_cells(ws, 'D14', vp_type['sp_t2'], font_normal, Alignment())
-        set_vertical_cells(ws, 'E14', vp_type['sp_t3'], font_normal, Alignment())
-        set_vertical_cells(ws, 'F14', vp_type['sp_t4'], font_normal, Alignment())
-        set_vertical_cells(ws, 'G14', vp_type['sp_t5'], font_normal, Alignment())
-        set_vertical_cells(ws, 'H14', vp_type['skips'], font_normal, Alignment())
-        set_vertical_cells(ws, 'I14', vp_type['total'], font_normal, Alignment())
-        set_vertical_cells(ws, 'J14', vp_type['cumtotal'], font_normal, Alignment())
-        set_vertical_cells(ws, 'K14', tm_type['rec_hours'], font_normal, Alignment())
-        set_vertical_cells(ws, 'L14', tm_type['other_ops'], font_normal, Alignment())
-        set_vertical_cells(ws, 'M14', tm_type['ops'], font_normal, Alignment())
-        set_vertical_cells(ws, 'N14', tm_type['standby'], font_normal, Alignment())
-        set_vertical_cells(ws, 'O14', tm_type['downtime'], font_normal, Alignment())
-        set_vertical_cells(ws, 'P14', vp_dist['sp_t1'], font_normal, Alignment())
-        set_vertical_cells(ws, 'Q14', vp_dist['sp_t2'], font_normal, Alignment())
-        set_vertical_cells(ws, 'R14', vp_dist['sp_t3'], font_normal, Alignment())
-        set_vertical_cells(ws, 'S14', vp_dist['sp_t4'], font_normal, Alignment())
-        set_vertical_cells(ws, 'T14', vp_dist['sp_t5'], font_normal, Alignment())
-        set_vertical_cells(ws, 'U14', vp_type['tcf'], font_normal, Alignment())
-        set_vertical_cells(ws, 'V14', vp_type['ctm'], font_normal, Alignment())
-        set_vertical_cells(ws, 'W14', vp_type['appctm'], font_normal, Alignment())
-        set_vertical_cells(ws, 'X14', tm_type['padtime'], font_normal, Alignment())
+        for values in table.itertuples(index=False):
+            ws.append([
+                styled_cell(ws, value, 'normal', number_format=number_format)
+                for value, number_format in zip(values, table_formats)
+            ])
 
-        # and some formating of columns
-        for c in ['K', 'L', 'M', 'N', 'O']:
-            format_vertical(ws, f'{c}13:{c}100', '0.00')
-        for c in ['P', 'Q', 'R', 'S', 'T', 'U', 'W', 'X']:
-            format_vertical(ws, f'{c}13:{c}100', '0.0%')
-        for c in ['I', 'J', 'V']:
-            format_vertical(ws, f'{c}13:{c}100', '#,##0')
+        # add row with the sums after the row of the last day of the month
+        for _ in range(len(table), params['days']):
+            ws.append([])
 
-        # add row with the sums
         row_sum = [
-            'Total', params['days'], vp_typesum['sp_t1'], vp_typesum['sp_t2'],
-            vp_typesum['sp_t3'], vp_typesum['sp_t4'], vp_typesum['sp_t5'],
-            vp_typesum['skips'], vp_typesum['total'], '', tm_typesum['rec_hours'],
-            tm_typesum['other_ops'], tm_typesum['ops'], tm_typesum['standby'],
-            tm_typesum['downtime'], vp_distsum['sp_t1'], vp_distsum['sp_t2'],
-            vp_distsum['sp_t3'], vp_distsum['sp_t4'], vp_distsum['sp_t5'],
-            params['tcf'], params['ctm'], params['appctm'],
-            tm_typesum['padtime'],
+            'Total', params['days'], sums['sp_t1'], sums['sp_t2'], sums['sp_t3'],
+            sums['sp_t4'], sums['sp_t5'], sums['skips'], sums['total_sp'], '',
+            sums['rec_hours'], sums['other_ops'], sums['ops'], sums['standby'],
+            sums['downtime'], sums['sp_t1_dist'], sums['sp_t2_dist'],
+            sums['sp_t3_dist'], sums['sp_t4_dist'], sums['sp_t5_dist'],
+            params['tcf'], params['ctm'], params['appctm'], sums['padtime'],
         ]
-        set_horizontal_cells(ws, f'A{14+params["days"]}', row_sum, font_bold, Alignment())
-        format_horizontal(ws, f'C{14+params["days"]}:H{14+params["days"]}', '#,##0')
-        set_color(ws, f'A{14+params["days"]}:X{14+params["days"]}', color=lightblue)
+        ws.append([
+            styled_cell(ws, value, 'bold_fill', number_format=number_format)
+            for value, number_format in zip(row_sum, sum_formats)
+        ])
 
     @staticmethod
     def create_tab_proj(ws, proj_df):
         set_column_widths(ws, 'A', [12.5])
-        proj_df['date'] = proj_df['date'].dt.date
-        rows = dataframe_to_rows(proj_df, index=False, header=True)
         ws.freeze_panes = 'B2'
-
-        for r_id, row in enumerate(rows, 1):
-            for c_id, value in enumerate(row, 1):
-                ws.cell(row=r_id, column=c_id, value=value)
+        proj_df['date'] = proj_df['date'].dt.date
+        for row in dataframe_to_rows(proj_df, index=False, header=True):
+            ws.append(row)
 
     def create_mprreport(self):
-        main_proj_df = self.collate_mpr_data(
-            self.prod_series, self.rcvr_series, self.time_series, self.hse_series
-        )
-        stype = None
+        mpr_data = self.mpr_data
+        month_total = mpr_data.month_total
+        month_header = {
+            'tcf': month_total['month_tcf'],
+            'ctm': month_total['month_ctm'],
+            'appctm': month_total['month_appctm'],
+            'rate': month_total['month_rate'],
+        }
         if self.ws_stypes:
             # there are more than one sourcetypes
             header_sourcetype = {
@@ -318,18 +175,14 @@ class ExcelMprReport(_excel_services_backend.Mixin):
                 'vibes': '',
                 'moveup': '',
                 'rechours': 24,
-                'tcf': self.prod_total['month_tcf'],
-                'ctm': self.prod_total['month_ctm'],
-                'appctm': self.prod_total['month_appctm'],
-                'rate': self.prod_total['month_rate']
+                **month_header,
             }
             params = self.get_parameters(header_sourcetype)
-            self.create_tab_mpr(self.ws_mpr, params, main_proj_df)
+            self.create_tab_mpr(
+                self.ws_mpr, params, mpr_data.tables[None], mpr_data.sums[None])
 
-            for stype_name in self.sourcetype_names:
-                stype = self.day.project.sourcetypes.get(
-                    sourcetype_name=stype_name
-                )
+            for stype in self.sourcetypes:
+                stype_name = stype.sourcetype_name
                 header_sourcetype = {
                     'name': stype_name,
                     'sweep': stype.mpr_sweep_length,
@@ -342,30 +195,26 @@ class ExcelMprReport(_excel_services_backend.Mixin):
                     'rate': ''
                 }
                 params = self.get_parameters(header_sourcetype)
-                proj_df = self.collate_mpr_data(
-                    self.prod_series_by_type[stype_name], self.rcvr_series, self.time_series,
-                    self.hse_series
-                )
-                self.create_tab_mpr(self.ws_stypes[stype_name], params, proj_df)
+                self.create_tab_mpr(
+                    self.ws_stypes[stype_name], params, mpr_data.tables[stype_name],
+                    mpr_data.sums[stype_name])
 
         else:
             # only a single sourcetype
-            stype = self.day.project.sourcetypes.all()[0]
+            stype = self.sourcetypes[0]
             header_sourcetype = {
                 'name': stype.sourcetype_name,
                 'sweep': stype.mpr_sweep_length,
                 'vibes': stype.mpr_vibes,
                 'moveup': stype.mpr_moveup,
                 'rechours': stype.mpr_rec_hours,
-                'tcf': self.prod_total['month_tcf'],
-                'ctm': self.prod_total['month_ctm'],
-                'appctm': self.prod_total['month_appctm'],
-                'rate': self.prod_total['month_rate']
+                **month_header,
             }
             params = self.get_parameters(header_sourcetype)
-            self.create_tab_mpr(self.ws_mpr, params, main_proj_df)
+            self.create_tab_mpr(
+                self.ws_mpr, params, mpr_data.tables[None], mpr_data.sums[None])
 
-        self.create_tab_proj(self.ws_proj, main_proj_df)
+        self.create_tab_proj(self.ws_proj, mpr_data.proj_df.copy())
         self.create_tab_services(
             self.ws_service, self.day.project, params['year'], params['month']
         )
@@ -3,14 +3,12 @@
 from pathlib import Path
 import numpy as np
 from openpyxl import Workbook, drawing
-from openpyxl.styles import Alignment, Font
 from daily_report.report_backend import ReportInterface
 from daily_report.week_backend import WeekInterface
 import daily_report.graph_backend as _graph_backend
 from seismicreport.utils.utils_excel import (
-    set_vertical_cells, set_horizontal_cells, format_vertical, format_horizontal,
-    conditional_format, set_column_widths, set_border, set_outer_border,
-    set_color, save_excel, get_row_column,
+    register_styles, set_row, set_column, format_range, set_border_range,
+    set_outer_border_range, conditional_format, set_column_widths, save_excel,
 )
 from seismicreport.utils.utils_funcs import nan_array
 from seismicreport.vars import (
@@ -18,10 +16,6 @@ from seismicreport.vars import (
     source_prod_schema,
 )
 
-fontname = 'Tahoma'
-font_large_bold = Font(name=fontname, bold=True, size=11)
-font_normal = Font(name=fontname, size=9)
-font_bold = Font(name=fontname, bold=True, size=9)
 red = '00FF0000'
 green ='0000FF00'
 orange = 'FFA500'
@@ -38,6 +32,7 @@ class ExcelWeekReport(_graph_backend.Mixin):
         self.static_dir = Path(static_dir)
         self.wb = Workbook()
         self.wb.remove_sheet(self.wb.get_sheet_by_name('Sheet'))
+        register_styles(self.wb)
         self.wsw = self.wb.create_sheet('CSR_weekly')
         self.wst = self.wb.create_sheet('Times')
         self.wsp = self.wb.create_sheet('Production')
@@ -77,173 +72,146 @@ class ExcelWeekReport(_graph_backend.Mixin):
         self.week_terrain = report_data['week_terrain']
         self.proj_terrain = report_data['proj_terrain']
 
-        self.prod_series = report_data['prod_series']
-        self.time_series = report_data['time_series']
+        self.report_totals = report_data['report_totals']
 
 
     def create_tab_weekly(self):
         ''' method to create excel weekly report main tab
         '''
-        set_column_widths(self.wsw, 'A',
+        ws = self.wsw
+        set_column_widths(ws, 'A',
             [0.94, 0.75, 12.56, 12.56, 12.56, 12.56,
              0.75, 12.56, 12.56, 12.56, 12.56, 0.75]
         )
 
         # set title
-        self.wsw.merge_cells('B2:L2')
-        self.wsw['B2'].value = 'CSR WEEKLY REPORT'
-        self.wsw['B2'].alignment = Alignment(horizontal='center')
-        self.wsw['B2'].font = font_large_bold
+        ws.merge_cells('B2:L2')
+        set_row(ws, 2, 2, ['CSR WEEKLY REPORT'], 'title_center')
 
         # set logo
         img_logo = drawing.image.Image(self.static_dir / 'img/client_icon.png')
         img_logo.width = 75
         img_logo.height = 75
-        self.wsw.add_image(img_logo, 'C4')
+        ws.add_image(img_logo, 'C4')
 
         # set project general
-        set_vertical_cells(self.wsw, 'D4', [k for k in self.project], font_bold,
-            Alignment())
-        set_vertical_cells(self.wsw, 'F4', [v for v in self.project.values()],
-            font_normal, Alignment(horizontal='right'))
-        self.wsw['F5'].number_format = '#,##0'
-        self.wsw['F6'].number_format = '0.00'
+        set_column(ws, 4, 4, list(self.project), 'bold')
+        set_column(ws, 4, 6, list(self.project.values()), 'normal_right')
+        ws['F5'].number_format = '#,##0'
+        ws['F6'].number_format = '0.00'
 
         # set author
-        self.wsw.merge_cells('H4:I4')
-        self.wsw.merge_cells('H5:I5')
-        set_vertical_cells(self.wsw, 'H4', [k for k in self.author], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsw, 'H5', [v for v in self.author.values()],
-            font_normal, Alignment(horizontal='center'))
+        ws.merge_cells('H4:I4')
+        ws.merge_cells('H5:I5')
+        set_column(ws, 4, 8, list(self.author), 'bold_center')
+        set_column(ws, 5, 8, list(self.author.values()), 'normal_center')
 
         # set date
-        self.wsw.merge_cells('H3:I3')
-        self.wsw.merge_cells('J3:K3')
-        set_vertical_cells(
-            self.wsw, 'H3', ['DATE'], font_large_bold, Alignment(horizontal='right'))
-        set_vertical_cells(
-            self.wsw, 'J3', [self.report_date], font_large_bold, Alignment())
-        self.wsw['J3'].font = Font(name=fontname, bold=True, size=11, color=red)
+        ws.merge_cells('H3:I3')
+        ws.merge_cells('J3:K3')
+        set_row(ws, 3, 8, ['DATE'], 'title_right')
+        set_row(ws, 3, 10, [self.report_date], 'title_red')
 
         # set project statistics
-        self.wsw.merge_cells('J4:K4')
-        set_vertical_cells(self.wsw, 'J4', ['Project Statistics'], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsw, 'J5', [k for k in self.proj_stats], font_bold,
-            Alignment())
-        set_vertical_cells(self.wsw, 'K5', [v for v in self.proj_stats.values()],
-            font_normal, Alignment(horizontal='right'))
-        self.wsw['K5'].number_format = '#,##0'
-        self.wsw['K6'].number_format = '0.00'
-        self.wsw['K7'].number_format = '#,##0'
-        self.wsw['K8'].number_format = '0.00%'
+        ws.merge_cells('J4:K4')
+        set_row(ws, 4, 10, ['Project Statistics'], 'bold_center')
+        set_column(ws, 5, 10, list(self.proj_stats), 'bold')
+        set_column(ws, 5, 11, list(self.proj_stats.values()), 'normal_right')
+        ws['K5'].number_format = '#,##0'
+        ws['K6'].number_format = '0.00'
+        ws['K7'].number_format = '#,##0'
+        ws['K8'].number_format = '0.00%'
 
         # set hse statistic
-        self.wsw.merge_cells('B11:F11')
-        set_vertical_cells(self.wsw, 'B11', ['HSE Statistics'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wsw, 'D12', ['Week', 'Month', 'Project'], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsw, 'C13', [v[0] for v in self.hse_stats], font_normal,
-            Alignment())
-        for row, item in enumerate(self.hse_stats):
-            set_horizontal_cells(self.wsw, f'D{row+13}', [item[1], item[2], item[3]],
-                font_normal, Alignment(horizontal='right'))
-
-        format_horizontal(self.wsw, 'D23:F23', '#,##0')
+        ws.merge_cells('B11:F11')
+        set_row(ws, 11, 2, ['HSE Statistics'], 'bold_center')
+        set_row(ws, 12, 4, ['Week', 'Month', 'Project'], 'bold_center')
+        set_column(ws, 13, 3, [v[0] for v in self.hse_stats], 'normal')
+        for row, item in enumerate(self.hse_stats, 13):
+            set_row(ws, row, 4, item[1:], 'normal_right')
+
+        format_range(ws, 23, 4, 23, 6, number_format='#,##0')
         f_vals = np.array(STOP_TARGET) * 7
-        conditional_format(self.wsw, 'D19', f_vals, (None, None, green))
+        conditional_format(ws, 'D19', f_vals, (None, None, green))
         f_vals = np.array(STOP_TARGET) * self.month_days
-        conditional_format(self.wsw, 'E19', f_vals, (None, None, green))
+        conditional_format(ws, 'E19', f_vals, (None, None, green))
         f_vals = np.array(STOP_TARGET) * self.proj_days
-        conditional_format(self.wsw, 'F19', f_vals, (None, None, green))
+        conditional_format(ws, 'F19', f_vals, (None, None, green))
 
         # set production statistic
-        self.wsw.merge_cells('H11:L11')
-        set_vertical_cells(self.wsw, 'H11', ['Production Statistics'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wsw, 'I12', ['Week', 'Month', 'Project'], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsw, 'H13', [v[0] for v in self.prod_stats], font_normal,
-            Alignment())
-        for row, item in enumerate(self.prod_stats):
-            set_horizontal_cells(self.wsw, f'I{row+13}', [item[1], item[2], item[3]],
-                font_normal, Alignment(horizontal='right'))
-
-        format_horizontal(self.wsw, 'I13:K13', '#,##0')
-        format_horizontal(self.wsw, 'I14:K47', '#,##0')
-        format_horizontal(self.wsw, 'I15:K15', '0.00%')
-        format_horizontal(self.wsw, 'I16:K16', '#,##0')
-        format_horizontal(self.wsw, 'I17:K17', '0.00')
-        format_horizontal(self.wsw, 'I18:K18', '#,##0')
-        format_horizontal(self.wsw, 'I19:K19', '0.00')
-        format_horizontal(self.wsw, 'I20:K20', '#,##0')
-        format_horizontal(self.wsw, 'I21:K21', '0.00%')
+        ws.merge_cells('H11:L11')
+        set_row(ws, 11, 8, ['Production Statistics'], 'bold_center')
+        set_row(ws, 12, 9, ['Week', 'Month', 'Project'], 'bold_center')
+        set_column(ws, 13, 8, [v[0] for v in self.prod_stats], 'normal')
+        for row, item in enumerate(self.prod_stats, 13):
+            set_row(ws, row, 9, item[1:], 'normal_right')
+
+        format_range(ws, 13, 9, 47, 11, number_format='#,##0')
+        for row, number_format in [
+                (15, '0.00%'), (17, '0.00'), (19, '0.00'), (21, '0.00%')]:
+            format_range(ws, row, 9, row, 11, number_format=number_format)
 
         f_vals = np.array(PROD_TARGET) * 1
-        conditional_format(self.wsw, 'I15', f_vals, (red, orange, green))
-        conditional_format(self.wsw, 'J15', f_vals, (red, orange, green))
-        conditional_format(self.wsw, 'K15', f_vals, (red, orange, green))
+        conditional_format(ws, 'I15', f_vals, (red, orange, green))
+        conditional_format(ws, 'J15', f_vals, (red, orange, green))
+        conditional_format(ws, 'K15', f_vals, (red, orange, green))
 
         f_vals = np.array(REC_TARGET) * 7
-        conditional_format(self.wsw, 'I16', f_vals, (red, orange, green))
+        conditional_format(ws, 'I16', f_vals, (red, orange, green))
         f_vals = np.array(REC_TARGET) * self.month_days
-        conditional_format(self.wsw, 'J16', f_vals, (red, orange, green))
+        conditional_format(ws, 'J16', f_vals, (red, orange, green))
         f_vals = np.array(REC_TARGET) * self.proj_days
-        conditional_format(self.wsw, 'K16', f_vals, (red, orange, green))
+        conditional_format(ws, 'K16', f_vals, (red, orange, green))
 
         # set comments
-        self.wsw.merge_cells('B24:L24')
-        self.wsw.merge_cells('B25:l48')
-        set_vertical_cells(self.wsw, 'B24', [k for k in self.comment], font_bold,
-            Alignment())
-        set_vertical_cells(self.wsw, 'B25', [v for v in self.comment.values()],
-            font_normal, Alignment(vertical='top', wrap_text=True))
+        ws.merge_cells('B24:L24')
+        ws.merge_cells('B25:L48')
+        set_column(ws, 24, 2, list(self.comment), 'bold')
+        set_column(ws, 25, 2, list(self.comment.values()), 'normal_wrap')
 
         # add graphs
         width, height = IMG_SIZE
-
-        img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/cumul_app_ctm.png')
-        img_daily_prod.width = width
-        img_daily_prod.height = height
-        self.wsw.add_image(img_daily_prod, 'C50')
-
-        img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/pie_proj_terrain.png')
-        img_daily_prod.width = width
-        img_daily_prod.height = height
-        self.wsw.add_image(img_daily_prod, 'H50')
-
-        img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/rec_hours.png')
-        img_daily_prod.width = width
-        img_daily_prod.height = height
-        self.wsw.add_image(img_daily_prod, 'C64')
-
-        img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/app_ctm_ratio.png')
-        img_daily_prod.width = width
-        img_daily_prod.height = height
-        self.wsw.add_image(img_daily_prod, 'H64')
+        for graph_name, anchor in [
+                ('cumul_app_ctm', 'C50'), ('pie_proj_terrain', 'H50'),
+                ('rec_hours', 'C64'), ('app_ctm_ratio', 'H64')]:
+            img_graph = drawing.image.Image(self.graph_files[graph_name])
+            img_graph.width = width
+            img_graph.height = height
+            ws.add_image(img_graph, anchor)
 
         # set borders
-        set_outer_border(self.wsw, 'B2:L76')
-        set_outer_border(self.wsw, 'B2:L2')
-        set_outer_border(self.wsw, 'J4:L4')
-        set_outer_border(self.wsw, 'J5:L9')
-        set_outer_border(self.wsw, 'B11:F11')
-        set_outer_border(self.wsw, 'B12:F23')
-        set_outer_border(self.wsw, 'G11:L11')
-        set_outer_border(self.wsw, 'G12:L23')
-        set_outer_border(self.wsw, 'B24:L24')
-        set_outer_border(self.wsw, 'B25:L48')
+        for min_row, min_col, max_row, max_col in [
+                (2, 2, 76, 12), (2, 2, 2, 12), (4, 10, 4, 12), (5, 10, 9, 12),
+                (11, 2, 11, 6), (12, 2, 23, 6), (11, 7, 11, 12), (12, 7, 23, 12),
+                (24, 2, 24, 12), (25, 2, 48, 12)]:
+            set_outer_border_range(ws, min_row, min_col, max_row, max_col)
+
+    @staticmethod
+    def set_times_titles(ws, row, title):
+        ''' sets the title in row and the titles of the time groups in the next row
+        '''
+        ws.merge_cells(start_row=row, start_column=2, end_row=row, end_column=22)
+        set_row(ws, row, 2, [title], 'bold_center')
+        for min_col, max_col, group_title in [
+                (3, 8, 'Operational time'), (9, 12, 'Standby time'), (13, 19, 'Downtime'),
+                (20, 22, 'Totals')]:
+            ws.merge_cells(
+                start_row=row + 1, start_column=min_col, end_row=row + 1,
+                end_column=max_col)
+            set_row(ws, row + 1, min_col, [group_title], 'bold_center')
+            set_outer_border_range(ws, row + 1, min_col, row + 1, max_col)
+
+    @staticmethod
+    def set_times_row(ws, row, values):
+        set_row(ws, row, 2, values, 'normal_right')
+        ws.cell(row=row, column=2).style = 'normal_center'
+        format_range(ws, row, 3, row, 22, number_format=float_hide_zero)
 
     def create_tab_times(self):
         ''' method to create excel weekly tab for times
         '''
-        set_column_widths(self.wst, 'A',
+        ws = self.wst
+        set_column_widths(ws, 'A',
             [0.94, 21.56, 9.22, 8.33, 8.33, 8.33, 8.33, 8.33,
             10.11, 12.33, 9.89, 8.33,
             8.33, 8.33, 8.33, 8.33, 8.33, 8.33, 8.33, 8.33,
@@ -251,280 +219,165 @@ class ExcelWeekReport(_graph_backend.Mixin):
             ]
         )
         # set day times
-        self.wst.merge_cells('B1:V1')
-        set_vertical_cells(self.wst, 'B1', ['Daily times'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('C2:H2')
-        set_vertical_cells(self.wst, 'C2', ['Operational time'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('I2:L2')
-        set_vertical_cells(self.wst, 'I2', ['Standby time'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('M2:S2')
-        set_vertical_cells(self.wst, 'M2', ['Downtime'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('T2:V2')
-        set_vertical_cells(self.wst, 'T2', ['Totals'], font_bold,
-            Alignment(horizontal='center'))
-
-        set_horizontal_cells(self.wst, 'B3', self.days_times['header'], font_bold,
-            Alignment(horizontal='center', vertical='top', wrap_text=True,))
-
-        row, col = get_row_column('B4')
+        self.set_times_titles(ws, 1, 'Daily times')
+        set_row(ws, 3, 2, self.days_times['header'], 'bold_header')
+
         weeks_total = np.zeros(len(self.days_times[0]) - 1)
         for key in range(0, 7):
             vals = self.days_times[key]
-            loc = col + str(row + key)
-            set_horizontal_cells(self.wst, loc, vals, font_normal,
-                Alignment(horizontal='right'))
-
-            self.wst[f'B{row + key}'].alignment = Alignment(horizontal='center')
-            format_range = f'C{row + key}:V{row + key}'
-            format_horizontal(self.wst, format_range, float_hide_zero)
-
+            self.set_times_row(ws, 4 + key, vals)
             weeks_total += nan_array(vals[1:]).astype(np.float)
 
-        set_vertical_cells(self.wst, 'B11', ['Weeks total'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wst, 'C11', weeks_total, font_bold,
-            Alignment(horizontal='right'))
-        format_horizontal(self.wst, 'C11:V11', '0.00')
-
-        # set borders day times
-        set_outer_border(self.wst, 'C2:H2')
-        set_outer_border(self.wst, 'I2:L2')
-        set_outer_border(self.wst, 'M2:S2')
-        set_outer_border(self.wst, 'T2:V2')
-        set_border(self.wst, 'B3:v11')
+        set_row(ws, 11, 2, ['Weeks total'], 'bold_center')
+        set_row(ws, 11, 3, weeks_total, 'bold_right')
+        format_range(ws, 11, 3, 11, 22, number_format='0.00')
+        set_border_range(ws, 3, 2, 11, 22)
 
         # set week times
-        self.wst.merge_cells('B13:V13')
-        set_vertical_cells(self.wst, 'B13', ['Weekly times'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('C14:H14')
-        set_vertical_cells(self.wst, 'C14', ['Operational time'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('I14:L14')
-        set_vertical_cells(self.wst, 'I14', ['Standby time'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('M14:S14')
-        set_vertical_cells(self.wst, 'M14', ['Downtime'], font_bold,
-            Alignment(horizontal='center'))
-        self.wst.merge_cells('T14:V14')
-        set_vertical_cells(self.wst, 'T14', ['Totals'], font_bold,
-            Alignment(horizontal='center'))
-
-        set_horizontal_cells(self.wst, 'B15', self.weeks_times['header'], font_bold,
-            Alignment(horizontal='center', vertical='top', wrap_text=True,))
-
-        row, col = get_row_column('B16')
+        self.set_times_titles(ws, 13, 'Weekly times')
+        set_row(ws, 15, 2, self.weeks_times['header'], 'bold_header')
         for key in range(0, 6):
-            vals = self.weeks_times[key]
-            loc = col + str(row + key)
-            set_horizontal_cells(self.wst, loc, vals, font_normal,
-                Alignment(horizontal='right'))
-
-            self.wst[f'B{row + key}'].alignment = Alignment(horizontal='center')
-            format_range = f'C{row + key}:V{row + key}'
-            format_horizontal(self.wst, format_range, float_hide_zero)
-
-        # set borders week times
-        set_outer_border(self.wst, 'C14:H14')
-        set_outer_border(self.wst, 'I14:L14')
-        set_outer_border(self.wst, 'M14:S14')
-        set_outer_border(self.wst, 'T14:V14')
-        set_border(self.wst, 'B15:v21')
-        set_color(self.wst, 'B21:V21', color=lightblue)
+            self.set_times_row(ws, 16 + key, self.weeks_times[key])
+
+        set_border_range(ws, 15, 2, 21, 22)
+        format_range(ws, 21, 2, 21, 22, fill=lightblue)
+
+    @staticmethod
+    def set_production_row(ws, row, values):
+        set_row(ws, row, 2, values, 'normal_right')
+        ws.cell(row=row, column=2).style = 'normal_center'
+        format_range(ws, row, 3, row, 3, number_format=int_hide_zero)
+        format_range(ws, row, 4, row, 4, number_format=float_hide_zero)
+        format_range(ws, row, 5, row, 12, number_format=int_hide_zero)
+        format_range(ws, row, 13, row, 13, number_format='0.000;-0;;@')
+
+    @staticmethod
+    def set_terrain_table(ws, col, title, terrain):
+        ''' sets the table with the VPs and percentage of the terrain types from
+            column col
+        '''
+        ws.merge_cells(start_row=22, start_column=col, end_row=22, end_column=col + 2)
+        set_row(ws, 22, col, [title], 'bold_center')
+        set_row(ws, 23, col + 1, ['VPs', 'Percentage'], 'bold_center')
+        set_column(ws, 24, col, list(terrain), 'normal_left')
+
+        vals = []
+        percs = []
+        for val in terrain.values():
+            vals.append(val)
+            if terrain['total'] > 0:
+                perc = val / terrain['total']
+
+            else:
+                perc = np.nan
+
+            percs.append(perc)
+
+        set_column(ws, 24, col + 1, vals, 'normal_right')
+        set_column(ws, 24, col + 2, percs, 'normal_right')
+        format_range(ws, 24, col + 1, 30, col + 1, number_format='#,##0')
+        format_range(ws, 24, col + 2, 30, col + 2, number_format='0.00%')
+        set_border_range(ws, 23, col + 1, 23, col + 2)
+        set_border_range(ws, 24, col, 30, col + 2)
 
     def create_tab_production(self):
         ''' method to create excel weekly tab for production
         '''
-        set_column_widths(self.wsp, 'A',
+        ws = self.wsp
+        set_column_widths(ws, 'A',
             [0.94, 23.50, 12.33, 12.33, 12.33, 12.33, 12.33, 12.33, 12.33, 12.33, 12.33,
             ]
         )
         # set day production
-        self.wsp.merge_cells('B1:K1')
-        set_vertical_cells(self.wsp, 'B1', ['Daily production'], font_bold,
-            Alignment(horizontal='center'))
+        ws.merge_cells('B1:K1')
+        set_row(ws, 1, 2, ['Daily production'], 'bold_center')
+        set_row(ws, 2, 2, self.days_prod['header'], 'bold_header')
 
-        set_horizontal_cells(self.wsp, 'B2', self.days_prod['header'], font_bold,
-            Alignment(horizontal='center', vertical='top', wrap_text=True,))
-
-        row, col = get_row_column('B3')
         weeks_total = np.zeros(len(self.days_prod[0])-2)
         for key in range(0, 7):
             vals = self.days_prod[key]
-            loc = col + str(row + key)
-            set_horizontal_cells(self.wsp, loc, vals, font_normal,
-                Alignment(horizontal='right'))
-
-            self.wsp[f'B{row + key}'].alignment = Alignment(horizontal='center')
-            format_range = f'C{row + key}:C{row + key}'
-            format_horizontal(self.wsp, format_range, int_hide_zero)
-            format_range = f'D{row + key}:D{row + key}'
-            format_horizontal(self.wsp, format_range, float_hide_zero)
-            format_range = f'E{row + key}:L{row + key}'
-            format_horizontal(self.wsp, format_range, int_hide_zero)
-            format_range = f'M{row + key}:M{row + key}'
-            format_horizontal(self.wsp, format_range, '0.000;-0;;@')
-
+            self.set_production_row(ws, 3 + key, vals)
             # sum for indexes 1..10, skip index 0 date and 11 qc_field
             weeks_total += nan_array(vals[1:-1]).astype(np.float)
 
         # skip the 3rd and 6th elements
         vals = [*weeks_total[0:2], '', *weeks_total[3:]]
-        set_vertical_cells(self.wsp, 'B10', ['Weeks total'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wsp, 'C10', vals, font_bold,
-            Alignment(horizontal='right'))
+        set_row(ws, 10, 2, ['Weeks total'], 'bold_center')
+        set_row(ws, 10, 3, vals, 'bold_right')
         # average vp/ hr
-        set_horizontal_cells(self.wsp, 'E10', [self.weeks_prod[5][3]], font_bold,
-            Alignment(horizontal='right'))
+        set_row(ws, 10, 5, [self.weeks_prod[5][3]], 'bold_right')
         # average qc_field
-        set_horizontal_cells(self.wsp, 'M10', [self.weeks_prod[5][11]], font_bold,
-            Alignment(horizontal='right'))
-        format_horizontal(self.wsp, 'C10:C10', '#,##0')
-        format_horizontal(self.wsp, 'D10:D10', '0.00')
-        format_horizontal(self.wsp, 'E10:K10', '#,##0')
-        format_horizontal(self.wsp, 'M10:M10', '0.000')
+        set_row(ws, 10, 13, [self.weeks_prod[5][11]], 'bold_right')
+        format_range(ws, 10, 3, 10, 3, number_format='#,##0')
+        format_range(ws, 10, 4, 10, 4, number_format='0.00')
+        format_range(ws, 10, 5, 10, 11, number_format='#,##0')
+        format_range(ws, 10, 13, 10, 13, number_format='0.000')
 
         # set borders
-        set_border(self.wsp, 'B2:M10')
+        set_border_range(ws, 2, 2, 10, 13)
 
         # set week production
-        self.wsp.merge_cells('B13:K13')
-        set_vertical_cells(self.wsp, 'B13', ['Weekly production'], font_bold,
-            Alignment(horizontal='center'))
-
-        set_horizontal_cells(self.wsp, 'B14', self.weeks_prod['header'], font_bold,
-            Alignment(horizontal='center', vertical='top', wrap_text=True,))
-
-        row, col = get_row_column('B15')
+        ws.merge_cells('B13:K13')
+        set_row(ws, 13, 2, ['Weekly production'], 'bold_center')
+        set_row(ws, 14, 2, self.weeks_prod['header'], 'bold_header')
         for key in range(0, 6):
-            vals = self.weeks_prod[key]
-            loc = col + str(row + key)
-            set_horizontal_cells(self.wsp, loc, vals, font_normal,
-                Alignment(horizontal='right'))
-
-            self.wsp[f'B{row + key}'].alignment = Alignment(horizontal='center')
-            format_range = f'C{row + key}:C{row + key}'
-            format_horizontal(self.wsp, format_range, int_hide_zero)
-            format_range = f'D{row + key}:D{row + key}'
-            format_horizontal(self.wsp, format_range, float_hide_zero)
-            format_range = f'E{row + key}:L{row + key}'
-            format_horizontal(self.wsp, format_range, int_hide_zero)
-            format_range = f'M{row + key}:M{row + key}'
-            format_horizontal(self.wsp, format_range, '0.000;-0;;@')
+            self.set_production_row(ws, 15 + key, self.weeks_prod[key])
 
         # set borders
-        set_border(self.wsp, 'B14:M20')
-        set_color(self.wsp, 'B20:M20', color=lightblue)
-
-        # set terrain types for week
-        self.wsp.merge_cells('C22:E22')
-        set_vertical_cells(self.wsp, 'C22', ['Week terrain'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wsp, 'D23', ['VPs', 'Percentage'], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsp, 'C24', [key for key in self.week_terrain],
-            font_normal, Alignment(horizontal='left'))
-
-        vals = []
-        percs = []
-        for val in self.week_terrain.values():
-            vals.append(val)
-            if self.week_terrain['total'] > 0:
-                perc = val / self.week_terrain['total']
-
-            else:
-                perc = np.nan
-
-            percs.append(perc)
-
-        set_vertical_cells(self.wsp, 'D24', vals, font_normal,
-            Alignment(horizontal='right'))
-        set_vertical_cells(self.wsp, 'E24', percs, font_normal,
-            Alignment(horizontal='right'))
-        format_vertical(self.wsp, 'D24:D30', '#,##0')
-        format_vertical(self.wsp, 'E24:E30', '0.00%')
-        set_border(self.wsp, 'D23:E23')
-        set_border(self.wsp, 'C24:E30')
-
-        # set terrain types for project
-        self.wsp.merge_cells('G22:I22')
-        set_vertical_cells(self.wsp, 'G22', ['Project terrain'], font_bold,
-            Alignment(horizontal='center'))
-        set_horizontal_cells(self.wsp, 'H23', ['VPs', 'Percentage'], font_bold,
-            Alignment(horizontal='center'))
-        set_vertical_cells(self.wsp, 'G24', [key for key in self.proj_terrain],
-            font_normal, Alignment(horizontal='left'))
-
-        vals = []
-        percs = []
-        for val in self.proj_terrain.values():
-            vals.append(val)
-            if self.proj_terrain['total'] > 0:
-                perc = val / self.proj_terrain['total']
+        set_border_range(ws, 14, 2, 20, 13)
+        format_range(ws, 20, 2, 20, 13, fill=lightblue)
 
-            else:
-                perc = np.nan
-
-            percs.append(perc)
-
-        set_vertical_cells(self.wsp, 'H24', vals, font_normal,
-            Alignment(horizontal='right'))
-        set_vertical_cells(self.wsp, 'I24', percs, font_normal,
-            Alignment(horizontal='right'))
-        format_vertical(self.wsp, 'H24:H30', '#,##0')
-        format_vertical(self.wsp, 'I24:I30', '0.00%')
-        set_border(self.wsp, 'H23:I23')
-        set_border(self.wsp, 'G24:I30')
+        # set terrain types for week and project
+        self.set_terrain_table(ws, 3, 'Week terrain', self.week_terrain)
+        self.set_terrain_table(ws, 7, 'Project terrain', self.proj_terrain)
 
     def create_tab_graphs(self):
         width, height = IMG_SIZE
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/bar_week_production.png')
+            self.graph_files['bar_week_production'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'B2')
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/pie_week_terrain.png')
+            self.graph_files['pie_week_terrain'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'H2')
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/pie_week_times.png')
+            self.graph_files['pie_week_times'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'B16')
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/bar_day_production.png')
+            self.graph_files['bar_day_production'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'H16')
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/bar_day_rechours.png')
+            self.graph_files['bar_day_rechours'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'B30')
 
         img_daily_prod = drawing.image.Image(
-            self.media_dir / 'images/bar_day_vphr.png')
+            self.graph_files['bar_day_vphr'])
         img_daily_prod.width = width
         img_daily_prod.height = height
         self.wsg.add_image(img_daily_prod, 'H30')
 
     def create_weekreport(self):
+        self.graph_files = {
+            **self.create_daily_graphs(self.report_totals),
+            **self.create_weekly_graphs(self.report_totals),
+        }
         self.create_tab_weekly()
         self.create_tab_times()
         self.create_tab_production()
-        self.create_weekly_graphs()
         self.create_tab_graphs()
         return save_excel(self.wb)
 
@@ -535,12 +388,12 @@ def collate_excel_weekreport_data(day):
     project = day.project
 
     report_data = {}
-    _, totals_prod, totals_time, _, totals_hse = r_iface.calc_totals(day)
+    report_totals = r_iface.calc_totals(day)
+    totals_prod = report_totals.prod_total
+    totals_time = report_totals.times_total
+    totals_hse = report_totals.hse_total
     days, weeks = w_iface.collate_weekdata(day)
-    (
-        _, report_data['prod_series'], report_data['time_series'],
-        _, _
-    ) = r_iface.series
+    report_data['report_totals'] = report_totals
 
     report_data['report_date'] = day.production_date.strftime('%#d %b %Y')
     report_data['month_days'] = day.production_date.day
@@ -0,0 +1,230 @@
+''' module with the plot functions of the graphs. The module only depends on
+    matplotlib and numpy, so that graphs can be rendered in worker processes
+'''
+import io
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import matplotlib.ticker as mtick
+from seismicreport.vars import TICK_SPACING_PROD, TICK_SPACING_CUMUL, TICK_DATE_FORMAT
+from seismicreport.utils.utils_funcs import nan_array
+
+terrain_labels = ['Flat', 'Rough', 'Facilities', 'Dunes', 'Sabkha']
+terrain_zorders = [2, 3, 4, 6, 5]
+
+
+def format_date_axis(ax):
+    ax.xaxis.set_major_formatter(TICK_DATE_FORMAT)
+    ax.tick_params(axis='x', labelrotation=70)
+
+
+def plot_daily_prod(fig, data):
+    ''' stacked bar plot of daily production
+    '''
+    ax = fig.subplots()
+    date_series = data['date_series']
+    base = np.zeros(len(date_series))
+    width = 1
+    for label, zorder, t_series in zip(
+            terrain_labels, terrain_zorders, data['terrain_series']):
+        if any(t_series):
+            ax.bar(date_series, t_series, width, bottom=base, label=label, zorder=zorder)
+            base += t_series
+
+    format_date_axis(ax)
+    ax.legend()
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}k'))
+    ax.yaxis.set_major_locator(mtick.MultipleLocator(TICK_SPACING_PROD))
+    ax.yaxis.grid(zorder=1)
+    ax.tick_params(axis='both', labelsize=7)
+
+
+def plot_cumul_prod(fig, data):
+    ''' line plot of cumulative production
+    '''
+    ax = fig.subplots()
+    date_series = data['date_series']
+    base = np.zeros(len(date_series))
+    for label, zorder, t_series in zip(
+            terrain_labels, terrain_zorders, data['terrain_series']):
+        t_cum = np.cumsum(t_series)
+        if any(t_cum):
+            base += t_cum
+            ax.plot(date_series, base, label=label, zorder=zorder)
+
+    format_date_axis(ax)
+    ax.legend()
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}k'))
+    ax.yaxis.set_major_locator(mtick.MultipleLocator(TICK_SPACING_CUMUL))
+    ax.yaxis.grid(zorder=1)
+    ax.tick_params(axis='both', labelsize=7)
+
+
+def plot_rec_hours(fig, data):
+    ''' line plot recording hours
+    '''
+    ax = fig.subplots()
+    date_series = data['date_series']
+    rec_hours_series = data['rec_hours_series']
+    target_series = np.ones(len(rec_hours_series)) * data['target_rec_hours']
+    ax.plot(date_series, target_series, label="Target", zorder=2)
+    ax.plot(date_series, rec_hours_series, label="Recording hours", zorder=3)
+    format_date_axis(ax)
+    ax.yaxis.grid(zorder=1)
+    ax.tick_params(axis='both', labelsize=7)
+    ax.legend()
+
+
+def plot_app_ctm_ratio(fig, data):
+    ''' line plot ratio APP / CTM
+    '''
+    ax = fig.subplots()
+    date_series = data['date_series']
+    appctm_series = data['appctm_series']
+    target_series = np.ones(len(appctm_series))
+    ax.plot(date_series, target_series, label="Target", zorder=2)
+    ax.plot(date_series, appctm_series, label="APP/CTM", zorder=3)
+    ax.yaxis.set_major_formatter(mtick.PercentFormatter(xmax=1))
+    ax.yaxis.grid(zorder=1)
+    format_date_axis(ax)
+    ax.set_yticks([0.0, 0.25, 0.5, 0.75, 1.0, 1.25, 1.5])
+    ax.tick_params(axis='both', labelsize=7)
+    ax.legend()
+
+
+def plot_app_ctm(fig, data):
+    ''' line plot CTM and app
+    '''
+    ax = fig.subplots()
+    ax.plot(data['date_series'], data['ctm_series'], label="CTM", zorder=2)
+    ax.plot(data['date_series'], data['app_series'], label="APP", zorder=3)
+    format_date_axis(ax)
+    ax.yaxis.grid(zorder=1)
+    ax.tick_params(axis='both', labelsize=7)
+    ax.legend()
+
+
+def plot_cumul_app_ctm(fig, data):
+    ''' line plot of cumulative APP & CTM
+    '''
+    ax = fig.subplots()
+    app_cum_series = np.cumsum(data['app_series']) * 0.001
+    ctm_cum_series = np.cumsum(nan_array(data['ctm_series'])) * 0.001
+    ax.plot(data['date_series'], ctm_cum_series, label="CTM", zorder=2)
+    ax.plot(data['date_series'], app_cum_series, label="APP", zorder=3)
+    format_date_axis(ax)
+    ax.yaxis.grid(zorder=1)
+    ax.tick_params(axis='both', labelsize=7)
+    ax.legend()
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter('{x:,.0f}k'))
+    ax.yaxis.set_major_locator(mtick.MultipleLocator(TICK_SPACING_CUMUL))
+
+
+def plot_pie(fig, data):
+    ax = fig.subplots()
+    ax.set_title(data['title'])
+    ax.pie(data['values'], labels=data['labels'], autopct='%1.2f%%')
+
+
+def plot_bar(fig, data):
+    ''' bar chart with the values annotated on top of the bars
+    '''
+    ax = fig.subplots()
+    labels = data['labels']
+    values = data['values']
+    ax.bar(labels, values, zorder=2)
+    for label, val in zip(labels, values):
+        ax.annotate(
+            data['annotation'].format(val), xy=(label, val), ha='center', va='bottom')
+
+    if data['ylim']:
+        ax.set_ylim(*data['ylim'])
+
+    ax.yaxis.set_major_formatter(mtick.StrMethodFormatter(data['yformat']))
+    ax.yaxis.grid(zorder=1)
+    ax.set_title(data['title'])
+    ax.tick_params(axis='both', labelsize=7)
+
+
+plot_functions = {
+    'daily_prod': plot_daily_prod,
+    'cumul_prod': plot_cumul_prod,
+    'rec_hours': plot_rec_hours,
+    'app_ctm_ratio': plot_app_ctm_ratio,
+    'app_ctm': plot_app_ctm,
+    'cumul_app_ctm': plot_cumul_app_ctm,
+    'pie_week_terrain': plot_pie,
+    'pie_proj_terrain': plot_pie,
+    'pie_week_times': plot_pie,
+    'bar_week_production': plot_bar,
+    'bar_day_production': plot_bar,
+    'bar_day_rechours': plot_bar,
+    'bar_day_vphr': plot_bar,
+}
+
+
+def render_graph(graph_name, data) -> bytes:
+    ''' renders the graph on a new figure
+        returns: png image
+    '''
+    fig = Figure()
+    FigureCanvasAgg(fig)
+    plot_functions[graph_name](fig, data)
+    fig.tight_layout()
+    png_buffer = io.BytesIO()
+    fig.savefig(png_buffer, format='png')
+    return png_buffer.getvalue()
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_executor(workers):
+    ''' returns: the process pool of this process, a forked process gets its own pool
+    '''
+    global _executor, _executor_pid
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ProcessPoolExecutor(max_workers=workers)
+            _executor_pid = os.getpid()
+
+        return _executor
+
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None and _executor_pid == os.getpid():
+            _executor.shutdown(wait=False)
+
+        _executor = None
+
+
+def render_graphs(graphs_data, workers=1) -> dict:
+    ''' renders the graphs concurrently in a process pool of workers processes, or
+        in this process if workers is 1 or there is only one graph. The graph data
+        must be picklable (numpy arrays, lists, dates, strings and numbers)
+        returns: dict with the png image by graph name
+    '''
+    if workers < 2 or len(graphs_data) < 2:
+        return {graph_name: render_graph(graph_name, data)
+                for graph_name, data in graphs_data.items()}
+
+    try:
+        executor = get_executor(workers)
+        futures = {
+            graph_name: executor.submit(render_graph, graph_name, data)
+            for graph_name, data in graphs_data.items()
+        }
+        return {graph_name: future.result() for graph_name, future in futures.items()}
+
+    except BrokenProcessPool:
+        # a worker has died, start a new pool next time and render in this process
+        shutdown_executor()
+        return render_graphs(graphs_data, workers=1)
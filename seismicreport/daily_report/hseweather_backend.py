@@ -1,9 +1,7 @@
-from datetime import timedelta
 import warnings
 import numpy as np
-from django.db.models import Q
 from daily_report.models.daily_models import HseWeather
-from seismicreport.vars import WEEKDAYS, hse_weather_schema
+from seismicreport.vars import hse_weather_schema
 from seismicreport.utils.utils_funcs import nan_array
 
 
@@ -42,71 +40,27 @@ class Mixin:
 
         return d_hse
 
-    @staticmethod
-    def week_hse_totals(daily):
-        if daily:
-            end_date = daily.production_date
-            start_date = end_date - timedelta(days=WEEKDAYS-1)
-
-            hse_query = HseWeather.objects.filter(
-                Q(daily__production_date__gte=start_date),
-                Q(daily__production_date__lte=end_date),
-                daily__project=daily.project,
-            )
-
-        else:
-            return {f'week_{key}': '' for key in hse_weather_schema}
-
-        if not hse_query:
-            return {f'week_{key}': '' for key in hse_weather_schema}
-
-        w_hse = {f'week_{key}': sum(nan_array([val[key] for val in hse_query.values()]))
-                 for key in hse_weather_schema[:12]}
-
-        return w_hse
-
-    @staticmethod
-    def month_hse_totals(daily):
-        if daily:
-            hse_query = HseWeather.objects.filter(
-                Q(daily__production_date__year=daily.production_date.year) &
-                Q(daily__production_date__month=daily.production_date.month) &
-                Q(daily__production_date__day__lte=daily.production_date.day),
-                daily__project=daily.project,
-            )
-        else:
-            hse_query = None
-
-        if not hse_query:
-            return {f'month_{key}': '' for key in hse_weather_schema}
-
-        m_hse = {f'month_{key}': sum(nan_array([val[key] for val in hse_query.values()]))
-                 for key in hse_weather_schema[:12]}
-
-        return m_hse
-
     @staticmethod
     def proj_hse_totals(daily):
         if daily:
-            hse_query = HseWeather.objects.filter(
+            hse_rows = list(HseWeather.objects.filter(
                 daily__production_date__lte=daily.production_date,
                 daily__project=daily.project,
-            ).order_by('daily__production_date')
+            ).order_by('daily__production_date').values_list(
+                'daily__production_date', *hse_weather_schema[:12]))
 
         else:
-            hse_query = None
+            hse_rows = None
 
-        if not hse_query:
+        if not hse_rows:
             return {f'proj_{key}': '' for key in hse_weather_schema}, None
 
-        hse_series = {
-            f'{key}_series': nan_array([val[key] for val in hse_query.values()])
-            for key in hse_weather_schema[:12]}
-        hse_series['date_series'] = np.array(
-            [val.daily.production_date for val in hse_query])
-
+        dates, *hse_columns = zip(*hse_rows)
+        hse_series = {f'{key}_series': nan_array(column)
+                      for key, column in zip(hse_weather_schema[:12], hse_columns)}
+        hse_series['date_series'] = np.array(dates)
 
-        p_hse = {f'proj_{key}': sum(nan_array([val[key] for val in hse_query.values()]))
+        p_hse = {f'proj_{key}': sum(hse_series[f'{key}_series'])
                  for key in hse_weather_schema[:12]}
 
         return p_hse, hse_series
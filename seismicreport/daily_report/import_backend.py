@@ -0,0 +1,153 @@
+''' module to import a batch of daily reports, for example to backfill a project.
+    The workbooks are read in parallel in worker processes and are inserted in
+    date order in a single transaction
+'''
+import shutil
+import zipfile
+from pathlib import Path
+from django.conf import settings
+from django.db import transaction
+from daily_report.models.project_models import Project
+from daily_report.report_reader import read_reports
+from seismicreport.utils.plogger import Logger, timed
+
+logger = Logger.getlogger()
+REPORT_SUFFIXES = ('.xlsx', '.xlsm', '.xls')
+
+
+def is_report_file(file_name):
+    return str(file_name).lower().endswith(REPORT_SUFFIXES)
+
+
+def extract_zip_file(zip_file, target_dir):
+    ''' extracts the daily report workbooks of zip_file (file name or file object) to
+        target_dir, each in its own sub directory to keep the original file names
+        raises: ValueError if the workbooks exceed IMPORT_ZIP_MAX_FILES or
+                IMPORT_ZIP_MAX_SIZE, before anything is extracted
+        returns: list of the extracted file names
+    '''
+    file_names = []
+    with zipfile.ZipFile(zip_file) as zip_ref:
+        members = [
+            member for member in zip_ref.infolist()
+            if not member.is_dir() and is_report_file(member.filename)]
+        if len(members) > settings.IMPORT_ZIP_MAX_FILES:
+            raise ValueError(
+                f'zip file has more than {settings.IMPORT_ZIP_MAX_FILES} workbooks')
+
+        # the file size in the header bounds the bytes a member is extracted to
+        if sum(member.file_size for member in members) > settings.IMPORT_ZIP_MAX_SIZE:
+            raise ValueError(
+                f'zip file workbooks exceed {settings.IMPORT_ZIP_MAX_SIZE} bytes')
+
+        for member in members:
+
+            # take the base name only, so a member can not be written outside
+            # target_dir
+            file_dir = Path(target_dir) / f'zip_{len(file_names)}'
+            file_dir.mkdir(parents=True)
+            file_name = file_dir / Path(member.filename).name
+            with zip_ref.open(member) as src, open(file_name, 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+
+            file_names.append(file_name)
+
+    return file_names
+
+
+def save_upload_files(upload_files, target_dir):
+    ''' saves the uploaded daily report workbooks and zip files in target_dir
+        returns: tuple list of the workbook file names and list of results for files
+                 that are not daily report workbooks
+    '''
+    file_names = []
+    results = []
+    for i, upload_file in enumerate(upload_files):
+        if upload_file.name.lower().endswith('.zip'):
+            try:
+                file_names += extract_zip_file(upload_file, Path(target_dir) / f'{i}')
+
+            except zipfile.BadZipFile:
+                results.append({
+                    'file': upload_file.name, 'date': None,
+                    'message': 'invalid zip file',
+                })
+
+            except ValueError as error:
+                results.append(
+                    {'file': upload_file.name, 'date': None, 'message': str(error)})
+
+            continue
+
+        if not is_report_file(upload_file.name):
+            results.append(
+                {'file': upload_file.name, 'date': None, 'message': 'not a workbook'})
+            continue
+
+        file_dir = Path(target_dir) / f'{i}'
+        file_dir.mkdir(parents=True)
+        file_name = file_dir / Path(upload_file.name).name
+        with open(file_name, 'wb') as dst:
+            for chunk in upload_file.chunks():
+                dst.write(chunk)
+
+        file_names.append(file_name)
+
+    return file_names, results
+
+
+class Mixin:
+
+    @timed(logger, print_log=True)
+    def import_report_files(self, project, file_names, workers=1):
+        ''' imports the daily report workbooks file_names for project. The workbooks
+            are read and validated in workers processes and the valid reports are
+            saved in date order in a single transaction, where for a date in more
+            than one workbook the last workbook is taken.
+            returns: list of results with keys file, date (None if not imported) and
+                     message for each workbook
+        '''
+        # fetch the source and receiver types and blocks once for all reports
+        project = Project.objects.prefetch_related(
+            'sourcetypes', 'receivertypes', 'blocks').get(id=project.id)
+
+        results = []
+        reports = {}
+        for file_name, day_cells, errors in read_reports(file_names, workers=workers):
+            result = {'file': Path(file_name).name, 'date': None, 'message': ''}
+            results.append(result)
+            if errors:
+                result['message'] = ', '.join(errors)
+                continue
+
+            if project.project_prefix != self.get_value(day_cells, 'project'):
+                result['message'] = (
+                    f'report is for project {self.get_value(day_cells, "project")}')
+                continue
+
+            report_values = self.read_report_values(project, day_cells)
+            if not report_values:
+                result['message'] = 'source or receiver types do not match the project'
+                continue
+
+            production_date = report_values['production_date']
+            if production_date in reports:
+                reports[production_date][0]['message'] = (
+                    f'{production_date} is replaced by {result["file"]}')
+
+            reports[production_date] = (result, report_values)
+
+        if not reports:
+            return results
+
+        production_dates = sorted(reports)
+        with transaction.atomic():
+            for production_date in production_dates:
+                result, report_values = reports[production_date]
+                self.save_report_values(project, report_values, update_totals=False)
+                result['date'] = production_date
+                result['message'] = 'imported'
+
+            self.update_cumulative_totals(project, production_dates[0])
+
+        return results
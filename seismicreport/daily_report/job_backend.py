@@ -0,0 +1,210 @@
+''' module for the queue of the weekly and mpr excel report jobs. The web request
+    only queues a job, the report worker (management command run_report_worker)
+    claims the queued jobs and creates the reports in a pool of processes, the
+    created file is stored as a blob to be downloaded when the job is done.
+'''
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+from django.db import connections, transaction
+from django.utils import timezone
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily
+from daily_report.models.job_models import ReportJob
+from daily_report.models.snapshot_models import ReportSnapshot
+from daily_report.snapshot_backend import (
+    get_snapshot, create_week_excel, create_mpr_excel,
+)
+from seismicreport.vars import DESCR_LENGTH
+from seismicreport.utils.plogger import Logger
+
+logger = Logger.getlogger()
+REPORT_FILE_NAMES = {
+    ReportJob.WEEK_EXCEL: 'csr_week_report.xlsx',
+    ReportJob.MPR_EXCEL: 'mpr_report.xlsx',
+}
+report_creators = {
+    ReportJob.WEEK_EXCEL: create_week_excel,
+    ReportJob.MPR_EXCEL: create_mpr_excel,
+}
+# the snapshot of the same report, if current it is the result of the job
+snapshot_kinds = {
+    ReportJob.WEEK_EXCEL: ReportSnapshot.WEEK_EXCEL,
+    ReportJob.MPR_EXCEL: ReportSnapshot.MPR_EXCEL,
+}
+
+
+def enqueue_report_job(day, kind, user=None):
+    ''' queues a report job for day, a queued or running job of the same report is
+        reused and a job is done at once if the report has a current snapshot
+        returns: the job
+    '''
+    job = ReportJob.objects.filter(
+        daily=day, kind=kind, status__in=[ReportJob.QUEUED, ReportJob.RUNNING],
+    ).order_by('-created').first()
+    if job:
+        return job
+
+    snapshot = get_snapshot(day, snapshot_kinds[kind])
+    if snapshot and snapshot.excel_file_id:
+        now = timezone.now()
+        return ReportJob.objects.create(
+            daily=day, kind=kind, user=user, status=ReportJob.DONE, progress=1.0,
+            result_file_id=snapshot.excel_file_id, started=now, finished=now)
+
+    return ReportJob.objects.create(daily=day, kind=kind, user=user)
+
+
+def claim_jobs(max_jobs):
+    ''' claims up to max_jobs queued jobs, oldest first, by setting their status to
+        running only if they are still queued, so several workers can share the
+        queue
+        returns: list of the ids of the claimed jobs
+    '''
+    claimed = []
+    for job_id in ReportJob.objects.filter(status=ReportJob.QUEUED).order_by(
+            'created', 'id').values_list('id', flat=True)[:max_jobs]:
+        if ReportJob.objects.filter(id=job_id, status=ReportJob.QUEUED).update(
+                status=ReportJob.RUNNING, started=timezone.now(), progress=0.1):
+            claimed.append(job_id)
+
+    return claimed
+
+
+def requeue_stale_jobs(stale_after):
+    ''' queues again the jobs that have been running for more than stale_after
+        seconds, for example after a worker was killed
+        returns: number of queued jobs
+    '''
+    return ReportJob.objects.filter(
+        status=ReportJob.RUNNING,
+        started__lt=timezone.now() - timedelta(seconds=stale_after),
+    ).update(status=ReportJob.QUEUED, progress=0.0, started=None)
+
+
+def run_report_job(job_id):
+    ''' creates the report of the claimed job and stores the file
+        returns: status of the job, None if the job has been deleted
+    '''
+    jobs = ReportJob.objects.filter(id=job_id)
+    job = jobs.first()
+    if job is None:
+        return None
+
+    try:
+        day = Daily.objects.select_related('project').get(id=job.daily_id)
+        content = report_creators[job.kind](
+            day, set_progress=lambda progress: jobs.update(progress=progress))
+        with transaction.atomic():
+            jobs.update(
+                status=ReportJob.DONE, progress=1.0, finished=timezone.now(),
+                result_file=Blob.objects.store(content))
+
+        return ReportJob.DONE
+
+    except Exception as error:  #pylint: disable=broad-except
+        logger.exception(f'report job {job_id} failed')
+        return fail_job(job_id, f'{type(error).__name__}: {error}')
+
+
+def fail_job(job_id, message):
+    ''' sets the status of the job to failed with message
+        returns: failed status
+    '''
+    ReportJob.objects.filter(id=job_id).update(
+        status=ReportJob.FAILED, finished=timezone.now(), message=message[:DESCR_LENGTH])
+    return ReportJob.FAILED
+
+
+def close_connections():
+    ''' the forked worker processes must not share the database connections of the
+        parent process
+    '''
+    connections.close_all()
+
+
+def create_pool(workers):
+    ''' returns: pool of workers processes, which do not share the database
+                 connections of this process
+    '''
+    close_connections()
+    return ProcessPoolExecutor(max_workers=workers, initializer=close_connections)
+
+
+def get_job_status(future, job_id):
+    ''' returns: status of the job run by future, a job of which the process has
+                 died is set to failed
+    '''
+    try:
+        return future.result()
+
+    except BrokenProcessPool:
+        logger.error(f'process of report job {job_id} died')
+        return fail_job(job_id, 'the report process stopped unexpectedly')
+
+
+def process_report_queue(
+        workers=1, once=False, interval=2.0, stale_after=3600, keep_days=7,
+        report_status=None):
+    ''' runs the queued jobs in one pool of workers processes, or in this process if
+        workers is 1. A job is claimed as soon as a process is free, so a slow job
+        does not hold up the others. If a process of the pool dies, for example when
+        it runs out of memory, the jobs of the pool are set to failed and a new pool
+        is started. Runs until interrupted or, with once, until the queue is empty.
+        report_status is called with the job id and status of each finished job.
+    '''
+    report_status = report_status or (lambda job_id, status: None)
+    executor = create_pool(workers) if workers > 1 else None
+    running = {}
+    try:
+        while True:
+            requeue_stale_jobs(stale_after)
+            job_ids = claim_jobs(workers - len(running) if executor else 1)
+            for job_id in job_ids:
+                if executor:
+                    running[executor.submit(run_report_job, job_id)] = job_id
+
+                else:
+                    report_status(job_id, run_report_job(job_id))
+
+            if not running:
+                if job_ids:
+                    continue
+
+                delete_old_jobs(keep_days)
+                if once:
+                    break
+
+                time.sleep(interval)
+                continue
+
+            done, _ = wait(running, timeout=interval, return_when=FIRST_COMPLETED)
+            if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+                # all jobs of a broken pool are finished with an exception
+                done = wait(running).done
+                executor.shutdown(wait=False)
+                executor = create_pool(workers)
+
+            for future in done:
+                job_id = running.pop(future)
+                report_status(job_id, get_job_status(future, job_id))
+
+    finally:
+        if executor:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def delete_old_jobs(keep_days):
+    ''' deletes the finished jobs older than keep_days and their files if no longer
+        used
+        returns: number of deleted jobs
+    '''
+    deleted, _ = ReportJob.objects.filter(
+        status__in=[ReportJob.DONE, ReportJob.FAILED],
+        finished__lt=timezone.now() - timedelta(days=keep_days),
+    ).delete()
+    if deleted:
+        Blob.objects.delete_unused()
+
+    return deleted
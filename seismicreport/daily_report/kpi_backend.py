@@ -0,0 +1,150 @@
+''' module to maintain the daily key performance indicators (DailyKpi). The kpis
+    are calculated when a daily report is uploaded and are used for the project
+    series instead of recalculating them from the source production
+'''
+import numpy as np
+from django.db import transaction
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, TimeBreakdown, DailyKpi,
+)
+from seismicreport.vars import (
+    TCF_table, source_prod_schema, ops_time_keys, standby_keys, downtime_keys,
+    CTM_METHOD,
+)
+from seismicreport.utils.plogger import Logger, timed
+from seismicreport.utils.utils_funcs import calc_ratio
+
+logger = Logger.getlogger()
+kpi_values = ['total_sp', 'tcf', 'ctm', 'appctm', 'rate']
+
+
+def nan_to_none(value):
+    ''' nan can not be stored in the database, store as null instead
+    '''
+    return None if np.isnan(value) else float(value)
+
+
+class Mixin:
+
+    def calc_daily_kpis(self, daily):
+        ''' calculates the kpis for each sourcetype and the combined kpis of daily
+            returns: list of DailyKpi (not saved)
+        '''
+        try:
+            tb = TimeBreakdown.objects.get(daily=daily)
+            times = {
+                'rec_hours': np.nan_to_num(tb.rec_hours),
+                'ops_time': np.nansum([getattr(tb, key) for key in ops_time_keys]),
+                'standby': np.nansum([getattr(tb, key) for key in standby_keys]),
+                'downtime': np.nansum([getattr(tb, key) for key in downtime_keys]),
+            }
+
+        except TimeBreakdown.DoesNotExist:
+            times = {'rec_hours': 0, 'ops_time': 0, 'standby': 0, 'downtime': 0}
+
+        # use numpy floats so that a zero total time results in nan and not an error
+        total_time = np.float64(
+            times['ops_time'] + times['standby'] + times['downtime'])
+        standby = np.float64(times['standby'])
+
+        kpis = []
+        for prod in SourceProduction.objects.filter(
+                daily=daily).select_related('sourcetype').order_by('sourcetype'):
+            terrain_sp = [
+                np.nan_to_num(getattr(prod, key)) for key in source_prod_schema[:-1]]
+            total_sp = np.nansum(terrain_sp)
+            if total_sp > 0:
+                tcf = sum(sp / total_sp * TCF_table[key[:5]]
+                          for sp, key in zip(terrain_sp, source_prod_schema))
+
+            else:
+                tcf = np.nan
+
+            ctm = self.calc_ctm(prod.sourcetype, tcf)
+            appctm = calc_ratio(total_sp, ctm)
+            kpis.append(DailyKpi(
+                daily=daily, sourcetype=prod.sourcetype, total_sp=total_sp,
+                skips=np.nan_to_num(prod.skips), tcf=tcf, ctm=ctm, appctm=appctm,
+                total_time=total_time,
+                rate=self.calc_rate(daily, CTM_METHOD, appctm, total_time, standby),
+                **times,
+            ))
+
+        # combined kpis, ctm and tcf are weighted by the production of the sourcetype
+        total_sp = sum(kpi.total_sp for kpi in kpis)
+        ctm = 0
+        tcf = 0
+        for kpi in kpis:
+            weight = kpi.total_sp / total_sp if total_sp > 0 else 0
+            ctm += kpi.ctm * weight
+            tcf += kpi.tcf * weight
+
+        appctm = calc_ratio(total_sp, ctm) if ctm > 0 else np.nan
+        kpis.append(DailyKpi(
+            daily=daily, sourcetype=None, total_sp=total_sp,
+            skips=sum(kpi.skips for kpi in kpis), tcf=tcf, ctm=ctm, appctm=appctm,
+            total_time=total_time,
+            rate=self.calc_rate(daily, CTM_METHOD, appctm, total_time, standby),
+            **times,
+        ))
+
+        for kpi in kpis:
+            for key in ['tcf', 'ctm', 'appctm', 'rate']:
+                setattr(kpi, key, nan_to_none(getattr(kpi, key)))
+
+        return kpis
+
+    def update_daily_kpis(self, daily):
+        ''' (re)calculates and stores the kpis of daily
+        '''
+        with transaction.atomic():
+            DailyKpi.objects.filter(daily=daily).delete()
+            DailyKpi.objects.bulk_create(self.calc_daily_kpis(daily))
+
+    @timed(logger, print_log=True)
+    def rebuild_project_kpis(self, project):
+        ''' (re)calculates and stores the kpis of all dailies of project, required
+            when the project or sourcetype parameters have changed
+            returns: number of dailies
+        '''
+        if not project:
+            return 0
+
+        dailies = Daily.objects.filter(project=project).select_related('project')
+        kpis = []
+        for daily in dailies:
+            kpis += self.calc_daily_kpis(daily)
+
+        with transaction.atomic():
+            DailyKpi.objects.filter(daily__project=project).delete()
+            DailyKpi.objects.bulk_create(kpis)
+
+        return len(dailies)
+
+    @staticmethod
+    def get_kpi_series(daily, sourcetype, date_series):
+        ''' gets the kpi series up to and including the production date of daily for
+            sourcetype, or the combined series if sourcetype is None.
+            returns: dict with the kpi series or None if the stored kpis do not match
+                     the dates in date_series, in which case they have to be
+                     calculated
+        '''
+        kpi_query = DailyKpi.objects.filter(
+            daily__project=daily.project,
+            daily__production_date__lte=daily.production_date,
+            sourcetype=sourcetype,
+        ).order_by('daily__production_date').values_list(
+            'daily__production_date', *kpi_values)
+
+        kpi_rows = list(kpi_query)
+        if [row[0] for row in kpi_rows] != list(date_series):
+            return None
+
+        if not kpi_rows:
+            return {f'{key}_series': [] for key in kpi_values}
+
+        # null values are converted to nan, return lists as sum_keys replaces nan
+        # values of arrays in place
+        kpi_array = np.array([row[1:] for row in kpi_rows], dtype=float)
+        return {
+            f'{key}_series': list(kpi_array[:, i]) for i, key in enumerate(kpi_values)}
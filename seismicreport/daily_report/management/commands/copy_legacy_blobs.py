@@ -0,0 +1,19 @@
+''' management command to copy the work orders, block shapefiles and receiver
+    diagrams of the legacy binary columns to the blob table
+    usage: python manage.py copy_legacy_blobs [--clear]
+'''
+from django.core.management.base import BaseCommand
+from daily_report.project_backend import ProjectInterface
+
+
+class Command(BaseCommand):
+    help = 'Copy the legacy binary columns of the projects to the blob table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--clear', action='store_true',
+            help='set the legacy columns to null once their content is copied')
+
+    def handle(self, *args, **options):
+        copied = ProjectInterface.copy_legacy_blobs(clear=options['clear'])
+        self.stdout.write(f'{copied} legacy contents copied to the blob table')
@@ -0,0 +1,65 @@
+''' management command to import a batch of daily reports
+    usage: python manage.py import_reports --project <project name> [--workers <n>]
+           <workbook, zip file or directory> ...
+'''
+import tempfile
+from pathlib import Path
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from daily_report.models.project_models import Project
+from daily_report.report_backend import ReportInterface
+from daily_report.import_backend import is_report_file, extract_zip_file
+from daily_report.snapshot_backend import enqueue_latest_snapshots
+
+
+class Command(BaseCommand):
+    help = 'Import daily report workbooks, zip files or directories of workbooks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', help='workbook, zip file or directory')
+        parser.add_argument('--project', required=True, help='project name')
+        parser.add_argument(
+            '--workers', type=int, default=settings.IMPORT_WORKERS,
+            help='number of processes to read the workbooks')
+
+    def handle(self, *args, **options):
+        try:
+            project = Project.objects.get(project_name=options['project'])
+
+        except Project.DoesNotExist:
+            raise CommandError(f'project {options["project"]} does not exist')
+
+        with tempfile.TemporaryDirectory() as zip_dir:
+            file_names = []
+            for path in [Path(path) for path in options['paths']]:
+                if path.is_dir():
+                    file_names += sorted(
+                        file_name for file_name in path.iterdir()
+                        if is_report_file(file_name))
+
+                elif path.suffix.lower() == '.zip':
+                    try:
+                        file_names += extract_zip_file(
+                            path, Path(zip_dir) / str(len(file_names)))
+
+                    except ValueError as error:
+                        raise CommandError(f'{path}: {error}')
+
+                elif path.is_file():
+                    file_names.append(path)
+
+                else:
+                    raise CommandError(f'{path} does not exist')
+
+            results = ReportInterface('').import_report_files(
+                project, file_names, workers=options['workers'])
+
+        imported = 0
+        for result in results:
+            self.stdout.write(f'{result["file"]}: {result["message"]}')
+            imported += 1 if result['date'] else 0
+
+        self.stdout.write(f'{project.project_name}: {imported} of {len(results)} '
+                          f'reports imported')
+        if imported:
+            enqueue_latest_snapshots(project)
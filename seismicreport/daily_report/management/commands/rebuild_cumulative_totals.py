@@ -0,0 +1,26 @@
+''' management command to rebuild the cumulative totals
+    usage: python manage.py rebuild_cumulative_totals [--project <project name>]
+'''
+from django.core.management.base import BaseCommand, CommandError
+from daily_report.models.project_models import Project
+from daily_report.report_backend import ReportInterface
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the cumulative totals for a project or all projects'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--project', help='project name, if not given all projects are rebuilt')
+
+    def handle(self, *args, **options):
+        projects = Project.objects.all().order_by('project_name')
+        if options['project']:
+            projects = projects.filter(project_name=options['project'])
+            if not projects:
+                raise CommandError(f'project {options["project"]} does not exist')
+
+        rprt_iface = ReportInterface('')
+        for project in projects:
+            rprt_iface.update_cumulative_totals(project)
+            self.stdout.write(f'{project.project_name}: cumulative totals rebuilt')
@@ -0,0 +1,66 @@
+''' management command to benchmark the report pipeline on a generated project in a
+    scratch test database, the results are written as json
+    usage: python manage.py run_benchmarks [--days <days>] [--sourcetypes <n>]
+               [--receivertypes <n>] [--service-tasks <n>] [--toolboxes <n>]
+               [--repeats <n>] [--seed <n>] [--output <file>] [--compare <file>]
+'''
+import json
+import sys
+import tempfile
+from contextlib import redirect_stdout
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from daily_report.benchmarks.suite import DEFAULT_SETTINGS, run_suite, compare_results
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the report pipeline on a generated project and write json results'
+
+    def add_arguments(self, parser):
+        for name, value in DEFAULT_SETTINGS.items():
+            parser.add_argument(
+                f'--{name.replace("_", "-")}', type=int, default=value,
+                help=f'default {value}')
+
+        parser.add_argument('--output', help='json file, if not given stdout')
+        parser.add_argument(
+            '--compare', help='json file of an earlier run to compare the results with')
+
+    def handle(self, *args, **options):
+        previous = None
+        if options['compare']:
+            try:
+                with open(options['compare']) as f:
+                    previous = json.load(f)
+
+            except (OSError, ValueError) as error:
+                raise CommandError(f'cannot read {options["compare"]}: {error}')
+
+        # the project is generated in a test database and the graphs are rendered in
+        # a scratch media directory, a local memory cache is used as the cache is
+        # cleared before each run
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # the timed functions print their time, keep stdout for the json
+            with tempfile.TemporaryDirectory() as media_root, override_settings(
+                    MEDIA_ROOT=media_root, CACHES={'default': {
+                        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+                        'LOCATION': 'benchmarks'}}), redirect_stdout(sys.stderr):
+                results = run_suite(**{key: options[key] for key in DEFAULT_SETTINGS})
+
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        results_json = json.dumps(results, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(results_json + '\n')
+
+        else:
+            self.stdout.write(results_json)
+
+        if previous:
+            for line in compare_results(previous, results):
+                self.stderr.write(line)
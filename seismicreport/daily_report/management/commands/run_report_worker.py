@@ -0,0 +1,40 @@
+''' management command to create the queued weekly and mpr excel reports in a pool
+    of processes, runs until interrupted or, with --once, until the queue is empty
+    usage: python manage.py run_report_worker [--workers <n>] [--once]
+               [--interval <seconds>] [--stale-after <seconds>] [--keep-days <days>]
+'''
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from daily_report.job_backend import process_report_queue
+
+
+class Command(BaseCommand):
+    help = 'Create the queued weekly and mpr excel reports'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=settings.REPORT_WORKERS,
+            help='number of processes to create the reports, 1 runs them in this process')
+        parser.add_argument(
+            '--once', action='store_true', help='stop when the queue is empty')
+        parser.add_argument(
+            '--interval', type=float, default=2.0,
+            help='seconds to wait before polling the queue again')
+        parser.add_argument(
+            '--stale-after', type=int, default=3600,
+            help='seconds after which a running job is queued again')
+        parser.add_argument(
+            '--keep-days', type=int, default=7,
+            help='days to keep the finished jobs and their files')
+
+    def handle(self, *args, **options):
+        try:
+            process_report_queue(
+                workers=max(options['workers'], 1), once=options['once'],
+                interval=options['interval'], stale_after=options['stale_after'],
+                keep_days=options['keep_days'],
+                report_status=lambda job_id, status: self.stdout.write(
+                    f'report job {job_id}: {status}'))
+
+        except KeyboardInterrupt:
+            self.stdout.write('report worker stopped')
@@ -0,0 +1,34 @@
+''' management command to create the queued report snapshots, runs until
+    interrupted or, with --once, until the queue is empty
+    usage: python manage.py run_snapshot_worker [--once] [--interval <seconds>]
+'''
+import time
+from django.core.management.base import BaseCommand
+from daily_report.snapshot_backend import process_snapshot_queue
+
+
+class Command(BaseCommand):
+    help = 'Create the snapshots of the weekly and mpr reports of the queued days'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true', help='stop when the queue is empty')
+        parser.add_argument(
+            '--interval', type=float, default=5.0,
+            help='seconds to wait before polling an empty queue again')
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                processed = process_snapshot_queue()
+                if processed:
+                    self.stdout.write(f'snapshots created for {processed} queued days')
+
+                if options['once']:
+                    break
+
+                if not processed:
+                    time.sleep(options['interval'])
+
+        except KeyboardInterrupt:
+            self.stdout.write('snapshot worker stopped')
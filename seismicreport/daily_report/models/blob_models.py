@@ -0,0 +1,82 @@
+import hashlib
+from datetime import timedelta
+from django.conf import settings
+from django.db import models
+from django.db.models.functions import Substr
+from django.utils import timezone
+
+# size of the parts in which the content of a blob is read from the database
+BLOB_CHUNK_SIZE = 256 * 1024
+
+
+class BlobManager(models.Manager):
+    ''' the content of a blob is deferred and only read in parts with read_chunks
+    '''
+    def get_queryset(self):
+        return super().get_queryset().defer('content')
+
+    def store(self, content):
+        ''' stores content once for its sha256 hash, the stored time of an existing
+            blob is updated so delete_unused leaves it for the grace period. Call in
+            the transaction that sets the foreign key to the blob.
+            returns: the blob of the content
+        '''
+        content = bytes(content)
+        content_hash = hashlib.sha256(content).hexdigest()
+        blob, created = self.get_or_create(
+            content_hash=content_hash, defaults={'content': content, 'size': len(content)})
+        if not created:
+            blob.stored = timezone.now()
+            self.filter(content_hash=content_hash).update(stored=blob.stored)
+
+        return blob
+
+    def read_chunks(self, content_hash, start=0, end=None, chunk_size=BLOB_CHUNK_SIZE):
+        ''' generator of the bytes start to end (inclusive) of the content, with a
+            query for each chunk of chunk_size bytes, so the content is never loaded
+            in memory at once
+        '''
+        if end is None:
+            end = self.get(content_hash=content_hash).size - 1
+
+        blobs = self.filter(content_hash=content_hash)
+        pos = start
+        while pos <= end:
+            length = min(chunk_size, end - pos + 1)
+            chunk = blobs.values_list(
+                Substr('content', pos + 1, length, output_field=models.BinaryField()),
+                flat=True).get()
+            if not chunk:
+                break
+
+            yield bytes(chunk)
+            pos += length
+
+    def delete_unused(self):
+        ''' deletes the blobs that are not referred to by any of the models with a
+            foreign key to a blob and were stored more than BLOB_GRACE_PERIOD seconds
+            ago, so a blob just stored by another process is not deleted before its
+            foreign key is set
+            returns: number of deleted blobs
+        '''
+        deleted, _ = self.filter(
+            stored__lt=timezone.now() - timedelta(seconds=settings.BLOB_GRACE_PERIOD),
+            **{rel.name: None for rel in self.model._meta.related_objects},
+        ).delete()
+        return deleted
+
+
+class Blob(models.Model):
+    content_hash = models.CharField(max_length=64, primary_key=True)
+    size = models.BigIntegerField(default=0)
+    content = models.BinaryField()
+    stored = models.DateTimeField(default=timezone.now)
+
+    objects = BlobManager()
+
+    class Meta:
+        # the blob of a foreign key is also fetched without its content
+        base_manager_name = 'objects'
+
+    def __str__(self):
+        return f'{self.content_hash[:12]} ({self.size} bytes)'
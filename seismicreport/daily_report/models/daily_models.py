@@ -20,6 +20,7 @@ class Daily(models.Model):
     staff = models.ManyToManyField(Person, related_name='dailies')
     csr_comment = models.TextField(max_length=COMMENT_LENGTH, default='')
     pm_comment = models.TextField(max_length=COMMENT_LENGTH, default='')
+    last_modified = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f'daily: {self.production_date} - project: {self.project.project_name}'
@@ -27,6 +28,8 @@ class Daily(models.Model):
     class Meta:
         # possible to have two daily reports for two different projects
         unique_together = ['production_date', 'project']
+        # index for the period filters on project and production date
+        indexes = [models.Index(fields=['project', 'production_date'])]
 
 
 class SourceProduction(models.Model):
@@ -45,6 +48,7 @@ class SourceProduction(models.Model):
 
     class Meta:
         unique_together = ['daily', 'sourcetype']
+        indexes = [models.Index(fields=['sourcetype', 'daily'])]
 
 
 class ReceiverProduction(models.Model):
@@ -64,6 +68,7 @@ class ReceiverProduction(models.Model):
 
     class Meta:
         unique_together = ['daily', 'receivertype']
+        indexes = [models.Index(fields=['receivertype', 'daily'])]
 
 
 class TimeBreakdown(models.Model):
@@ -122,3 +127,60 @@ class ToolBox(models.Model):
 
     def __str_(self):
         return f'Toolbox for {self.hse.daily.project}: {self.toolbox:20} ...'
+
+
+class DailyKpi(models.Model):
+    ''' daily key performance indicators by sourcetype, the row without a sourcetype
+        has the combined values for all sourcetypes. Maintained when a daily report
+        is uploaded, see kpi_backend.
+    '''
+    daily = models.ForeignKey(Daily, on_delete=models.CASCADE, related_name='kpis')
+    sourcetype = models.ForeignKey(
+        SourceType, on_delete=models.CASCADE, related_name='kpis', blank=True, null=True)
+    total_sp = models.IntegerField(default=0)
+    skips = models.IntegerField(default=0)
+    tcf = models.FloatField(null=True)
+    ctm = models.FloatField(null=True)
+    appctm = models.FloatField(null=True)
+    rec_hours = models.FloatField(default=0)
+    ops_time = models.FloatField(default=0)
+    standby = models.FloatField(default=0)
+    downtime = models.FloatField(default=0)
+    total_time = models.FloatField(default=0)
+    rate = models.FloatField(null=True)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        stype_name = self.sourcetype.sourcetype_name if self.sourcetype else 'combined'
+        return f'KPI {self.daily.production_date} - {stype_name}'
+
+    class Meta:
+        unique_together = ['daily', 'sourcetype']
+        # unique_together does not cover the combined row as its sourcetype is NULL
+        constraints = [
+            models.UniqueConstraint(
+                fields=['daily'], condition=models.Q(sourcetype__isnull=True),
+                name='unique_combined_dailykpi'),
+        ]
+        indexes = [models.Index(fields=['sourcetype', 'daily'])]
+
+
+class CumulativeTotals(models.Model):
+    ''' running totals of the production, time breakdown, receivers and hse from
+        the start of the project up to and including the production date, so that
+        the total of a period is the difference between two rows.
+        Maintained by cumulative_backend.
+    '''
+    daily = models.OneToOneField(
+        Daily, on_delete=models.CASCADE, related_name='cumulative_totals')
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='cumulative_totals')
+    production_date = models.DateField()
+    totals = models.JSONField(default=dict)
+
+    def __str__(self):
+        return (f'cumulative totals: {self.production_date} - '
+                f'project: {self.project.project_name}')
+
+    class Meta:
+        unique_together = ['project', 'production_date']
@@ -0,0 +1,48 @@
+from django.contrib.auth.models import User
+from django.db import models
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily
+from seismicreport.vars import DESCR_LENGTH
+
+
+class ReportJob(models.Model):
+    ''' excel report of a daily to be created by the report worker, the created file
+        is stored as a blob
+    '''
+    WEEK_EXCEL = 'week_excel'
+    MPR_EXCEL = 'mpr_excel'
+    KINDS = [
+        (WEEK_EXCEL, 'weekly excel report'),
+        (MPR_EXCEL, 'mpr excel report'),
+    ]
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUSES = [
+        (QUEUED, 'queued'),
+        (RUNNING, 'running'),
+        (DONE, 'done'),
+        (FAILED, 'failed'),
+    ]
+
+    daily = models.ForeignKey(Daily, on_delete=models.CASCADE, related_name='report_jobs')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    user = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='report_jobs')
+    status = models.CharField(max_length=10, choices=STATUSES, default=QUEUED)
+    progress = models.FloatField(default=0.0)
+    message = models.CharField(max_length=DESCR_LENGTH, default='')
+    result_file = models.ForeignKey(
+        Blob, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='report_jobs')
+    created = models.DateTimeField(auto_now_add=True)
+    started = models.DateTimeField(null=True)
+    finished = models.DateTimeField(null=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'created'])]
+
+    def __str__(self):
+        return f'report job {self.id}: {self.kind} of {self.daily_id} {self.status}'
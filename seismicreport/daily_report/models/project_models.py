@@ -1,4 +1,5 @@
 from django.db import models
+from daily_report.models.blob_models import Blob
 from seismicreport.vars import NAME_LENGTH, TYPE_LENGTH
 
 
@@ -7,7 +8,13 @@ class Project(models.Model):
     project_name = models.CharField(max_length=NAME_LENGTH, unique=True, )
     crew_name = models.CharField(max_length=NAME_LENGTH, default='')
     start_report = models.DateField(null=True)
-    pdf_work_order = models.BinaryField()
+    pdf_work_order = models.ForeignKey(
+        Blob, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='projects')
+    # the work order before it was stored as blob, copied to the blob by the command
+    # copy_legacy_blobs, the column is to be dropped once all projects are copied
+    legacy_pdf_work_order = models.BinaryField(
+        null=True, editable=False, db_column='pdf_work_order')
     planned_area = models.FloatField(default=0.0)
     planned_vp = models.IntegerField(default=0)
     planned_receivers = models.IntegerField(default=0)
@@ -21,6 +28,10 @@ class Project(models.Model):
     cap_rate = models.FloatField(default=0)
     cap_app_ctm = models.FloatField(default=0)
 
+    # incremented when the daily reports of the project change, part of the key of
+    # the cached totals
+    data_version = models.IntegerField(default=0)
+
     def __str__(self):
         return str(self.project_name)
 
@@ -29,7 +40,11 @@ class Block(models.Model):
     project = models.ForeignKey(
         Project, on_delete=models.CASCADE, related_name='blocks')
     block_name = models.CharField(max_length=NAME_LENGTH, null=False)
-    block_shapefile = models.BinaryField()
+    block_shapefile = models.ForeignKey(
+        Blob, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='blocks')
+    legacy_block_shapefile = models.BinaryField(
+        null=True, editable=False, db_column='block_shapefile')
     block_planned_area = models.FloatField(default=0.0)
     block_planned_vp = models.IntegerField(default=0)
     block_planned_receivers = models.IntegerField(default=0)
@@ -68,7 +83,11 @@ class ReceiverType(models.Model):
     receiverpoint_spacing = models.FloatField(default=0.0)
     receiverline_spacing = models.FloatField(default=0.0)
     receivers_per_station = models.IntegerField(default=0)
-    receiver_diagram = models.BinaryField()
+    receiver_diagram = models.ForeignKey(
+        Blob, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='receivertypes')
+    legacy_receiver_diagram = models.BinaryField(
+        null=True, editable=False, db_column='receiver_diagram')
 
     # quality control thresholds
     # number of receivers to be qc'd per day in the field
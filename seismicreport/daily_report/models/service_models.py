@@ -1,5 +1,6 @@
+import calendar
+import datetime
 from django.db import models
-from django.db.models import Q
 from daily_report.models.project_models import Project
 from seismicreport.vars import NAME_LENGTH, DESCR_LENGTH, TYPE_LENGTH
 
@@ -25,7 +26,10 @@ class ServiceTask(models.Model):
     task_unit = models.CharField(max_length=TYPE_LENGTH, default='')
 
     def get_monthly_task_quantities(self, year, month):
-        return self.quantities.filter(Q(date__year=year) & Q(date__month=month))
+        # a date range, unlike year and month lookups, can use the index on date
+        month_start = datetime.date(year, month, 1)
+        month_end = month_start.replace(day=calendar.monthrange(year, month)[1])
+        return self.quantities.filter(date__range=(month_start, month_end))
 
     def __str__(self):
         return f'{self.service.service_contract}: {self.task_name}'
@@ -0,0 +1,43 @@
+from django.db import models
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily
+
+
+class SnapshotTask(models.Model):
+    ''' queue of the daily reports of which the snapshots are to be (re)created
+    '''
+    daily = models.OneToOneField(
+        Daily, on_delete=models.CASCADE, related_name='snapshot_task')
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'snapshot task: {self.daily_id}'
+
+
+class ReportSnapshot(models.Model):
+    ''' precomputed data or excel file of a report of the daily, valid as long as
+        the stamp of the data the report depends on is unchanged, see snapshot_backend
+    '''
+    WEEKLY_PAGE = 'weekly_page'
+    WEEK_EXCEL = 'week_excel'
+    MPR_EXCEL = 'mpr_excel'
+    KINDS = [
+        (WEEKLY_PAGE, 'weekly page'),
+        (WEEK_EXCEL, 'weekly excel report'),
+        (MPR_EXCEL, 'mpr excel report'),
+    ]
+
+    daily = models.ForeignKey(Daily, on_delete=models.CASCADE, related_name='snapshots')
+    kind = models.CharField(max_length=20, choices=KINDS)
+    stamp = models.CharField(max_length=64)
+    data = models.BinaryField(null=True)
+    excel_file = models.ForeignKey(
+        Blob, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='snapshots')
+    created = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['daily', 'kind']
+
+    def __str__(self):
+        return f'snapshot {self.kind}: {self.daily_id} stamp {self.stamp[:12]}'
@@ -0,0 +1,238 @@
+''' module to calculate the monthly production record (MPR). The rows of the project
+    up to the report date are loaded for all source types with a single query in one
+    DataFrame, from which the MPR tables of the source types, the MPR table of the
+    combined source types and the project table are calculated
+'''
+import typing
+import numpy as np
+import pandas as pd
+from django.db.models import FilteredRelation, Q
+from daily_report.models.daily_models import Daily
+from seismicreport.vars import (
+    source_prod_schema, receiver_prod_schema, time_breakdown_schema,
+    hse_weather_schema, ops_time_keys, standby_keys, downtime_keys,
+)
+from seismicreport.utils.plogger import Logger, timed
+
+logger = Logger.getlogger()
+sp_keys = [key[:5] for key in source_prod_schema]
+terrain_keys = sp_keys[:-1]
+hse_keys = hse_weather_schema[:12]
+kpi_keys = ['total_sp', 'tcf', 'ctm', 'appctm']
+# columns of the mpr table in the order of the report
+mpr_columns = [
+    'date', 'prod_day', *sp_keys, 'total_sp', 'cum_total_sp', 'rec_hours',
+    'other_ops', 'ops', 'standby', 'downtime', *[f'{key}_dist' for key in terrain_keys],
+    'tcf', 'ctm', 'appctm', 'padtime',
+]
+
+
+class MprData(typing.NamedTuple):
+    ''' result of calc_mpr_data, the tables and sums of the mpr by source type name,
+        with key None for the combined source types, the month totals of the combined
+        source types and the project table
+    '''
+    tables: dict
+    sums: dict
+    month_total: dict
+    proj_df: pd.DataFrame
+
+
+class Mixin:
+
+    @staticmethod
+    def load_mpr_frame(daily):
+        ''' loads the source production of all source types together with the time
+            breakdown, receiver production and hse of the day for the project up to
+            the production date of daily in a single query
+            returns: DataFrame with a row for each day and source type
+        '''
+        receivertype = daily.project.receivertypes.first()
+        rows = Daily.objects.filter(
+            project_id=daily.project_id, production_date__lte=daily.production_date,
+        ).annotate(
+            rcvr=FilteredRelation(
+                'receiverproduction',
+                condition=Q(receiverproduction__receivertype=receivertype)),
+        ).order_by(
+            'production_date', 'sourceproduction__sourcetype_id',
+        ).values_list(
+            'production_date', 'sourceproduction__sourcetype__sourcetype_name',
+            *[f'sourceproduction__{key}' for key in source_prod_schema],
+            *[f'timebreakdown__{key}' for key in time_breakdown_schema],
+            *[f'rcvr__{key}' for key in receiver_prod_schema],
+            *[f'hseweather__{key}' for key in hse_keys],
+        )
+        value_keys = [
+            *sp_keys, *time_breakdown_schema, *receiver_prod_schema, *hse_keys]
+        frame = pd.DataFrame.from_records(
+            list(rows), columns=['date', 'sourcetype', *value_keys])
+        return frame.astype({
+            'date': 'datetime64[ns]', 'sourcetype': 'category',
+            **{key: float for key in value_keys},
+        })
+
+    @staticmethod
+    def calc_mpr_times(days):
+        ''' calculates the times of each day from the time breakdown of days
+            returns: DataFrame indexed by date
+        '''
+        times = days[time_breakdown_schema].fillna(0)
+        time_df = pd.DataFrame({
+            'rec_hours': times['rec_hours'],
+            'ops': times[ops_time_keys].sum(axis=1),
+            'standby': times[standby_keys].sum(axis=1),
+            'downtime': times[downtime_keys].sum(axis=1),
+        })
+        time_df['total_time'] = time_df['ops'] + time_df['standby'] + time_df['downtime']
+        return time_df
+
+    def calc_mpr_series(self, frame, time_df, sourcetypes):
+        ''' calculates the production, kpis and times of each day by source type and
+            for the combined source types, where the kpis of the combined source
+            types are weighted by the production of the source types
+            returns: dict of DataFrames indexed by date by source type name, with key
+                     None for the combined source types
+        '''
+        series = {}
+        for stype in sourcetypes:
+            prod = frame[frame['sourcetype'] == stype.sourcetype_name].set_index('date')
+            prod = prod[sp_keys].fillna(0)
+            kpis = self.calc_ctm_series(
+                {f'{key}_series': prod[key].to_numpy() for key in terrain_keys}, stype)
+            series[stype.sourcetype_name] = prod.assign(**{
+                key: kpis[f'{key}_series'] for key in kpi_keys})
+
+        if not series:
+            # a project without source types has no production series
+            return {None: pd.DataFrame(
+                columns=[*sp_keys, *kpi_keys, *time_df.columns], dtype=float,
+                index=pd.DatetimeIndex([], name='date'))}
+
+        # matrices of the production and kpis of the source types (days x types), a
+        # source type without production on a day has no kpis for the combined types
+        def type_matrix(key):
+            return pd.concat(
+                {name: s_df[key] for name, s_df in series.items()}, axis=1)
+
+        type_sp = type_matrix('total_sp')
+        total_sp = type_sp.sum(axis=1)
+        weights = type_sp.div(total_sp, axis=0)
+        weights.loc[~(total_sp > 0)] = 0
+        ctm = (type_matrix('ctm') * weights).sum(axis=1, skipna=False)
+        appctm = total_sp.div(ctm).where(ctm > 0)
+        combined = pd.concat(
+            [s_df[sp_keys] for s_df in series.values()]).groupby(level=0).sum()
+        series[None] = combined.assign(
+            total_sp=total_sp,
+            tcf=(type_matrix('tcf') * weights).sum(axis=1, skipna=False),
+            ctm=ctm, appctm=appctm,
+        )
+        return {
+            name: s_df.join(time_df).sort_index() for name, s_df in series.items()}
+
+    @staticmethod
+    def calc_mpr_table(daily, m_df, rec_hours):
+        ''' calculates the mpr table of the month rows m_df, the pad time is the
+            recording time as a fraction of rec_hours
+            returns: tuple DataFrame with mpr_columns, dict with the sums of the table
+        '''
+        days = daily.production_date.day
+        start_date = daily.project.planned_start_date
+        total = m_df['total_sp']
+        table = pd.DataFrame({
+            'date': m_df.index.strftime('%d-%b-%y'),
+            'prod_day': (
+                (m_df.index - pd.Timestamp(start_date)).days + 1
+                if start_date else np.nan),
+        }, index=m_df.index)
+        table = table.assign(
+            **{key: m_df[key] for key in sp_keys},
+            total_sp=total, cum_total_sp=total.cumsum(),
+            rec_hours=m_df['rec_hours'], other_ops=m_df['ops'] - m_df['rec_hours'],
+            ops=m_df['ops'], standby=m_df['standby'], downtime=m_df['downtime'],
+            **{f'{key}_dist': m_df[key].div(total).where(total != 0, 0)
+               for key in terrain_keys},
+            tcf=m_df['tcf'], ctm=m_df['ctm'], appctm=m_df['appctm'],
+            padtime=m_df['rec_hours'] / rec_hours if rec_hours else m_df['rec_hours'] * 0,
+        )
+
+        sums = table[[
+            *sp_keys, 'total_sp', 'rec_hours', 'other_ops', 'ops', 'standby',
+            'downtime']].sum().to_dict()
+        for key in terrain_keys:
+            sums[f'{key}_dist'] = (
+                sums[key] / sums['total_sp'] if sums['total_sp'] > 0 else 0)
+
+        sums['padtime'] = sums['rec_hours'] / (rec_hours * days) if rec_hours else 0
+        return table[mpr_columns], sums
+
+    def calc_mpr_month_total(self, daily, series, time_df, sourcetypes):
+        ''' calculates the month totals of the combined source types from the sums of
+            the month rows of each source type
+            returns: dict with the month totals as calc_combined_production
+        '''
+        if not sourcetypes:
+            return {
+                f'month_{key}': np.nan for key in [
+                    *sp_keys, 'total', 'tcf', 'ctm', 'appctm', 'avg', 'rate',
+                    'perc_skips']}
+
+        month_start = pd.Timestamp(daily.production_date.replace(day=1))
+        m_times = time_df.loc[month_start:, ['total_time', 'standby']].sum()
+        times_total = {
+            'month_total_time': m_times['total_time'],
+            'month_standby': m_times['standby'],
+        }
+        prod_total_by_type = {}
+        for stype in sourcetypes:
+            m_sums = series[stype.sourcetype_name].loc[
+                month_start:, [*sp_keys, 'total_sp']].sum()
+            prod_total = {f'month_{key}': m_sums[key] for key in sp_keys}
+            prod_total['month_total'] = m_sums['total_sp']
+            prod_total_by_type[stype.sourcetype_name] = self.calc_period_totals(
+                daily, stype, times_total, prod_total, periods=('month',))
+
+        return self.calc_combined_production(
+            daily, times_total, prod_total_by_type, periods=('month',))
+
+    @timed(logger, print_log=True)
+    def calc_mpr_data(self, daily):
+        ''' calculates the mpr tables of the month of daily for the combined source
+            types and for each source type, and the project table, from the rows of
+            the project loaded in a single query
+            returns: MprData
+        '''
+        sourcetypes = list(daily.project.sourcetypes.all())
+        frame = self.load_mpr_frame(daily)
+        days = frame.drop_duplicates('date').set_index('date')
+        time_df = self.calc_mpr_times(days)
+        series = self.calc_mpr_series(frame, time_df, sourcetypes)
+
+        # the combined table of more than one source type is against 24 hours
+        rec_hours = {stype.sourcetype_name: stype.mpr_rec_hours for stype in sourcetypes}
+        if len(sourcetypes) == 1:
+            rec_hours[None] = sourcetypes[0].mpr_rec_hours
+
+        else:
+            rec_hours[None] = 24 if sourcetypes else 0
+
+        month_start = pd.Timestamp(daily.production_date.replace(day=1))
+        tables = {}
+        sums = {}
+        for name, s_df in series.items():
+            tables[name], sums[name] = self.calc_mpr_table(
+                daily, s_df.loc[month_start:], rec_hours[name])
+
+        proj_df = series[None][[*sp_keys, *kpi_keys]].join([
+            days[receiver_prod_schema],
+            days[time_breakdown_schema].fillna(0),
+            time_df[['ops', 'standby', 'downtime', 'total_time']],
+            days[hse_keys],
+        ]).reset_index()
+
+        return MprData(
+            tables=tables, sums=sums,
+            month_total=self.calc_mpr_month_total(daily, series, time_df, sourcetypes),
+            proj_df=proj_df,
+        )
@@ -0,0 +1,129 @@
+''' module to calculate the totals of the latest daily report of all projects for
+    the portfolio. The production, time breakdown and hse totals of all projects are
+    aggregated with a single query grouped by project for each, instead of
+    calc_totals for each project
+'''
+import numpy as np
+from django.db.models import Q, OuterRef, Subquery
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, TimeBreakdown, HseWeather,
+)
+from daily_report.models.project_models import SourceType
+from daily_report.aggregate_backend import (
+    PERIODS, get_period_filters, get_filter_aggregates,
+)
+from seismicreport.vars import source_prod_schema, time_breakdown_schema
+from seismicreport.utils.plogger import Logger, timed
+
+logger = Logger.getlogger()
+incident_keys = ['lti', 'fac', 'mtc', 'rwc', 'incident_nm', 'medevac']
+
+
+def get_portfolio_filters(latest_days, prefix='daily__'):
+    ''' returns a dict with a Q filter for each period (day, week, month and proj),
+        where the periods of a project end on the production date of its day in
+        latest_days
+    '''
+    period_filters = {period: Q() for period in PERIODS}
+    for day in latest_days:
+        project_filter = Q(**{f'{prefix}project_id': day.project_id})
+        for period, period_filter in get_period_filters(
+                day.production_date, prefix=prefix).items():
+            period_filters[period] |= project_filter & period_filter
+
+    return period_filters
+
+
+def get_grouped_rows(model, group_keys, fields, period_filters):
+    ''' aggregates the fields of model for all periods in a single query grouped by
+        group_keys
+        returns: dict of the aggregated rows by the values of group_keys
+    '''
+    rows = model.objects.filter(
+        period_filters['proj']).values(*group_keys).order_by().annotate(
+            **get_filter_aggregates(fields, period_filters))
+    return {tuple(row[key] for key in group_keys): row for row in rows}
+
+
+def to_float(value):
+    ''' returns: value as a float, None if the value is nan
+    '''
+    return None if value is None or np.isnan(value) else float(value)
+
+
+class Mixin:
+
+    @staticmethod
+    def get_latest_reports():
+        ''' returns: list of the latest daily report of each project with a report,
+                     ordered by project name
+        '''
+        latest_date = Daily.objects.filter(
+            project=OuterRef('project')).order_by('-production_date').values(
+                'production_date')[:1]
+        return list(Daily.objects.filter(
+            production_date=Subquery(latest_date)).select_related('project').order_by(
+                'project__project_name'))
+
+    @timed(logger, print_log=True)
+    def calc_portfolio(self):
+        ''' calculates the day, week, month and project totals of the VPs, APP/CTM,
+            recording hours and hse incidents of the latest report of all projects.
+            The number of queries does not depend on the number of projects.
+            returns: list of dicts with the project, the latest report and the
+                     totals by period
+        '''
+        latest_days = self.get_latest_reports()
+        if not latest_days:
+            return []
+
+        period_filters = get_portfolio_filters(latest_days)
+        sourcetypes = {}
+        for stype in SourceType.objects.filter(
+                project__in=[day.project_id for day in latest_days]).order_by('id'):
+            sourcetypes.setdefault(stype.project_id, []).append(stype)
+
+        prod_rows = get_grouped_rows(
+            SourceProduction, ['daily__project', 'sourcetype'], source_prod_schema,
+            period_filters)
+        time_rows = get_grouped_rows(
+            TimeBreakdown, ['daily__project'], time_breakdown_schema, period_filters)
+        hse_rows = get_grouped_rows(
+            HseWeather, ['daily__project'], incident_keys, period_filters)
+
+        portfolio = []
+        for day in latest_days:
+            stypes = sourcetypes.get(day.project_id, [])
+            times_total = self.aggregate_time_totals(
+                None, row=time_rows.get((day.project_id,)))
+            prod_total_by_type = self.aggregate_prod_totals(None, stypes, rows={
+                stype.id: prod_rows.get((day.project_id, stype.id), {})
+                for stype in stypes})
+            for stype in stypes:
+                self.calc_period_totals(
+                    day, stype, times_total, prod_total_by_type[stype.sourcetype_name])
+
+            prod_total = (
+                self.calc_combined_production(day, times_total, prod_total_by_type)
+                if stypes else {})
+            hse_row = hse_rows.get((day.project_id,), {})
+
+            totals = {}
+            for period in PERIODS:
+                totals[period] = {
+                    'vps': to_float(prod_total.get(f'{period}_total', np.nan)),
+                    'appctm': to_float(prod_total.get(f'{period}_appctm', np.nan)),
+                    'rec_hours': to_float(times_total[f'{period}_rec_time']),
+                    'incidents': sum(
+                        hse_row.get(f'{period}_{key}') or 0 for key in incident_keys),
+                }
+
+            portfolio.append({
+                'project': day.project.project_name,
+                'crew': day.project.crew_name,
+                'daily_id': day.id,
+                'production_date': day.production_date,
+                'totals': totals,
+            })
+
+        return portfolio
@@ -1,15 +1,25 @@
 '''  module for project backend tasks
 '''
+from django.db import transaction
 from django.db.utils import IntegrityError
 from django.db.models import ProtectedError
+from daily_report.models.blob_models import Blob
 from daily_report.models.project_models import (
     Project, Block, SourceType, ReceiverType,
 )
-from daily_report.models.daily_models import SourceProduction, ReceiverProduction
+from daily_report.models.daily_models import (
+    SourceProduction, ReceiverProduction, CumulativeTotals,
+)
 from seismicreport.utils.plogger import Logger
 
 
 logger = Logger.getlogger()
+# the binary columns kept from before the blob table and their blob foreign key
+LEGACY_BLOB_FIELDS = [
+    (Project, 'legacy_pdf_work_order', 'pdf_work_order'),
+    (Block, 'legacy_block_shapefile', 'block_shapefile'),
+    (ReceiverType, 'legacy_receiver_diagram', 'receiver_diagram'),
+]
 
 
 class ProjectInterface:
@@ -171,6 +181,9 @@ class ProjectInterface:
     @staticmethod
     def delete_project(project):
         if project:
+            # avoid repairing the cumulative totals for each deleted day
+            CumulativeTotals.objects.filter(project=project).delete()
+
             for sourcetype in SourceProduction.objects.filter(daily__project=project):
                 sourcetype.delete()
 
@@ -181,6 +194,7 @@ class ProjectInterface:
                 day.delete()
 
             project.delete()
+            Blob.objects.delete_unused()
 
         return None, ''
 
@@ -287,8 +301,36 @@ class ProjectInterface:
         if not project:
             return
 
-        f = open(pdf_workorder_file.temporary_file_path(), 'rb')
-        f.seek(0)
-        project.pdf_work_order = f.read()
-        f.close()
-        project.save()
+        with open(pdf_workorder_file.temporary_file_path(), 'rb') as f:
+            content = f.read()
+
+        with transaction.atomic():
+            project.pdf_work_order = Blob.objects.store(content)
+            project.save()
+
+        Blob.objects.delete_unused()
+
+    @staticmethod
+    def copy_legacy_blobs(clear=False):
+        ''' stores the content of the legacy binary columns as blobs and sets the
+            foreign keys that are not set yet, with clear the legacy content is set to
+            null once it is stored
+            returns: number of copied contents
+        '''
+        copied = 0
+        for model, legacy_field, blob_field in LEGACY_BLOB_FIELDS:
+            rows = model.objects.exclude(**{f'{legacy_field}__isnull': True})
+            for row_id in rows.values_list('id', flat=True):
+                with transaction.atomic():
+                    row = model.objects.filter(id=row_id).values(
+                        legacy_field, f'{blob_field}_id').get()
+                    content = row[legacy_field]
+                    values = {legacy_field: None} if clear else {}
+                    if content and not row[f'{blob_field}_id']:
+                        values[blob_field] = Blob.objects.store(content)
+                        copied += 1
+
+                    if values:
+                        model.objects.filter(id=row_id).update(**values)
+
+        return copied
@@ -3,47 +3,78 @@ from pathlib import Path
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
-from django.db.utils import IntegrityError
+from django.db import transaction
 from django.db.models import Q
 from daily_report.models.daily_models import (
     Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather, ToolBox,
 )
-from daily_report.models.project_models import Project, Block
+from daily_report.models.project_models import Project
 import daily_report.receiver_backend as _receiver_backend
 import daily_report.hseweather_backend as  _hse_backend
 import daily_report.graph_backend as _graph_backend
+import daily_report.aggregate_backend as _aggregate_backend
+import daily_report.kpi_backend as _kpi_backend
+import daily_report.cumulative_backend as _cumulative_backend
+import daily_report.import_backend as _import_backend
+import daily_report.totals_cache_backend as _totals_cache_backend
+import daily_report.mpr_backend as _mpr_backend
+import daily_report.portfolio_backend as _portfolio_backend
+from daily_report.report_reader import get_value, read_report_cells
 from seismicreport.vars import (
-    TCF_table, BGP_DR_table, source_prod_schema, time_breakdown_schema, ops_time_keys,
+    TCF_table, source_prod_schema, time_breakdown_schema, ops_time_keys,
     standby_keys, downtime_keys, NAME_LENGTH, DESCR_LENGTH, COMMENT_LENGTH, NO_DATE_STR,
     WEEKDAYS, CTM_METHOD
 )
 from seismicreport.utils.plogger import Logger, timed
 from seismicreport.utils.utils_funcs import (
-    calc_ratio, nan_array, get_receivertype_name, sum_keys,
+    calc_ratio, calc_ratio_array, nan_array, sum_keys,
 )
 
 logger = Logger.getlogger()
+# weights of the terrain types in the order of the terrains of source_prod_schema
+tcf_weights = np.array([TCF_table[key[:5]] for key in source_prod_schema[:-1]])
+
+
+class ReportTotals(typing.NamedTuple):
+    ''' result of calc_totals, the period totals and the project series of a daily
+        report. The interface does not keep any state of a calculation, so it can be
+        shared between threads.
+    '''
+    prod_total_by_type: typing.Optional[dict] = None
+    prod_total: typing.Optional[dict] = None
+    times_total: typing.Optional[dict] = None
+    rcvr_total: typing.Optional[dict] = None
+    hse_total: typing.Optional[dict] = None
+    prod_series_by_type: typing.Optional[dict] = None
+    prod_series: typing.Optional[dict] = None
+    time_series: typing.Optional[dict] = None
+    rcvr_series: typing.Optional[dict] = None
+    hse_series: typing.Optional[dict] = None
+    # target recording hours for the graphs
+    mpr_rec_hours: float = 24.0
+    # key for the graphs cache
+    graph_key: str = ''
 
-class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backend.Mixin):
+    @property
+    def totals(self) -> tuple:
+        return (
+            self.prod_total_by_type, self.prod_total, self.times_total,
+            self.rcvr_total, self.hse_total,
+        )
+
+
+class ReportInterface(
+        _receiver_backend.Mixin, _hse_backend.Mixin, _graph_backend.Mixin,
+        _aggregate_backend.Mixin, _kpi_backend.Mixin, _cumulative_backend.Mixin,
+        _import_backend.Mixin, _totals_cache_backend.Mixin, _mpr_backend.Mixin,
+        _portfolio_backend.Mixin):
 
     def __init__(self, media_dir):
         self.media_dir = Path(media_dir)
-        self.prod_series = None
-        self.time_series = None
-        self.hse_series = None
-        self.mpr_rec_hours = 24.0
 
     @staticmethod
-    def get_value(day_df, kw):
-        if kw not in BGP_DR_table:
-            return np.nan
-
-        r, c = BGP_DR_table[kw]
-        try:
-            return day_df.iat[r, c]
-
-        except IndexError:
-            return np.nan
+    def get_value(day_cells, kw):
+        return get_value(day_cells, kw)
 
     @staticmethod
     def get_project(project_name):
@@ -84,53 +115,45 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
 
         return tcf
 
+    @staticmethod
+    def get_mpr_rec_hours(sourcetype):
+        mpr_rec_hours = sourcetype.mpr_rec_hours if sourcetype else None
+        return mpr_rec_hours if isinstance(mpr_rec_hours, float) else 24.0
+
     def calc_ctm(self, sourcetype, tcf):
 
         mpr_vibes = sourcetype.mpr_vibes
         mpr_sweep = sourcetype.mpr_sweep_length
         mpr_moveup = sourcetype.mpr_moveup
-        # need mpr_rec_hours for graph_backend
-        #TODO self.mpr_rec_hours - fix this ugly patch!
-        self.mpr_rec_hours = sourcetype.mpr_rec_hours
-        if not isinstance(self.mpr_rec_hours, float):
-            self.mpr_rec_hours = 24.0
+        mpr_rec_hours = self.get_mpr_rec_hours(sourcetype)
 
-        if np.isnan(tcf) or mpr_vibes == 0 or mpr_sweep == 0 or mpr_moveup == 0:
+        # tcf is a value or an array of values
+        if mpr_vibes == 0 or mpr_sweep == 0 or mpr_moveup == 0:
+            return np.full_like(tcf, np.nan, dtype=float) if np.ndim(tcf) else np.nan
+
+        if not np.ndim(tcf) and np.isnan(tcf):
             return np.nan
 
-        return 3600 / (mpr_sweep + mpr_moveup) * mpr_vibes * tcf * self.mpr_rec_hours
+        return 3600 / (mpr_sweep + mpr_moveup) * mpr_vibes * tcf * mpr_rec_hours
 
     def calc_ctm_series(self, p_series, sourcetype):
-        terrain_series = list(zip(
-            *[val for key, val in p_series.items() if key != 'skips_series']
-        ))
-        p_series['tcf_series'] = []
-        p_series['total_sp_series'] = []
-        p_series['ctm_series'] = []
-        p_series['appctm_series'] = []
-        p_series['rate_series'] = []
-
-        for terrain_sp in terrain_series:
-            sp_total = np.nansum(terrain_sp)
-            p_series['total_sp_series'].append(sp_total)
-            if sp_total > 0:
-                p_series['tcf_series'].append(
-                    terrain_sp[0] / sp_total * TCF_table['sp_t1'] +
-                    terrain_sp[1] / sp_total * TCF_table['sp_t2'] +
-                    terrain_sp[2] / sp_total * TCF_table['sp_t3'] +
-                    terrain_sp[3] / sp_total * TCF_table['sp_t4'] +
-                    terrain_sp[4] / sp_total * TCF_table['sp_t5']
-                )
-
-            else:
-                p_series['tcf_series'].append(np.nan)
-
-        for tcf, total in zip(p_series['tcf_series'], p_series['total_sp_series']):
-            ctm = self.calc_ctm(sourcetype, tcf)
-            appctm = calc_ratio(total, ctm)
-            p_series['ctm_series'].append(ctm)
-            p_series['appctm_series'].append(appctm)
-            p_series['rate_series'].append(np.nan)
+        ''' calculates the tcf, ctm, app ctm and rate series from the matrix of the
+            terrain production (days x terrains) and the weights of the TCF_table
+        '''
+        terrain_sp = np.column_stack([
+            nan_array(p_series[f'{key[:5]}_series']).astype(float)
+            for key in source_prod_schema[:-1]])
+        total_sp = terrain_sp.sum(axis=1)
+        tcf = calc_ratio_array(terrain_sp @ tcf_weights, total_sp)
+        tcf[total_sp <= 0] = np.nan
+        ctm = self.calc_ctm(sourcetype, tcf)
+
+        # return lists as sum_keys replaces nan values of arrays in place
+        p_series['tcf_series'] = list(tcf)
+        p_series['total_sp_series'] = list(total_sp)
+        p_series['ctm_series'] = list(ctm)
+        p_series['appctm_series'] = list(calc_ratio_array(total_sp, ctm))
+        p_series['rate_series'] = [np.nan] * len(total_sp)
 
         return p_series
 
@@ -160,6 +183,33 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
                 total_time
             )
 
+    @staticmethod
+    def calc_rate_series(daily, ctm_method, app_ctm, total_time, standby_time):
+        ''' array form of calc_rate for the series of app ctm, total time and
+            standby time
+        '''
+        app_ctm = np.asarray(app_ctm, dtype=float)
+        total_time = np.asarray(total_time, dtype=float)
+        standby_time = np.asarray(standby_time, dtype=float)
+        standby_rate = daily.project.standby_rate
+        cap_rate = daily.project.cap_rate
+        cap_app_ctm = daily.project.cap_app_ctm
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if cap_app_ctm > 1 and cap_rate > 1:
+                app_ctm = np.where(
+                    app_ctm > 1,
+                    1 + (cap_rate - 1) * np.minimum(
+                        (app_ctm - 1) / (cap_app_ctm - 1), 1),
+                    app_ctm)
+
+            if ctm_method == 'Legacy':
+                return (app_ctm * total_time + standby_rate * standby_time) / total_time
+
+            return (
+                (app_ctm * (total_time - standby_time) + standby_rate * standby_time) /
+                total_time
+            )
+
     def save_report_file(self, project, report_file) -> datetime:
         report_date = self.populate_report(project, report_file.temporary_file_path())
         report_file.close()
@@ -202,179 +252,131 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
             daily report file is an excel file with fields according
             the BGP_DR_table
         '''
-        day_df = pd.read_excel(daily_report_file, header=None)
-        if project is None or project.project_prefix != self.get_value(day_df, 'project'):
+        day_cells = read_report_cells(daily_report_file)
+        if project is None or project.project_prefix != self.get_value(
+                day_cells, 'project'):
             return None
 
+        report_values = self.read_report_values(project, day_cells)
+        if not report_values:
+            return None
+
+        return self.save_report_values(project, report_values)
+
+    def get_int(self, day_cells, kw):
+        return int(np.nan_to_num(self.get_value(day_cells, kw)))
+
+    def get_float(self, day_cells, kw):
+        return np.nan_to_num(self.get_value(day_cells, kw))
+
+    def read_report_values(self, project, day_cells):
+        ''' reads the values of the daily report, the source, receiver types and blocks
+            of the project are fetched once
+            returns: dict with the values by model or None if the daily report does
+                     not contain all source and receiver types of the project
+        '''
+        sourcetypes = {
+            stype.sourcetype_name: stype for stype in project.sourcetypes.all()}
+        receivertypes = list(project.receivertypes.all())
+        blocks = {block.block_name: block for block in project.blocks.all()}
+
         # the daily report must contain all source and receiver types defined in the
         # the project
         sourcetype_names = {
-            stype: self.get_value(day_df, f'source_{stype}') for stype in ['a', 'b', 'c']
+            stype: self.get_value(day_cells, f'source_{stype}')
+            for stype in ['a', 'b', 'c']
         }
-        for stype in project.sourcetypes.all():
-            if stype.sourcetype_name not in sourcetype_names.values():
+        for stype_name in sourcetypes:
+            if stype_name not in sourcetype_names.values():
                 return None
 
-        receivertype_name = get_receivertype_name(project)
-        for rtype in project.receivertypes.all():
-            if rtype.receivertype_name not in [receivertype_name]:
+        # hardwired patch: the receivertype is the first receivertype of the project
+        receivertype = receivertypes[0] if receivertypes else None
+        for rtype in receivertypes:
+            if rtype.receivertype_name != receivertype.receivertype_name:
                 return None
 
-        # create/ update day values
-        try:
-            day = Daily.objects.create(
-                production_date=self.get_value(day_df, 'date'),
-                project=project)
-
-        except IntegrityError:
-            day = Daily.objects.get(
-                production_date=self.get_value(day_df, 'date'),
-                project=project)
-
-        day.pm_comment = (
-            '\n'.join([str(self.get_value(day_df, f'comment {i}')) for i in range(1, 8)
-                       if not pd.isnull(self.get_value(
-                           day_df, f'comment {i}'))])[:COMMENT_LENGTH]
-        )
-
+        daily = {
+            'pm_comment': '\n'.join(
+                [str(self.get_value(day_cells, f'comment {i}')) for i in range(1, 8)
+                 if not pd.isnull(self.get_value(day_cells, f'comment {i}'))]
+            )[:COMMENT_LENGTH]
+        }
         # add block to daily if block name is valid for the project
-        block_name = self.get_value(day_df, 'block')
-        if block_name in [b.block_name for b in project.blocks.all()]:
-            day.block = Block.objects.get(project=project, block_name=block_name)
+        block_name = self.get_value(day_cells, 'block')
+        if block_name in blocks:
+            daily['block'] = blocks[block_name]
 
-        day.save()
-
-        # create/ update source production values for source types
+        source = {}
         for stype, stype_name in sourcetype_names.items():
-
             # check if sourcetype name exists in the project
-            if not project.sourcetypes.filter(sourcetype_name=stype_name):
+            if stype_name not in sourcetypes:
                 continue
 
-            try:
-                prod = SourceProduction.objects.create(
-                    daily=day,
-                    sourcetype=day.project.sourcetypes.get(
-                        sourcetype_name=stype_name)
-                )
-
-            except IntegrityError:
-                prod = SourceProduction.objects.get(
-                    daily=day,
-                    sourcetype=day.project.sourcetypes.get(
-                        sourcetype_name=stype_name)
-                )
-            prod.sp_t1_flat = int(
-                np.nan_to_num(self.get_value(day_df, f'sp_t1_{stype}')))
-            prod.sp_t2_rough = int(
-                np.nan_to_num(self.get_value(day_df, f'sp_t2_{stype}')))
-            prod.sp_t3_facilities = int(
-                np.nan_to_num(self.get_value(day_df, f'sp_t3_{stype}')))
-            prod.sp_t4_dunes = int(
-                np.nan_to_num(self.get_value(day_df, f'sp_t4_{stype}')))
-            prod.sp_t5_sabkha = int(
-                np.nan_to_num(self.get_value(day_df, f'sp_t5_{stype}')))
-            prod.skips = int(
-                np.nan_to_num(self.get_value(day_df, f'skips_{stype}')))
-            prod.save()
-
-        # create/ update receiver production value
-        try:
-            rcvr = ReceiverProduction.objects.create(
-                daily=day,
-                receivertype=day.project.receivertypes.get(
-                    receivertype_name=receivertype_name[:NAME_LENGTH])
-            )
+            source[sourcetypes[stype_name]] = {
+                'sp_t1_flat': self.get_int(day_cells, f'sp_t1_{stype}'),
+                'sp_t2_rough': self.get_int(day_cells, f'sp_t2_{stype}'),
+                'sp_t3_facilities': self.get_int(day_cells, f'sp_t3_{stype}'),
+                'sp_t4_dunes': self.get_int(day_cells, f'sp_t4_{stype}'),
+                'sp_t5_sabkha': self.get_int(day_cells, f'sp_t5_{stype}'),
+                'skips': self.get_int(day_cells, f'skips_{stype}'),
+            }
+
+        qc_field = self.get_value(day_cells, 'node qc')
+        receiver = {
+            'layout': self.get_int(day_cells, 'layout'),
+            'pickup': self.get_int(day_cells, 'pickup'),
+            'node_download': self.get_int(day_cells, 'node download'),
+            'node_charged': self.get_int(day_cells, 'node charged'),
+            'node_failure': self.get_int(day_cells, 'node failure'),
+            'node_repair': self.get_int(day_cells, 'node repair'),
+            'qc_field': qc_field if not np.isnan(qc_field) else None,
+        }
 
-        except IntegrityError:
-            rcvr = ReceiverProduction.objects.get(
-                daily=day,
-                receivertype=day.project.receivertypes.get(
-                    receivertype_name=receivertype_name[:NAME_LENGTH])
-            )
+        time_breakdown = {
+            'rec_hours': self.get_float(day_cells, 'rec hours'),
+            'rec_moveup': self.get_float(day_cells, 'rec moveup'),
+            'logistics': self.get_float(day_cells, 'logistics'),
+            'camp_move': self.get_float(day_cells, 'camp move'),
+            'wait_source': self.get_float(day_cells, 'wait source'),
+            'wait_layout': self.get_float(day_cells, 'wait layout'),
+            'wait_shift_change': self.get_float(day_cells, 'wait shift change'),
+            'company_suspension': self.get_float(day_cells, 'company suspension'),
+            'company_tests': self.get_float(day_cells, 'company tests'),
+            'beyond_control': self.get_float(day_cells, 'beyond contractor control'),
+            'line_fault': 0.0,  # No longer used
+            'rec_eqpmt_fault': self.get_float(day_cells, 'Rec. eqpmt fault'),
+            'vibrator_fault': self.get_float(day_cells, 'vibrator fault'),
+            'incident': self.get_float(day_cells, 'incident'),
+            'legal_dispute': self.get_float(day_cells, 'Legal/ dispute'),
+            'comp_instruction': self.get_float(day_cells, 'DT comp. instruction'),
+            'contractor_noise': self.get_float(day_cells, 'Contractor noise'),
+            'other_downtime': self.get_float(day_cells, 'other dt'),
+        }
 
-        rcvr.layout = int(np.nan_to_num(self.get_value(day_df, 'layout')))
-        rcvr.pickup = int(np.nan_to_num(self.get_value(day_df, 'pickup')))
-        rcvr.node_download = int(np.nan_to_num(self.get_value(day_df, 'node download')))
-        rcvr.node_charged = int(np.nan_to_num(self.get_value(day_df, 'node charged')))
-        rcvr.node_failure = int(np.nan_to_num(self.get_value(day_df, 'node failure')))
-        rcvr.node_repair = int(np.nan_to_num(self.get_value(day_df, 'node repair')))
-        v = self.get_value(day_df, 'node qc')
-        rcvr.qc_field = v if not np.isnan(v) else None
-        rcvr.save()
-
-        # create/ update time breakdown values
-        try:
-            time_breakdown = TimeBreakdown.objects.create(daily=day)
-
-        except IntegrityError:
-            time_breakdown = TimeBreakdown.objects.get(daily=day)
-
-        time_breakdown.rec_hours = np.nan_to_num(self.get_value(day_df, 'rec hours'))
-        time_breakdown.rec_moveup = np.nan_to_num(self.get_value(day_df, 'rec moveup'))
-        time_breakdown.logistics = np.nan_to_num(self.get_value(day_df, 'logistics'))
-        time_breakdown.camp_move = np.nan_to_num(self.get_value(day_df, 'camp move'))
-        time_breakdown.wait_source = np.nan_to_num(self.get_value(day_df, 'wait source'))
-        time_breakdown.wait_layout = np.nan_to_num(self.get_value(day_df, 'wait layout'))
-        time_breakdown.wait_shift_change = np.nan_to_num(
-            self.get_value(day_df, 'wait shift change'))
-        time_breakdown.company_suspension = np.nan_to_num(
-            self.get_value(day_df, 'company suspension'))
-        time_breakdown.company_tests = np.nan_to_num(
-            self.get_value(day_df, 'company tests'))
-        time_breakdown.beyond_control = np.nan_to_num(
-            self.get_value(day_df, 'beyond contractor control'))
-        time_breakdown.line_fault = 0.0  # No longer used
-        time_breakdown.rec_eqpmt_fault = np.nan_to_num(
-            self.get_value(day_df, 'Rec. eqpmt fault'))
-        time_breakdown.vibrator_fault = np.nan_to_num(
-            self.get_value(day_df, 'vibrator fault'))
-        time_breakdown.incident = np.nan_to_num(self.get_value(day_df, 'incident'))
-        time_breakdown.legal_dispute = np.nan_to_num(
-            self.get_value(day_df, 'Legal/ dispute'))
-        time_breakdown.comp_instruction = np.nan_to_num(
-            self.get_value(day_df, 'DT comp. instruction'))
-        time_breakdown.contractor_noise = np.nan_to_num(
-            self.get_value(day_df, 'Contractor noise'))
-        time_breakdown.other_downtime = np.nan_to_num(self.get_value(day_df, 'other dt'))
-        time_breakdown.save()
-
-        # create/ update time hseweather values
-        try:
-            hse_weather = HseWeather.objects.create(daily=day)
-
-        except IntegrityError:
-            hse_weather = HseWeather.objects.get(daily=day)
-
-        hse_weather.stop = int(np.nan_to_num(self.get_value(day_df, 'hse stop cards')))
-        hse_weather.lti = int(np.nan_to_num(self.get_value(day_df, 'hse lti')))
-        hse_weather.fac = int(np.nan_to_num(self.get_value(day_df, 'hse fac')))
-        hse_weather.mtc = int(np.nan_to_num(self.get_value(day_df, 'hse mtc')))
-        hse_weather.rwc = int(np.nan_to_num(self.get_value(day_df, 'hse RWC')))
-        hse_weather.incident_nm = int(
-            np.nan_to_num(self.get_value(day_df, 'hse incident or nm')))
-        hse_weather.medevac = int(np.nan_to_num(self.get_value(day_df, 'hse medevac')))
-        hse_weather.drills = int(np.nan_to_num(self.get_value(day_df, 'hse drills')))
-        hse_weather.audits = int(np.nan_to_num(self.get_value(day_df, 'hse audits')))
-        hse_weather.lsr_violations = int(
-            np.nan_to_num(self.get_value(day_df, 'hse lsr violation')))
-        hse_weather.headcount = np.nan_to_num(self.get_value(day_df, 'headcount'))
-        hse_weather.exposure_hours = np.nan_to_num(self.get_value(
-            day_df, 'exposure hours'))
-        hse_weather.weather_condition = str(self.get_value(
-            day_df, 'weather condition'))[:DESCR_LENGTH]
-        hse_weather.rain = str(self.get_value(day_df, 'rain'))[:NAME_LENGTH]
-        hse_weather.temp_min = np.nan_to_num(self.get_value(day_df, 'temp min'))
-        hse_weather.temp_max = np.nan_to_num(self.get_value(day_df, 'temp max'))
-        hse_weather.save()
-
-        # delete toolboxes and then (re)create
-        toolboxes = ToolBox.objects.filter(hse=hse_weather)
-        for toolbox in toolboxes:
-            toolbox.delete()
+        hse_weather = {
+            'stop': self.get_int(day_cells, 'hse stop cards'),
+            'lti': self.get_int(day_cells, 'hse lti'),
+            'fac': self.get_int(day_cells, 'hse fac'),
+            'mtc': self.get_int(day_cells, 'hse mtc'),
+            'rwc': self.get_int(day_cells, 'hse RWC'),
+            'incident_nm': self.get_int(day_cells, 'hse incident or nm'),
+            'medevac': self.get_int(day_cells, 'hse medevac'),
+            'drills': self.get_int(day_cells, 'hse drills'),
+            'audits': self.get_int(day_cells, 'hse audits'),
+            'lsr_violations': self.get_int(day_cells, 'hse lsr violation'),
+            'headcount': self.get_float(day_cells, 'headcount'),
+            'exposure_hours': self.get_float(day_cells, 'exposure hours'),
+            'weather_condition': str(
+                self.get_value(day_cells, 'weather condition'))[:DESCR_LENGTH],
+            'rain': str(self.get_value(day_cells, 'rain'))[:NAME_LENGTH],
+            'temp_min': self.get_float(day_cells, 'temp min'),
+            'temp_max': self.get_float(day_cells, 'temp max'),
+        }
 
+        toolboxes = []
         for i in range(1, 9):
-            toolbox_topic = self.get_value(day_df, f'toolbox {i}')
+            toolbox_topic = self.get_value(day_cells, f'toolbox {i}')
             try:
                 if np.isnan(toolbox_topic):
                     continue
@@ -383,121 +385,107 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
                 pass
 
             if toolbox_topic:
-                ToolBox.objects.create(
-                    hse=hse_weather, toolbox=toolbox_topic.rstrip('\n')[:DESCR_LENGTH])
-
-        return day.production_date
-
-    @staticmethod
-    def calc_day_prod_totals(daily, sourcetype):
-        if daily:
-            try:
-                prod = SourceProduction.objects.get(
-                    daily=daily, sourcetype=sourcetype,
-                )
-
-            except SourceProduction.DoesNotExist:
-                dp = {f'day_{key[:5]}': np.nan for key in source_prod_schema}
-                dp['day_total'] = np.nan
-                return dp
-
-        else:
-            dp = {f'day_{key[:5]}': np.nan for key in source_prod_schema}
-            dp['day_total'] = np.nan
-            return dp
-
-        dp = {f'day_{key[:5]}': np.nan_to_num(getattr(prod, key))
-              for key in source_prod_schema}
-
-        # exclude last key for skips
-        dp['day_total'] = np.sum(
-            dp[f'day_{key[:5]}'] for key in source_prod_schema[:-1]
-        )
-
-        return dp
-
-    @staticmethod
-    def calc_week_prod_totals(daily, sourcetype):
-        if daily:
-            end_date = daily.production_date
-            start_date = end_date - timedelta(days=WEEKDAYS-1)
-
-            sp_query = SourceProduction.objects.filter(
-                Q(daily__production_date__gte=start_date),
-                Q(daily__production_date__lte=end_date),
-                sourcetype=sourcetype,
-            )
-
-        else:
-            sp_query = None
-
-        if not sp_query:
-            wp = {f'week_{key[:5]}': np.nan for key in source_prod_schema}
-            wp['week_total'] = np.nan
-            return wp
-
-        wp = {f'week_{key[:5]}': np.nansum([val[key] for val in sp_query.values()])
-              for key in source_prod_schema}
-
-        # exclude last key for skips
-        wp['week_total'] = np.sum(
-            wp[f'week_{key[:5]}'] for key in source_prod_schema[:-1]
-        )
-
-        return wp
+                toolboxes.append(toolbox_topic.rstrip('\n')[:DESCR_LENGTH])
+
+        return {
+            'production_date': pd.Timestamp(self.get_value(day_cells, 'date')).date(),
+            'daily': daily,
+            'source': source,
+            'receivertype': receivertype,
+            'receiver': receiver,
+            'time_breakdown': time_breakdown,
+            'hse_weather': hse_weather,
+            'toolboxes': toolboxes,
+        }
 
-    @staticmethod
-    def calc_month_prod_totals(daily, sourcetype):
-        # filter for days in the month up to and including the production date
-        if daily:
-            sp_query = SourceProduction.objects.filter(
-                Q(daily__production_date__year=daily.production_date.year) &
-                Q(daily__production_date__month=daily.production_date.month) &
-                Q(daily__production_date__day__lte=daily.production_date.day),
-                sourcetype=sourcetype,
+    def save_report_values(self, project, report_values, update_totals=True) -> datetime:
+        ''' creates or updates the daily report of the project with report_values in a
+            single transaction, so a failure does not leave a partial daily report.
+            If update_totals is False the caller must update the cumulative totals
+            and no savepoint is made, so a failure rolls back the transaction of the
+            caller
+            returns: production date of the daily report
+        '''
+        with transaction.atomic(savepoint=update_totals):
+            day, created = Daily.objects.update_or_create(
+                project=project, production_date=report_values['production_date'],
+                defaults=report_values['daily'],
             )
+            # the fetched day does not have the project cached
+            day.project = project
+            # replace the values of an existing day, this takes less queries than an
+            # update_or_create for each row
+            if not created:
+                SourceProduction.objects.filter(daily=day).delete()
+                ReceiverProduction.objects.filter(daily=day).delete()
+                TimeBreakdown.objects.filter(daily=day).delete()
+                # toolboxes are deleted with the hse weather
+                HseWeather.objects.filter(daily=day).delete()
+
+            # the rows are bulk created as the save of the day has already incremented
+            # the data version of the project
+            SourceProduction.objects.bulk_create([
+                SourceProduction(daily=day, sourcetype=sourcetype, **values)
+                for sourcetype, values in report_values['source'].items()
+            ])
+            if report_values['receivertype']:
+                ReceiverProduction.objects.bulk_create([ReceiverProduction(
+                    daily=day, receivertype=report_values['receivertype'],
+                    **report_values['receiver'],
+                )])
+
+            TimeBreakdown.objects.bulk_create(
+                [TimeBreakdown(daily=day, **report_values['time_breakdown'])])
+            hse_weather = HseWeather.objects.create(
+                daily=day, **report_values['hse_weather'])
+            ToolBox.objects.bulk_create([
+                ToolBox(hse=hse_weather, toolbox=toolbox)
+                for toolbox in report_values['toolboxes']
+            ])
+
+            self.update_daily_kpis(day)
+            if update_totals:
+                self.update_cumulative_totals(project, day.production_date)
 
-        else:
-            sp_query = None
-
-        if not sp_query:
-            mp = {f'month_{key[:5]}': np.nan for key in source_prod_schema}
-            mp['month_total'] = np.nan
-            return mp
-
-        mp = {f'month_{key[:5]}': np.nansum([val[key] for val in sp_query.values()])
-              for key in source_prod_schema}
-
-        # exclude last key for skips
-        mp['month_total'] = np.sum(
-            mp[f'month_{key[:5]}'] for key in source_prod_schema[:-1]
-        )
-
-        return mp
+        return day.production_date
 
     def calc_proj_prod_totals(self, daily, sourcetype):
-        # filter for all days in the project up to and including the production date
+        # filter for all days in the project up to and including the production date,
+        # the rows are fetched once with the production date of the joined daily
         if daily:
-            sp_query = SourceProduction.objects.filter(
+            sp_rows = list(SourceProduction.objects.filter(
                 daily__production_date__lte=daily.production_date,
                 sourcetype=sourcetype,
-            ).order_by('daily__production_date')
+            ).order_by('daily__production_date').values_list(
+                'daily__production_date', *source_prod_schema))
 
         else:
-            sp_query = None
+            sp_rows = None
 
-        if not sp_query:
+        if not sp_rows:
             pp = {f'proj_{key[:5]}': np.nan for key in source_prod_schema}
             pp['proj_total'] = np.nan
             return pp, {}
 
-        p_series = {f'{key[:5]}_series': nan_array(
-            [val[key] for val in sp_query.values()]) for key in source_prod_schema}
-        p_series = self.calc_ctm_series(p_series, sourcetype)
+        dates, *sp_columns = zip(*sp_rows)
+        p_series = {f'{key[:5]}_series': nan_array(column)
+                    for key, column in zip(source_prod_schema, sp_columns)}
+        date_series = np.array(dates)
+
+        # take the stored kpis if available, otherwise calculate them
+        kpi_series = self.get_kpi_series(daily, sourcetype, date_series)
+        if kpi_series:
+            p_series['tcf_series'] = kpi_series['tcf_series']
+            p_series['total_sp_series'] = kpi_series['total_sp_series']
+            p_series['ctm_series'] = kpi_series['ctm_series']
+            p_series['appctm_series'] = kpi_series['appctm_series']
+            p_series['rate_series'] = [np.nan] * len(date_series)
+
+        else:
+            p_series = self.calc_ctm_series(p_series, sourcetype)
 
         # important date_series should come last as this is not numerical value!
-        p_series['date_series'] = np.array(
-            [val.daily.production_date for val in sp_query])
+        p_series['date_series'] = date_series
 
         pp = {f'proj_{key[:5]}': np.nansum(
             p_series[f'{key[:5]}_series']) for key in source_prod_schema}
@@ -509,115 +497,18 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
 
         return pp, p_series
 
-    @staticmethod
-    def calc_day_time_totals(daily):
-        try:
-            tb = TimeBreakdown.objects.get(daily=daily)
-
-        except TimeBreakdown.DoesNotExist:
-            dt = {f'day_{key}': np.nan for key in time_breakdown_schema}
-            dt['day_rec_time'] = np.nan
-            dt['day_ops_time'] = np.nan
-            dt['day_standby'] = np.nan
-            dt['day_downtime'] = np.nan
-            dt['day_total_time'] = np.nan
-            return dt
-
-        dt = {f'day_{key}': np.nan_to_num(getattr(tb, key))
-              for key in time_breakdown_schema}
-
-        dt['day_rec_time'] = np.nansum(tb.rec_hours)
-        dt['day_ops_time'] = np.nansum([getattr(tb, key) for key in ops_time_keys])
-        dt['day_standby'] = np.nansum([getattr(tb, key) for key in standby_keys])
-        dt['day_downtime'] = np.nansum([getattr(tb, key) for key in downtime_keys])
-        dt['day_total_time'] = np.nansum([
-            dt['day_ops_time'], dt['day_standby'], dt['day_downtime'],
-        ])
-
-        return dt
-
-    @staticmethod
-    def calc_week_time_totals(daily):
-        if daily:
-            end_date = daily.production_date
-            start_date = end_date - timedelta(days=WEEKDAYS-1)
-
-            tb_query = TimeBreakdown.objects.filter(
-                Q(daily__production_date__gte=start_date),
-                Q(daily__production_date__lte=end_date),
-                daily__project=daily.project,
-            )
-
-        else:
-            tb_query = None
-
-        if not tb_query:
-            wt = {f'week_{key}': np.nan for key in time_breakdown_schema}
-            wt['week_rec_time'] = np.nan
-            wt['week_ops_time'] = np.nan
-            wt['week_standby'] = np.nan
-            wt['week_downtime'] = np.nan
-            wt['week_total_time'] = np.nan
-            return wt
-
-        wt = {f'week_{key}': np.nansum([val[key] for val in tb_query.values()])
-              for key in time_breakdown_schema}
-
-        wt['week_rec_time'] = wt['week_rec_hours']
-        wt['week_ops_time'] = np.nansum([wt[f'week_{key}'] for key in ops_time_keys])
-        wt['week_standby'] = np.nansum([wt[f'week_{key}'] for key in standby_keys])
-        wt['week_downtime'] = np.nansum([wt[f'week_{key}'] for key in downtime_keys])
-        wt['week_total_time'] = np.nansum([
-            wt['week_ops_time'], wt['week_standby'], wt['week_downtime']
-        ])
-
-        return wt
-
-    @staticmethod
-    def calc_month_time_totals(daily):
-        if daily:
-            tb_query = TimeBreakdown.objects.filter(
-                Q(daily__production_date__year=daily.production_date.year) &
-                Q(daily__production_date__month=daily.production_date.month) &
-                Q(daily__production_date__day__lte=daily.production_date.day),
-                daily__project=daily.project,
-            )
-        else:
-            tb_query = None
-
-        if not tb_query:
-            mt = {f'month_{key}': np.nan for key in time_breakdown_schema}
-            mt['month_rec_time'] = np.nan
-            mt['month_ops_time'] = np.nan
-            mt['month_standby'] = np.nan
-            mt['month_downtime'] = np.nan
-            mt['month_total_time'] = np.nan
-            return mt
-
-        mt = {f'month_{key}': np.nansum([val[key] for val in tb_query.values()])
-              for key in time_breakdown_schema}
-
-        mt['month_rec_time'] = mt['month_rec_hours']
-        mt['month_ops_time'] = np.nansum([mt[f'month_{key}'] for key in ops_time_keys])
-        mt['month_standby'] = np.nansum([mt[f'month_{key}'] for key in standby_keys])
-        mt['month_downtime'] = np.nansum([mt[f'month_{key}'] for key in downtime_keys])
-        mt['month_total_time'] = np.nansum([
-            mt['month_ops_time'], mt['month_standby'], mt['month_downtime']
-        ])
-
-        return mt
-
     def calc_proj_time_totals(self, daily):
         if daily:
-            tb_query = TimeBreakdown.objects.filter(
+            tb_rows = list(TimeBreakdown.objects.filter(
                 daily__production_date__lte=daily.production_date,
                 daily__project=daily.project,
-            ).order_by('daily__production_date')
+            ).order_by('daily__production_date').values_list(
+                'daily__production_date', *time_breakdown_schema))
 
         else:
-            tb_query = None
+            tb_rows = None
 
-        if not tb_query:
+        if not tb_rows:
             pt = {f'proj_{key}': np.nan for key in time_breakdown_schema}
             pt['proj_rec_time'] = np.nan
             pt['proj_ops_time'] = np.nan
@@ -626,8 +517,9 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
             pt['proj_total_time'] = np.nan
             return pt, {}
 
-        ts = {f'{key}_series': nan_array([val[key] for val in tb_query.values()])
-              for key in time_breakdown_schema}
+        dates, *tb_columns = zip(*tb_rows)
+        ts = {f'{key}_series': nan_array(column)
+              for key, column in zip(time_breakdown_schema, tb_columns)}
 
         ts['ops_series'] = sum(ts[f'{key}_series'] for key in ops_time_keys)
         ts['standby_series'] = sum(ts[f'{key}_series'] for key in standby_keys)
@@ -635,7 +527,7 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
         ts['total_time_series'] = (
             ts['ops_series'] + ts['standby_series'] + ts['downtime_series']
         )
-        ts['date_series'] = np.array([val.daily.production_date for val in tb_query])
+        ts['date_series'] = np.array(dates)
 
         pt = {f'proj_{key}': np.nansum(ts[f'{key}_series'])
               for key in time_breakdown_schema}
@@ -649,16 +541,9 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
 
         return pt, ts
 
-    def calc_prod_totals(self, daily, times, sourcetype):
-        day_prod = self.calc_day_prod_totals(daily, sourcetype)
-        week_prod = self.calc_week_prod_totals(daily, sourcetype)
-        month_prod = self.calc_month_prod_totals(daily, sourcetype)
-        proj_prod, prod_series = self.calc_proj_prod_totals(daily, sourcetype)
-        prod_total = {**day_prod, **week_prod, **month_prod, **proj_prod}
-
-        return prod_total, prod_series
-
-    def calc_period_totals(self, day, stype, times_total, prod_total):
+    def calc_period_totals(
+            self, day, stype, times_total, prod_total,
+            periods=('day', 'week', 'month', 'proj')):
         try:
             proj_days = (day.production_date - day.project.planned_start_date).days + 1
             if proj_days < 1:
@@ -671,7 +556,7 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
             'day': 1, 'week': WEEKDAYS,
             'month': day.production_date.day, 'proj': proj_days,
         }
-        for period in ['day', 'week', 'month', 'proj']:
+        for period in periods:
             prod_total[f'{period}_tcf'] = self.calc_tcf(period, prod_total)
             prod_total[f'{period}_ctm'] = self.calc_ctm(
                 stype, prod_total[f'{period}_tcf']) * days[period]
@@ -688,43 +573,55 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
 
         return prod_total
 
-    def calc_combined_series(self, day, times_total, prod_series_by_type):
+    def calc_combined_series(self, day, time_series, prod_series_by_type):
 
         prod_series = {}
         for pseries in prod_series_by_type.values():
             prod_series = sum_keys(prod_series, pseries)
         ps_length = len(prod_series['total_sp_series'])
 
-        ctm_series = np.zeros(ps_length)
-        tcf_series = np.zeros(ps_length)
-        totals = np.array(prod_series['total_sp_series'])
-        for pseries in prod_series_by_type.values():
-            ctm = np.array(pseries['ctm_series'])
-            app = np.array(pseries['total_sp_series'])
-            tcf = np.array(pseries['tcf_series'])
-
-            weights = np.array([v1 / v2 if v2 > 0 else 0 for v1, v2 in zip(app, totals)])
-            ctm_series = ctm_series + ctm * weights
-            tcf_series = tcf_series + tcf * weights
+        # take the stored combined kpis if available, otherwise calculate them
+        kpi_series = self.get_kpi_series(day, None, prod_series['date_series'])
+        if kpi_series:
+            prod_series['ctm_series'] = np.array(kpi_series['ctm_series'])
+            prod_series['tcf_series'] = np.array(kpi_series['tcf_series'])
+            prod_series['appctm_series'] = np.array(kpi_series['appctm_series'])
+            prod_series['rate_series'] = np.array(kpi_series['rate_series'])
+            return prod_series
+
+        # weights of the sourcetypes is their share of the production (types x days)
+        totals = np.array(prod_series['total_sp_series'], dtype=float)
+        type_sp = np.array([
+            pseries['total_sp_series'] for pseries in prod_series_by_type.values()],
+            dtype=float).reshape(-1, ps_length)
+        weights = calc_ratio_array(type_sp, totals)
+        weights[:, ~(totals > 0)] = 0
+        ctm = np.array([
+            pseries['ctm_series'] for pseries in prod_series_by_type.values()],
+            dtype=float).reshape(-1, ps_length)
+        tcf = np.array([
+            pseries['tcf_series'] for pseries in prod_series_by_type.values()],
+            dtype=float).reshape(-1, ps_length)
+        ctm_series = (ctm * weights).sum(axis=0)
+        tcf_series = (tcf * weights).sum(axis=0)
 
         prod_series['ctm_series'] = ctm_series
         prod_series['tcf_series'] = tcf_series
-        prod_series['appctm_series'] = np.array(
-            [calc_ratio(v1, v2) if v2 > 0 else np.nan
-            for v1, v2 in zip(totals, ctm_series)])
-
-        rate_series = []
-        for appctm, total_time, standby in zip(prod_series['appctm_series'],
-                                               self.time_series['total_time_series'],
-                                               self.time_series['standby_series']):
-            rate_series.append(
-                self.calc_rate(day, CTM_METHOD, appctm, total_time, standby)
-            )
-        prod_series['rate_series'] = np.array(rate_series)
+        appctm_series = calc_ratio_array(totals, ctm_series)
+        appctm_series[~(ctm_series > 0)] = np.nan
+        prod_series['appctm_series'] = appctm_series
+        # the time breakdown may not be available for all production days
+        n_days = min(ps_length, len(time_series['total_time_series']))
+        prod_series['rate_series'] = self.calc_rate_series(
+            day, CTM_METHOD, appctm_series[:n_days],
+            time_series['total_time_series'][:n_days],
+            time_series['standby_series'][:n_days])
 
         return prod_series
 
-    def calc_combined_production(self, day, times_total, prod_total_by_type):
+    def calc_combined_production(
+            self, day, times_total, prod_total_by_type,
+            periods=('day', 'week', 'month', 'proj')):
         try:
             proj_days = (day.production_date - day.project.planned_start_date).days + 1
             if proj_days < 1:
@@ -741,7 +638,7 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
         for ptotal in prod_total_by_type.values():
             prod_total = sum_keys(prod_total, ptotal)
 
-        for period in ['day', 'week', 'month', 'proj']:
+        for period in periods:
             # calculate weighted sum of tcf and ctm
             tcf = 0
             ctm = 0
@@ -771,54 +668,75 @@ class ReportInterface(_receiver_backend.Mixin, _hse_backend.Mixin, _graph_backen
         return prod_total
 
     @timed(logger, print_log=True)
-    def calc_totals(self, daily):
+    def calc_totals(self, daily) -> ReportTotals:
+        ''' calculates the day, week, month and project totals for production, time
+            breakdown, receivers and hse. The period totals are taken from the
+            cumulative totals or, if not available, aggregated in the database.
+            The project series are required for the graphs. The results are
+            cached until the data of the project changes.
+            returns: ReportTotals
+        '''
+        cache_key = self.get_totals_cache_key(daily)
+        report_totals = self.get_cached_totals(cache_key)
+        if report_totals is not None:
+            return report_totals
+
+        cumulative_rows = self.get_cumulative_rows(daily) if daily else None
+        if cumulative_rows is None:
+            cumulative_rows = {'source': None, 'receiver': {}, 'time': None, 'hse': None}
 
         # get time breakdown stats
-        day_times = self.calc_day_time_totals(daily)
-        week_times = self.calc_week_time_totals(daily)
-        month_times = self.calc_month_time_totals(daily)
-        proj_times, self.time_series = self.calc_proj_time_totals(daily)
-        times_total = {**day_times, **week_times, **month_times, **proj_times}
-
-        prod_total_by_type = {}
-        self.prod_series_by_type = {}
+        times_total = self.aggregate_time_totals(daily, row=cumulative_rows['time'])
+        _, time_series = self.calc_proj_time_totals(daily)
+
+        prod_series_by_type = {}
+        mpr_rec_hours = self.get_mpr_rec_hours(None)
         if daily:
-            for stype in daily.project.sourcetypes.all():
-                prod, series = self.calc_prod_totals(daily, times_total, stype)
-                prod = self.calc_period_totals(daily, stype, times_total, prod)
-                prod_total_by_type[stype.sourcetype_name] = prod
-                self.prod_series_by_type[stype.sourcetype_name] = series
-
-            self.prod_series = self.calc_combined_series(
-                daily, times_total, self.prod_series_by_type)
+            sourcetypes = daily.project.sourcetypes.all()
+            prod_total_by_type = self.aggregate_prod_totals(
+                daily, sourcetypes, rows=cumulative_rows['source'])
+            for stype in sourcetypes:
+                _, series = self.calc_proj_prod_totals(daily, stype)
+                prod_total_by_type[stype.sourcetype_name] = self.calc_period_totals(
+                    daily, stype, times_total, prod_total_by_type[stype.sourcetype_name])
+                prod_series_by_type[stype.sourcetype_name] = series
+                mpr_rec_hours = self.get_mpr_rec_hours(stype)
+
+            prod_series = self.calc_combined_series(
+                daily, time_series, prod_series_by_type)
             prod_total = self.calc_combined_production(
                 daily, times_total, prod_total_by_type)
 
         else:
-            prod_total, self.prod_series = self.calc_prod_totals(daily, times_total, None)
+            prod_total_by_type = {}
+            prod_total = {
+                f'{period}_{key}': np.nan for period in _aggregate_backend.PERIODS
+                for key in [*(key[:5] for key in source_prod_schema), 'total']}
+            prod_series = {}
 
         receivertype = daily.project.receivertypes.all()[0] if daily else None
-        day_rcvr = self.day_receiver_total(daily, receivertype)
-        week_rcvr = self.week_receiver_total(daily, receivertype)
-        month_rcvr = self.month_receiver_total(daily, receivertype)
-        proj_rcvr, self.rcvr_series = self.project_receiver_total(daily, receivertype)
-        rcvr_total = {**day_rcvr, **week_rcvr, **month_rcvr, **proj_rcvr}
+        rcvr_total = self.aggregate_receiver_totals(
+            daily, receivertype, row=cumulative_rows['receiver'].get(
+                receivertype.id if receivertype else None))
+        _, rcvr_series = self.project_receiver_total(daily, receivertype)
 
         # get hse stats
-        day_hse = self.day_hse_totals(daily)
-        week_hse = self.week_hse_totals(daily)
-        month_hse = self.month_hse_totals(daily)
-        proj_hse, self.hse_series = self.proj_hse_totals(daily)
-        hse_total = {**day_hse, **week_hse, **month_hse, **proj_hse}
-
-        return prod_total_by_type, prod_total, times_total, rcvr_total, hse_total
-
-    @property
-    def series(self) -> typing.Optional[tuple]:
-        return (
-            self.prod_series_by_type, self.prod_series,
-            self.time_series, self.rcvr_series, self.hse_series,
+        hse_total = {
+            **self.day_hse_totals(daily),
+            **self.aggregate_hse_totals(daily, row=cumulative_rows['hse']),
+        }
+        _, hse_series = self.proj_hse_totals(daily)
+
+        report_totals = ReportTotals(
+            prod_total_by_type=prod_total_by_type, prod_total=prod_total,
+            times_total=times_total, rcvr_total=rcvr_total, hse_total=hse_total,
+            prod_series_by_type=prod_series_by_type, prod_series=prod_series,
+            time_series=time_series, rcvr_series=rcvr_series, hse_series=hse_series,
+            mpr_rec_hours=mpr_rec_hours,
+            graph_key=f'{daily.project_id}/{daily.production_date}' if daily else '',
         )
+        self.set_cached_totals(cache_key, report_totals)
+        return report_totals
 
     @timed(logger, print_log=True)
     def calc_block_totals(self, daily):
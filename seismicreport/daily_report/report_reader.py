@@ -0,0 +1,143 @@
+''' module to read the daily report workbooks. Only the cells of the BGP_DR_table
+    are read from the workbook. The module does not depend on Django, so that
+    workbooks can be read in worker processes
+'''
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import xlrd
+from openpyxl import load_workbook
+from openpyxl.utils.exceptions import InvalidFileException
+from seismicreport.vars import BGP_DR_table
+
+# bounding rows and columns of the cells of BGP_DR_table, the unused line fault is
+# outside the report
+report_cells = {kw: cell for kw, cell in BGP_DR_table.items() if kw != 'line fault'}
+max_row = max(r for r, _ in report_cells.values())
+max_col = max(c for _, c in report_cells.values())
+
+
+def get_value(day_cells, kw):
+    ''' returns: value of kw in the cells of read_report_cells, nan if not available
+    '''
+    return day_cells.get(kw, np.nan)
+
+
+def read_xlsx_rows(file_name):
+    ''' reads the rows of the first sheet within the bounding rows and columns from a
+        xlsx workbook
+        returns: list of rows with cell values
+    '''
+    wb = load_workbook(file_name, read_only=True, data_only=True, keep_links=False)
+    try:
+        return [list(row) for row in wb.worksheets[0].iter_rows(
+            max_row=max_row + 1, max_col=max_col + 1, values_only=True)]
+
+    finally:
+        # a read only workbook keeps the file open until closed
+        wb.close()
+
+
+def read_xls_rows(file_name):
+    ''' reads the rows of the first sheet within the bounding rows and columns from a
+        legacy xls workbook, with the cell values converted as openpyxl does
+        returns: list of rows with cell values
+    '''
+    wb = xlrd.open_workbook(file_name, on_demand=True)
+    try:
+        sheet = wb.sheet_by_index(0)
+        rows = []
+        for r in range(min(sheet.nrows, max_row + 1)):
+            row = []
+            for cell in sheet.row_slice(r, 0, max_col + 1):
+                if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK):
+                    row.append(None)
+
+                elif cell.ctype == xlrd.XL_CELL_DATE:
+                    row.append(xlrd.xldate.xldate_as_datetime(cell.value, wb.datemode))
+
+                elif cell.ctype == xlrd.XL_CELL_NUMBER and cell.value.is_integer():
+                    row.append(int(cell.value))
+
+                else:
+                    row.append(cell.value)
+
+            rows.append(row)
+
+        return rows
+
+    finally:
+        wb.release_resources()
+
+
+def read_report_cells(file_name):
+    ''' reads the cells of BGP_DR_table from the first sheet of the daily report
+        workbook. A xlsx workbook is a zip file, other workbooks are read as xls
+        returns: dict with the cell value by BGP_DR_table keyword, nan if empty
+    '''
+    if zipfile.is_zipfile(file_name):
+        rows = read_xlsx_rows(file_name)
+
+    else:
+        rows = read_xls_rows(file_name)
+
+    day_cells = {}
+    for kw, (r, c) in report_cells.items():
+        try:
+            value = rows[r][c]
+
+        except IndexError:
+            value = None
+
+        day_cells[kw] = np.nan if value is None else value
+
+    return day_cells
+
+
+def validate_report(day_cells):
+    ''' validates the daily report against the BGP_DR_table
+        returns: list of errors, empty if the report is valid
+    '''
+    errors = []
+    if pd.isnull(get_value(day_cells, 'project')):
+        errors.append('no project')
+
+    try:
+        if pd.isnull(pd.Timestamp(get_value(day_cells, 'date'))):
+            errors.append('no date')
+
+    except (ValueError, TypeError):
+        errors.append(f'invalid date: {get_value(day_cells, "date")}')
+
+    if all(pd.isnull(get_value(day_cells, f'source_{stype}')) for stype in 'abc'):
+        errors.append('no source types')
+
+    return errors
+
+
+def read_report(file_name):
+    ''' reads and validates the daily report workbook file_name
+        returns: tuple file_name, cells of the report (None if the workbook can not be
+                 read) and list of errors
+    '''
+    try:
+        day_cells = read_report_cells(file_name)
+
+    except (ValueError, OSError, KeyError, zipfile.BadZipFile, InvalidFileException,
+            xlrd.XLRDError) as e:
+        return file_name, None, [f'cannot read workbook: {e}']
+
+    return file_name, day_cells, validate_report(day_cells)
+
+
+def read_reports(file_names, workers=1):
+    ''' reads the daily report workbooks in a pool of workers processes, or in this
+        process if workers is 1
+        returns: list of tuples as read_report in the order of file_names
+    '''
+    if workers < 2 or len(file_names) < 2:
+        return [read_report(file_name) for file_name in file_names]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(read_report, file_names))
@@ -0,0 +1,103 @@
+''' module to load and save the quantities of the service tasks for a month. The
+    quantities of all tasks are loaded as a matrix (tasks x days) in a single query
+    and the changes are saved with bulk queries in a single transaction, so the
+    number of queries does not depend on the number of tasks
+'''
+import calendar
+import datetime
+import numpy as np
+from django.db import transaction
+from django.db.models import Prefetch
+from daily_report.models.service_models import ServiceTask, TaskQuantity
+
+# quantities smaller than this are deleted
+MIN_QUANTITY = 0.01
+
+
+def get_month_dates(year, month):
+    ''' returns: list of the dates of the month
+    '''
+    return [
+        datetime.date(year, month, day)
+        for day in range(1, calendar.monthrange(year, month)[1] + 1)]
+
+
+def get_service_tasks(project, ordered=False):
+    ''' fetches the services of project with their tasks in two queries, if ordered
+        the services by contract and the tasks by name
+        returns: list of tuples service and list of its tasks
+    '''
+    services = project.services.all()
+    tasks = ServiceTask.objects.all()
+    if ordered:
+        services = services.order_by('service_contract')
+        tasks = tasks.order_by('task_name')
+
+    services = services.prefetch_related(Prefetch('tasks', queryset=tasks))
+    return [(service, list(service.tasks.all())) for service in services]
+
+
+def load_month_quantities(tasks, year, month):
+    ''' loads the quantities of tasks for the month in a single query
+        returns: array of the quantities (tasks x days of the month), zero for a day
+                 without a quantity
+    '''
+    dates = get_month_dates(year, month)
+    task_rows = {task.id: row for row, task in enumerate(tasks)}
+    quantities = np.zeros((len(task_rows), len(dates)))
+    if not task_rows:
+        return quantities
+
+    for task_id, date, quantity in TaskQuantity.objects.filter(
+            task_id__in=task_rows, date__range=(dates[0], dates[-1]),
+    ).values_list('task_id', 'date', 'quantity'):
+        quantities[task_rows[task_id], date.day - 1] = quantity
+
+    return quantities
+
+
+def save_month_quantities(task_quantities, year, month):
+    ''' saves the quantities by task id and date for the month in a single
+        transaction, with one query to read the current quantities and one bulk
+        query each to delete, update and create quantities. A quantity of None is
+        not changed and a quantity smaller than MIN_QUANTITY is deleted.
+        returns: tuple number of deleted, updated and created quantities
+    '''
+    dates = get_month_dates(year, month)
+    month_dates = set(dates)
+    delete_ids = []
+    updates = []
+    creates = []
+    with transaction.atomic():
+        rows = TaskQuantity.objects.select_for_update().filter(
+            task_id__in=list(task_quantities), date__range=(dates[0], dates[-1]),
+        ).values_list('id', 'task_id', 'date', 'quantity')
+        current = {
+            (task_id, date): (tq_id, quantity) for tq_id, task_id, date, quantity in rows}
+        for task_id, day_quantities in task_quantities.items():
+            for date, quantity in day_quantities.items():
+                if quantity is None or date not in month_dates:
+                    continue
+
+                tq_id, current_quantity = current.get((task_id, date), (None, None))
+                if abs(quantity) < MIN_QUANTITY:
+                    if tq_id:
+                        delete_ids.append(tq_id)
+
+                elif not tq_id:
+                    creates.append(
+                        TaskQuantity(task_id=task_id, date=date, quantity=quantity))
+
+                elif quantity != current_quantity:
+                    updates.append(TaskQuantity(id=tq_id, quantity=quantity))
+
+        if delete_ids:
+            TaskQuantity.objects.filter(id__in=delete_ids).delete()
+
+        if updates:
+            TaskQuantity.objects.bulk_update(updates, ['quantity'])
+
+        if creates:
+            TaskQuantity.objects.bulk_create(creates)
+
+    return len(delete_ids), len(updates), len(creates)
@@ -0,0 +1,269 @@
+''' module for the snapshots of the weekly page and the weekly and mpr excel reports.
+    When a daily report is uploaded or edited it is queued, and the snapshot worker
+    (management command run_snapshot_worker) creates the snapshots of the queued
+    day and of the latest day of the project. A snapshot is stamped with a hash of
+    the data the reports of its day depend on, the daily reports up to the day, the
+    week comment, the services of the month and the settings of the project, and is
+    only served while that data has not changed, otherwise the views compute the
+    report live. A report of a past day is therefore not affected by the upload of
+    later days.
+'''
+import calendar
+import hashlib
+import pickle
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.db.models import Count, Max
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily, DailyKpi
+from daily_report.models.project_models import (
+    Project, Block, SourceType, ReceiverType,
+)
+from daily_report.models.service_models import ServiceTask, TaskQuantity
+from daily_report.models.weekly_models import Weekly
+from daily_report.models.snapshot_models import SnapshotTask, ReportSnapshot
+from daily_report.report_backend import ReportInterface
+from daily_report.week_backend import WeekInterface
+from daily_report.excel_weekly_backend import (
+    ExcelWeekReport, collate_excel_weekreport_data,
+)
+from daily_report.excel_mpr_backend import ExcelMprReport
+from seismicreport.vars import AVG_PERIOD
+from seismicreport.utils.plogger import Logger, timed
+
+logger = Logger.getlogger()
+XLSX_CONTENT_TYPE = (
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet')
+
+
+def collate_weekly_page_data(day):
+    ''' returns: dict with the totals and the days and weeks of the weekly page
+    '''
+    r_iface = ReportInterface(settings.MEDIA_ROOT)
+    report_totals = r_iface.calc_totals(day)
+    totals_prod = report_totals.prod_total
+    days, weeks = WeekInterface(settings.MEDIA_ROOT).collate_weekdata(day)
+
+    if day.project.planned_vp > 0:
+        proj_complete = (
+            (totals_prod['proj_total'] + totals_prod['proj_skips']) /
+            day.project.planned_vp
+        )
+
+    else:
+        proj_complete = 0
+
+    totals_prod['proj_area'] = day.project.planned_area * proj_complete
+    totals_prod['proj_complete'] = proj_complete
+    totals_prod['est_complete'] = r_iface.calc_est_completion_date(
+        day, AVG_PERIOD, day.project.planned_vp, proj_complete)
+
+    return {
+        'totals_prod': totals_prod,
+        'totals_time': report_totals.times_total,
+        'totals_hse': report_totals.hse_total,
+        'days': days,
+        'weeks': weeks,
+    }
+
+
+def create_week_excel(day, set_progress=None):
+    ''' returns: content of the weekly excel report of day, set_progress is called
+                 with the progress once the report data is collated
+    '''
+    report_data = collate_excel_weekreport_data(day)
+    if set_progress:
+        set_progress(0.5)
+
+    f_excel = ExcelWeekReport(
+        report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT).create_weekreport()
+    return f_excel.read()
+
+
+def create_mpr_excel(day, set_progress=None):
+    ''' returns: content of the mpr excel report of day, set_progress is called with
+                 the progress once the mpr data is calculated
+    '''
+    mpr_report = ExcelMprReport(day)
+    if set_progress:
+        set_progress(0.5)
+
+    return mpr_report.create_mprreport().read()
+
+
+def get_snapshot_stamp(day):
+    ''' returns: sha256 hash of the data the snapshots of day depend on, a saved row
+                 of a daily report updates the last modified time of its daily
+    '''
+    project_id = day.project_id
+    report_date = day.production_date
+    month_start = report_date.replace(day=1)
+    month_end = report_date.replace(
+        day=calendar.monthrange(report_date.year, report_date.month)[1])
+    dependencies = [
+        Daily.objects.filter(
+            project_id=project_id, production_date__lte=report_date,
+        ).aggregate(days=Count('id'), last_modified=Max('last_modified')),
+        DailyKpi.objects.filter(
+            daily__project_id=project_id, daily__production_date__lte=report_date,
+        ).aggregate(kpis=Count('id'), last_modified=Max('last_modified')),
+        list(Weekly.objects.filter(
+            project_id=project_id, week_report_date=report_date,
+        ).values_list('csr_week_comment', 'author_id')),
+        list(Project.objects.filter(id=project_id).values_list(
+            'project_prefix', 'project_name', 'crew_name', 'start_report',
+            'planned_area', 'planned_vp', 'planned_receivers', 'planned_start_date',
+            'planned_end_date', 'standby_rate', 'cap_rate', 'cap_app_ctm')),
+        list(Block.objects.filter(project_id=project_id).order_by('id').values_list(
+            'id', 'block_name', 'block_planned_area', 'block_planned_vp',
+            'block_planned_receivers')),
+    ]
+    for model in [SourceType, ReceiverType]:
+        fields = [
+            field.attname for field in model._meta.concrete_fields
+            if not field.is_relation and field.get_internal_type() != 'BinaryField']
+        dependencies.append(list(model.objects.filter(
+            project_id=project_id).order_by('id').values_list(*fields)))
+
+    dependencies += [
+        list(ServiceTask.objects.filter(service__project_id=project_id).order_by(
+            'id').values_list(
+                'id', 'task_name', 'task_description', 'task_unit',
+                'service__service_contract', 'service__description')),
+        list(TaskQuantity.objects.filter(
+            task__service__project_id=project_id,
+            date__range=(month_start, month_end),
+        ).order_by('task_id', 'date').values_list('task_id', 'date', 'quantity')),
+    ]
+    return hashlib.sha256(repr(dependencies).encode()).hexdigest()
+
+
+def enqueue_snapshots(day):
+    ''' queues the creation of the snapshots of day, if not queued already
+    '''
+    if day:
+        SnapshotTask.objects.get_or_create(daily=day)
+
+
+def get_snapshot(day, kind):
+    ''' returns: the snapshot of kind of day if it is current, else None
+    '''
+    if not day:
+        return None
+
+    snapshot = ReportSnapshot.objects.filter(daily=day, kind=kind).first()
+    if snapshot is None or snapshot.stamp != get_snapshot_stamp(day):
+        return None
+
+    return snapshot
+
+
+def get_snapshot_data(day, kind):
+    ''' returns: the data of the current snapshot of kind of day, None if there is no
+                 current snapshot
+    '''
+    snapshot = get_snapshot(day, kind)
+    if snapshot is None or snapshot.data is None:
+        return None
+
+    return pickle.loads(snapshot.data)
+
+
+def excel_file_response(content_hash, filename):
+    ''' returns: streaming response of the excel file stored as blob content_hash as
+                 attachment filename
+    '''
+    response = StreamingHttpResponse(
+        Blob.objects.read_chunks(content_hash), content_type=XLSX_CONTENT_TYPE)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+def snapshot_file_response(day, kind, filename):
+    ''' returns: streaming response of the excel file of the current snapshot of kind
+                 of day as attachment filename, None if there is no current snapshot
+    '''
+    snapshot = get_snapshot(day, kind)
+    if snapshot is None or not snapshot.excel_file_id:
+        return None
+
+    return excel_file_response(snapshot.excel_file_id, filename)
+
+
+def enqueue_latest_snapshots(project):
+    ''' queues the creation of the snapshots of the latest day of project
+    '''
+    enqueue_snapshots(
+        Daily.objects.filter(project=project).order_by('-production_date').first())
+
+
+@timed(logger, print_log=True)
+def create_snapshots(day):
+    ''' creates the snapshots of day stamped with the data they depend on. The stamp
+        is read before the reports are computed, so if the data changes during the
+        computation the snapshots are not current.
+    '''
+    stamp = get_snapshot_stamp(day)
+    weekly_page_data = pickle.dumps(collate_weekly_page_data(day))
+    week_excel = create_week_excel(day)
+    mpr_excel = create_mpr_excel(day)
+
+    # the files are stored and referred to in one transaction
+    with transaction.atomic():
+        snapshots = {
+            ReportSnapshot.WEEKLY_PAGE: {'data': weekly_page_data, 'excel_file': None},
+            ReportSnapshot.WEEK_EXCEL: {
+                'data': None, 'excel_file': Blob.objects.store(week_excel)},
+            ReportSnapshot.MPR_EXCEL: {
+                'data': None, 'excel_file': Blob.objects.store(mpr_excel)},
+        }
+        for kind, values in snapshots.items():
+            ReportSnapshot.objects.update_or_create(
+                daily=day, kind=kind, defaults={'stamp': stamp, **values})
+
+
+def process_snapshot_queue(max_tasks=None):
+    ''' creates the snapshots of the queued days and of the latest day of their
+        project, and deletes the snapshots of the later days created before the
+        queued day was modified, as these include the old data of the queued day.
+        A task is claimed by deleting it, so several workers can process the queue.
+        returns: number of processed tasks
+    '''
+    processed = 0
+    while max_tasks is None or processed < max_tasks:
+        task = SnapshotTask.objects.order_by('created', 'id').first()
+        if task is None:
+            break
+
+        deleted, _ = SnapshotTask.objects.filter(id=task.id).delete()
+        if not deleted:
+            continue
+
+        processed += 1
+        task_day = Daily.objects.select_related('project').filter(
+            id=task.daily_id).first()
+        if task_day is None:
+            continue
+
+        latest_day = Daily.objects.select_related('project').filter(
+            project=task_day.project).latest('production_date')
+        for day in {task_day.id: task_day, latest_day.id: latest_day}.values():
+            try:
+                create_snapshots(day)
+
+            except Exception:  #pylint: disable=broad-except
+                logger.exception(
+                    f'snapshots of {day.production_date} for '
+                    f'{day.project.project_name} failed')
+
+        ReportSnapshot.objects.filter(
+            daily__project_id=task_day.project_id,
+            daily__production_date__gt=task_day.production_date,
+            created__lt=task_day.last_modified,
+        ).delete()
+
+    if processed:
+        Blob.objects.delete_unused()
+
+    return processed
@@ -13,3 +13,8 @@ def f_format(value, format_str):
 
     else:
         return value
+
+
+@register.filter
+def get_item(dictionary, key):
+    return dictionary.get(key)
@@ -0,0 +1,47 @@
+''' helpers of the daily_report tests, the projects of the tests are created with
+    daily_report.benchmarks.generate
+'''
+import json
+from pathlib import Path
+import numpy as np
+
+GOLDEN_DIR = Path(__file__).parent / 'golden'
+
+
+def assert_dict_equal(testcase, expected, actual, places=6):
+    ''' asserts the dicts have the same keys and values, where nan equals nan
+        and numerical values are compared to a number of decimal places
+    '''
+    testcase.assertEqual(set(expected), set(actual))
+    for key, val in expected.items():
+        try:
+            if np.isnan(val):
+                testcase.assertTrue(np.isnan(actual[key]), msg=key)
+                continue
+
+            testcase.assertAlmostEqual(val, actual[key], places=places, msg=key)
+
+        except TypeError:
+            testcase.assertEqual(val, actual[key], msg=key)
+
+
+def golden_totals(production_date):
+    ''' returns: dict with the expected prod_total_by_type, times_total, rcvr_total
+                 and hse_total of calc_totals on production_date for the project
+                 generated with skip_days=(10, 11, 30), from golden/totals.json
+    '''
+    with open(GOLDEN_DIR / 'totals.json') as f:
+        return json.load(f)[str(production_date)]
+
+
+def assert_totals_equal(testcase, expected, report_totals):
+    ''' asserts the totals of report_totals equal the expected totals of
+        golden_totals
+    '''
+    testcase.assertEqual(
+        set(expected['prod_total_by_type']), set(report_totals.prod_total_by_type))
+    for stype_name, prod in expected['prod_total_by_type'].items():
+        assert_dict_equal(testcase, prod, report_totals.prod_total_by_type[stype_name])
+
+    for key in ['times_total', 'rcvr_total', 'hse_total']:
+        assert_dict_equal(testcase, expected[key], getattr(report_totals, key))
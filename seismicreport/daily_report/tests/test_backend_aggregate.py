@@ -0,0 +1,39 @@
+from datetime import date
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import golden_totals, assert_totals_equal
+
+
+class AggregateTotalsTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=45, skip_days=(10, 11, 30))
+        self.r_iface = ReportInterface('')
+
+    def test_totals_equal_golden_totals(self):
+        for production_date in [date(2021, 1, 20), date(2021, 1, 29),
+                                date(2021, 2, 1), date(2021, 3, 5)]:
+            day, _ = self.r_iface.load_report_db(self.project, production_date)
+            assert_totals_equal(
+                self, golden_totals(production_date), self.r_iface.calc_totals(day))
+
+    def test_period_totals_number_of_queries(self):
+        day, _ = self.r_iface.load_report_db(self.project, date(2021, 2, 24))
+        sourcetypes = list(day.project.sourcetypes.all())
+        receivertype = day.project.receivertypes.first()
+        with CaptureQueriesContext(connection) as queries:
+            self.r_iface.aggregate_prod_totals(day, sourcetypes)
+            self.r_iface.aggregate_time_totals(day)
+            self.r_iface.aggregate_receiver_totals(day, receivertype)
+            self.r_iface.aggregate_hse_totals(day)
+
+        self.assertEqual(len(queries), 4)
+
+    def test_empty_day(self):
+        prod_by_type, prod_total, times_total, rcvr_total, hse_total = (
+            self.r_iface.calc_totals(None).totals)
+        self.assertEqual(prod_by_type, {})
+        self.assertEqual(rcvr_total['week_layout'], 0)
+        self.assertEqual(hse_total['proj_stop'], '')
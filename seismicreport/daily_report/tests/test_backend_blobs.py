@@ -0,0 +1,135 @@
+import os
+import tempfile
+from datetime import timedelta
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from daily_report.models.blob_models import Blob
+from daily_report.models.project_models import Project, Block
+from daily_report.project_backend import ProjectInterface
+from daily_report.views.project_views import parse_range
+from daily_report.benchmarks.generate import generate_project
+
+CONTENT = bytes(range(256)) * 2000
+
+
+class UploadedFile:
+    ''' uploaded file in a temporary file, like TemporaryUploadedFile
+    '''
+    def __init__(self, content):
+        self.f = tempfile.NamedTemporaryFile(delete=False)
+        self.f.write(content)
+        self.f.close()
+
+    def temporary_file_path(self):
+        return self.f.name
+
+    def remove(self):
+        os.remove(self.f.name)
+
+
+# unused blobs are deleted at once
+@override_settings(BLOB_GRACE_PERIOD=0)
+class BlobTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(days=1)
+
+    def store_workorder(self, project, content):
+        uploaded_file = UploadedFile(content)
+        ProjectInterface.store_workorder(project, uploaded_file)
+        uploaded_file.remove()
+
+    def test_store_and_deduplicate(self):
+        other = Project.objects.create(project_prefix='OTH', project_name='other')
+        self.store_workorder(self.project, CONTENT)
+        self.store_workorder(other, CONTENT)
+        self.assertEqual(Blob.objects.count(), 1)
+        blob = Blob.objects.get()
+        self.assertEqual(blob.size, len(CONTENT))
+        self.assertEqual(b''.join(Blob.objects.read_chunks(blob.content_hash)), CONTENT)
+
+        # a replaced work order is deleted when it is no longer used
+        self.store_workorder(self.project, b'new work order')
+        self.assertEqual(Blob.objects.count(), 2)
+        self.store_workorder(other, b'new work order')
+        self.assertEqual(Blob.objects.count(), 1)
+
+    def test_content_deferred(self):
+        self.store_workorder(self.project, CONTENT)
+        with CaptureQueriesContext(connection) as queries:
+            project = Project.objects.get(id=self.project.id)
+            self.assertEqual(project.pdf_work_order.size, len(CONTENT))
+
+        self.assertTrue(all('"content"' not in q['sql'] for q in queries))
+
+    def test_copy_legacy_blobs(self):
+        Project.objects.filter(id=self.project.id).update(legacy_pdf_work_order=CONTENT)
+        block = Block.objects.create(
+            project=self.project, block_name='legacy', legacy_block_shapefile=CONTENT)
+        self.assertEqual(ProjectInterface.copy_legacy_blobs(), 2)
+        self.assertEqual(Blob.objects.count(), 1)
+        project = Project.objects.get(id=self.project.id)
+        self.assertEqual(project.pdf_work_order.size, len(CONTENT))
+        self.assertEqual(bytes(project.legacy_pdf_work_order), CONTENT)
+
+        # copied contents are not copied again, with clear the legacy column is freed
+        self.assertEqual(ProjectInterface.copy_legacy_blobs(clear=True), 0)
+        block.refresh_from_db()
+        self.assertEqual(block.block_shapefile_id, project.pdf_work_order_id)
+        self.assertIsNone(block.legacy_block_shapefile)
+
+    def test_grace_period(self):
+        blob = Blob.objects.store(CONTENT)
+        with override_settings(BLOB_GRACE_PERIOD=3600):
+            self.assertEqual(Blob.objects.delete_unused(), 0)
+            Blob.objects.filter(content_hash=blob.content_hash).update(
+                stored=timezone.now() - timedelta(hours=2))
+            # storing the content again restarts the grace period
+            Blob.objects.store(CONTENT)
+            self.assertEqual(Blob.objects.delete_unused(), 0)
+            Blob.objects.filter(content_hash=blob.content_hash).update(
+                stored=timezone.now() - timedelta(hours=2))
+            self.assertEqual(Blob.objects.delete_unused(), 1)
+
+    def test_read_chunks(self):
+        blob = Blob.objects.store(CONTENT)
+        with self.assertNumQueries(3):
+            chunks = list(Blob.objects.read_chunks(
+                blob.content_hash, 1000, 300_999, chunk_size=100_000))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [100_000] * 3)
+        self.assertEqual(b''.join(chunks), CONTENT[1000:301_000])
+
+    def test_parse_range(self):
+        self.assertEqual(parse_range('bytes=0-99', 1000), (0, 99))
+        self.assertEqual(parse_range('bytes=900-', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=-100', 1000), (900, 999))
+        self.assertEqual(parse_range('bytes=500-5000', 1000), (500, 999))
+        self.assertEqual(parse_range('bytes=1000-', 1000), (None, None))
+        self.assertEqual(parse_range('bytes=10-5', 1000), (None, None))
+        self.assertIsNone(parse_range('', 1000))
+        self.assertIsNone(parse_range('bytes=0-1,5-6', 1000))
+        self.assertIsNone(parse_range('items=0-1', 1000))
+
+    def test_download_pdf_workorder(self):
+        url = reverse('download', args=[self.project.project_name])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.store_workorder(self.project, CONTENT)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(b''.join(response.streaming_content), CONTENT)
+
+        response = self.client.get(url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(CONTENT)}')
+        self.assertEqual(b''.join(response.streaming_content), CONTENT[100:200])
+
+        response = self.client.get(url, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
@@ -0,0 +1,145 @@
+from types import SimpleNamespace
+from datetime import date
+import numpy as np
+from django.test import SimpleTestCase, TestCase
+from daily_report.report_backend import ReportInterface
+from seismicreport.vars import TCF_table, CTM_METHOD
+from seismicreport.utils.utils_funcs import calc_ratio
+from daily_report.benchmarks.generate import generate_project
+
+CASES = 200
+
+
+def legacy_ctm_series(r_iface, p_series, sourcetype):
+    ''' scalar calculation of the tcf, ctm and app ctm series per day
+    '''
+    terrain_series = list(zip(
+        *[val for key, val in p_series.items() if key != 'skips_series']))
+    tcf_series = []
+    total_sp_series = []
+    for terrain_sp in terrain_series:
+        sp_total = np.nansum(terrain_sp)
+        total_sp_series.append(sp_total)
+        if sp_total > 0:
+            tcf_series.append(sum(
+                sp / sp_total * TCF_table[f'sp_t{i + 1}']
+                for i, sp in enumerate(terrain_sp)))
+
+        else:
+            tcf_series.append(np.nan)
+
+    ctm_series = [r_iface.calc_ctm(sourcetype, tcf) for tcf in tcf_series]
+    return {
+        'tcf_series': tcf_series,
+        'total_sp_series': total_sp_series,
+        'ctm_series': ctm_series,
+        'appctm_series': [
+            calc_ratio(total, ctm) for total, ctm in zip(total_sp_series, ctm_series)],
+    }
+
+
+def legacy_combined_series(r_iface, day, prod_series_by_type, time_series):
+    ''' scalar calculation of the combined tcf, ctm, app ctm and rate series per day
+    '''
+    totals = np.sum([
+        pseries['total_sp_series'] for pseries in prod_series_by_type.values()], axis=0)
+    ctm_series = np.zeros(len(totals))
+    tcf_series = np.zeros(len(totals))
+    for pseries in prod_series_by_type.values():
+        weights = np.array([
+            v1 / v2 if v2 > 0 else 0
+            for v1, v2 in zip(pseries['total_sp_series'], totals)])
+        ctm_series = ctm_series + np.array(pseries['ctm_series']) * weights
+        tcf_series = tcf_series + np.array(pseries['tcf_series']) * weights
+
+    appctm_series = [
+        calc_ratio(v1, v2) if v2 > 0 else np.nan for v1, v2 in zip(totals, ctm_series)]
+    rate_series = [
+        r_iface.calc_rate(day, CTM_METHOD, appctm, total_time, standby)
+        for appctm, total_time, standby in zip(
+            appctm_series, time_series['total_time_series'],
+            time_series['standby_series'])]
+    return {
+        'tcf_series': tcf_series, 'ctm_series': ctm_series,
+        'appctm_series': appctm_series, 'rate_series': rate_series,
+    }
+
+
+def assert_series_equal(expected, actual):
+    for key, val in expected.items():
+        np.testing.assert_allclose(
+            np.array(actual[key], dtype=float), np.array(val, dtype=float),
+            rtol=1e-12, err_msg=key)
+
+
+class CtmSeriesEquivalenceTests(SimpleTestCase):
+    ''' the array calculation of the series must give the same results as the
+        scalar calculation for random production, source types and projects
+    '''
+    def setUp(self):
+        self.rng = np.random.default_rng(13)
+        self.r_iface = ReportInterface('')
+
+    def random_sourcetype(self):
+        mpr_vibes, mpr_sweep, mpr_moveup = self.rng.choice([0, 8, 12, 18], size=3)
+        return SimpleNamespace(
+            mpr_vibes=int(mpr_vibes), mpr_sweep_length=int(mpr_sweep),
+            mpr_moveup=int(mpr_moveup),
+            mpr_rec_hours=float(self.rng.choice([20.0, 22.0, 24.0])))
+
+    def random_daily(self):
+        return SimpleNamespace(project=SimpleNamespace(
+            standby_rate=self.rng.uniform(0, 1),
+            cap_rate=self.rng.choice([0, 1, 1.05, 1.2]),
+            cap_app_ctm=self.rng.choice([0, 1, 1.1, 1.3])))
+
+    def test_ctm_series(self):
+        for _ in range(CASES):
+            days = self.rng.integers(0, 30)
+            # production with days without production and terrains not used
+            terrain_sp = self.rng.integers(0, 3000, size=(days, 5))
+            terrain_sp[self.rng.random(size=(days, 5)) < 0.3] = 0
+            terrain_sp[self.rng.random(size=days) < 0.2, :] = 0
+            p_series = {f'sp_t{i + 1}_series': terrain_sp[:, i] for i in range(5)}
+            p_series['skips_series'] = self.rng.integers(0, 20, size=days)
+            sourcetype = self.random_sourcetype()
+
+            expected = legacy_ctm_series(self.r_iface, dict(p_series), sourcetype)
+            actual = self.r_iface.calc_ctm_series(p_series, sourcetype)
+            assert_series_equal(expected, actual)
+            self.assertEqual(len(actual['rate_series']), days)
+
+    def test_rate_series(self):
+        for _ in range(CASES):
+            days = self.rng.integers(1, 30)
+            app_ctm = self.rng.uniform(0, 1.6, size=days)
+            app_ctm[self.rng.random(size=days) < 0.1] = np.nan
+            total_time = self.rng.uniform(0, 24, size=days)
+            total_time[self.rng.random(size=days) < 0.1] = 0
+            standby = total_time * self.rng.uniform(0, 1, size=days)
+            daily = self.random_daily()
+
+            for ctm_method in ['Legacy', 'Standby']:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    expected = [
+                        self.r_iface.calc_rate(daily, ctm_method, *values)
+                        for values in zip(app_ctm, total_time, standby)]
+
+                actual = self.r_iface.calc_rate_series(
+                    daily, ctm_method, app_ctm, total_time, standby)
+                np.testing.assert_allclose(actual, expected, rtol=1e-12)
+
+
+class CombinedSeriesEquivalenceTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=35, skip_days=(5, 20))
+        self.r_iface = ReportInterface('')
+
+    def test_combined_series(self):
+        day, _ = self.r_iface.load_report_db(self.project, date(2021, 2, 15))
+        report_totals = self.r_iface.calc_totals(day)
+
+        expected = legacy_combined_series(
+            self.r_iface, day, report_totals.prod_series_by_type,
+            report_totals.time_series)
+        assert_series_equal(expected, report_totals.prod_series)
@@ -0,0 +1,65 @@
+from datetime import date
+from django.core.cache import cache
+from django.test import TestCase
+from daily_report.models.daily_models import Daily, CumulativeTotals
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import assert_dict_equal, golden_totals, assert_totals_equal
+
+
+class CumulativeTotalsTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=50, skip_days=(10, 11, 30))
+        self.r_iface = ReportInterface('')
+        self.r_iface.update_cumulative_totals(self.project)
+
+    def test_totals_equal_golden_totals(self):
+        self.assertEqual(CumulativeTotals.objects.count(), 47)
+        for production_date in [date(2021, 1, 20), date(2021, 1, 29),
+                                date(2021, 2, 1), date(2021, 2, 20),
+                                date(2021, 3, 10)]:
+            day, _ = self.r_iface.load_report_db(self.project, production_date)
+            self.assertIsNotNone(self.r_iface.get_cumulative_rows(day))
+            assert_totals_equal(
+                self, golden_totals(production_date), self.r_iface.calc_totals(day))
+
+    def test_cumulative_rows_single_query(self):
+        day, _ = self.r_iface.load_report_db(self.project, date(2021, 2, 24))
+        with self.assertNumQueries(1):
+            self.r_iface.get_cumulative_rows(day)
+
+    def test_incremental_update(self):
+        expected = {
+            row.production_date: row.totals for row in CumulativeTotals.objects.all()}
+        self.r_iface.update_cumulative_totals(self.project, date(2021, 2, 15))
+        actual = {
+            row.production_date: row.totals for row in CumulativeTotals.objects.all()}
+        self.assertEqual(expected, actual)
+
+    def test_repair_after_delete(self):
+        Daily.objects.get(production_date=date(2021, 2, 2)).delete()
+        self.assertEqual(CumulativeTotals.objects.count(), 46)
+        days = [
+            self.r_iface.load_report_db(self.project, production_date)[0]
+            for production_date in [date(2021, 2, 5), date(2021, 3, 10)]]
+        report_totals = [self.r_iface.calc_totals(day) for day in days]
+
+        # the totals equal the totals aggregated without the cumulative totals
+        CumulativeTotals.objects.all().delete()
+        cache.clear()
+        for day, actual in zip(days, report_totals):
+            self.assertIsNone(self.r_iface.get_cumulative_rows(day))
+            expected = self.r_iface.calc_totals(day)
+            assert_totals_equal(self, {
+                key: getattr(expected, key) for key in [
+                    'prod_total_by_type', 'times_total', 'rcvr_total', 'hse_total']},
+                actual)
+
+    def test_missing_cumulative_totals(self):
+        CumulativeTotals.objects.all().delete()
+        day, _ = self.r_iface.load_report_db(self.project, date(2021, 2, 5))
+        self.assertIsNone(self.r_iface.get_cumulative_rows(day))
+        expected = golden_totals(date(2021, 2, 5))
+        report_totals = self.r_iface.calc_totals(day)
+        assert_dict_equal(self, expected['times_total'], report_totals.times_total)
+        assert_dict_equal(self, expected['hse_total'], report_totals.hse_total)
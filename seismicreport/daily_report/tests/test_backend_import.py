@@ -0,0 +1,123 @@
+import io
+import zipfile
+import tempfile
+from pathlib import Path
+from datetime import date
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from daily_report.report_backend import ReportInterface
+from daily_report.models.daily_models import Daily, SourceProduction, CumulativeTotals
+from daily_report.import_backend import extract_zip_file, save_upload_files
+from daily_report.benchmarks.generate import create_report_file
+from daily_report.benchmarks.generate import generate_project
+from .test_backend_populate import report_values
+
+
+class ImportReportsTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=10)
+        self.r_iface = ReportInterface('')
+        self.report_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.report_dir.cleanup()
+
+    def report_file(self, file_name, production_date, **values):
+        file_name = Path(self.report_dir.name) / file_name
+        create_report_file(file_name, report_values(production_date, **values))
+        return file_name
+
+    def report_files(self):
+        not_a_workbook = Path(self.report_dir.name) / 'not_a_workbook.xlsx'
+        not_a_workbook.write_text('daily report')
+        return [
+            self.report_file('day_3.xlsx', date(2021, 2, 3), sp_t1_a=300),
+            self.report_file('day_1.xlsx', date(2021, 2, 1), sp_t1_a=100),
+            self.report_file('other_project.xlsx', date(2021, 2, 2), project='other'),
+            not_a_workbook,
+            self.report_file('day_2.xlsx', date(2021, 2, 2), sp_t1_a=200),
+            # replaces day 1 and updates day 8 of the project
+            self.report_file('day_1_again.xlsx', date(2021, 2, 1), sp_t1_a=110),
+            self.report_file('day_8.xlsx', date(2021, 1, 27), sp_t1_a=800),
+        ]
+
+    def test_import_report_files(self):
+        results = self.r_iface.import_report_files(
+            self.project, self.report_files(), workers=2)
+
+        self.assertEqual(
+            [(result['file'], result['date']) for result in results], [
+                ('day_3.xlsx', date(2021, 2, 3)),
+                ('day_1.xlsx', None),
+                ('other_project.xlsx', None),
+                ('not_a_workbook.xlsx', None),
+                ('day_2.xlsx', date(2021, 2, 2)),
+                ('day_1_again.xlsx', date(2021, 2, 1)),
+                ('day_8.xlsx', date(2021, 1, 27)),
+            ])
+        self.assertEqual(results[1]['message'], '2021-02-01 is replaced by day_1_again.xlsx')
+        self.assertEqual(results[2]['message'], 'report is for project other')
+        self.assertTrue(results[3]['message'].startswith('cannot read workbook'))
+
+        sp_t1 = dict(SourceProduction.objects.filter(
+            daily__project=self.project, sourcetype__sourcetype_name='vib_a',
+        ).values_list('daily__production_date', 'sp_t1_flat'))
+        self.assertEqual(len(sp_t1), 13)
+        self.assertEqual(
+            [sp_t1[date(2021, 1, 27)], sp_t1[date(2021, 2, 1)], sp_t1[date(2021, 2, 2)],
+             sp_t1[date(2021, 2, 3)]], [800, 110, 200, 300])
+
+        # the cumulative totals are the same as when rebuilt for all days
+        totals = list(CumulativeTotals.objects.filter(project=self.project).order_by(
+            'production_date').values_list('production_date', 'totals'))
+        self.r_iface.update_cumulative_totals(self.project)
+        self.assertEqual(totals, list(CumulativeTotals.objects.filter(
+            project=self.project).order_by('production_date').values_list(
+                'production_date', 'totals')))
+
+    def test_import_reports_command(self):
+        zip_file_name = Path(self.report_dir.name) / 'reports.zip'
+        with zipfile.ZipFile(zip_file_name, 'w') as zip_file:
+            for file_name in self.report_files():
+                zip_file.write(file_name, f'reports/{file_name.name}')
+
+            zip_file.writestr('reports/readme.txt', 'daily reports')
+
+        with tempfile.TemporaryDirectory() as target_dir:
+            self.assertEqual(
+                [file_name.name for file_name in extract_zip_file(zip_file_name, target_dir)],
+                [file_name.name for file_name in self.report_files()])
+
+        out = io.StringIO()
+        call_command(
+            'import_reports', str(zip_file_name), project='test', workers=1, stdout=out)
+        self.assertIn('test: 4 of 7 reports imported', out.getvalue())
+        self.assertEqual(Daily.objects.filter(project=self.project).count(), 13)
+
+    def test_zip_file_limits(self):
+        zip_file_name = Path(self.report_dir.name) / 'reports.zip'
+        with zipfile.ZipFile(zip_file_name, 'w', zipfile.ZIP_DEFLATED) as zip_file:
+            zip_file.writestr('reports/a.xlsx', bytes(2000))
+            zip_file.writestr('reports/b.xlsx', bytes(2000))
+
+        with tempfile.TemporaryDirectory() as target_dir:
+            with override_settings(IMPORT_ZIP_MAX_FILES=1):
+                with self.assertRaisesMessage(ValueError, 'more than 1 workbooks'):
+                    extract_zip_file(zip_file_name, target_dir)
+
+            with override_settings(IMPORT_ZIP_MAX_SIZE=3000):
+                with self.assertRaisesMessage(ValueError, 'exceed 3000 bytes'):
+                    extract_zip_file(zip_file_name, target_dir)
+
+                upload_file = SimpleUploadedFile('reports.zip', zip_file_name.read_bytes())
+                self.assertEqual(save_upload_files([upload_file], target_dir), ([], [{
+                    'file': 'reports.zip', 'date': None,
+                    'message': 'zip file workbooks exceed 3000 bytes'}]))
+
+                with self.assertRaisesMessage(CommandError, 'exceed 3000 bytes'):
+                    call_command('import_reports', str(zip_file_name), project='test')
+
+            # nothing is extracted of a rejected zip file
+            self.assertEqual(list(Path(target_dir).rglob('*.xlsx')), [])
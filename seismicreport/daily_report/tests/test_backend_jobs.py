@@ -0,0 +1,186 @@
+import io
+import os
+import shutil
+import tempfile
+import time
+from datetime import date, timedelta
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily
+from daily_report.models.job_models import ReportJob
+from daily_report import job_backend
+from daily_report.job_backend import (
+    enqueue_report_job, claim_jobs, run_report_job, requeue_stale_jobs,
+    delete_old_jobs, process_report_queue,
+)
+from daily_report.snapshot_backend import enqueue_snapshots, process_snapshot_queue
+from daily_report.benchmarks.generate import generate_project
+
+# the jobs run by the pool processes in the tests, set before the pool is forked. The
+# processes cannot use the test database, so the jobs only sleep or die.
+job_actions = {}
+
+
+def run_test_job(job_id):
+    action, seconds = job_actions[job_id]
+    time.sleep(seconds)
+    if action == 'die':
+        os._exit(1)
+
+    return ReportJob.DONE
+
+
+# unused blobs are deleted at once, the graphs are rendered in a scratch directory
+@override_settings(BLOB_GRACE_PERIOD=0, MEDIA_ROOT=tempfile.mkdtemp())
+class ReportJobTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(days=20)
+        cls.user = User.objects.create_user(username='john', password='secret123')
+
+    def setUp(self):
+        self.day = Daily.objects.select_related('project').get(
+            production_date=date(2021, 1, 30))
+
+    def test_enqueue_and_claim(self):
+        job = enqueue_report_job(self.day, ReportJob.MPR_EXCEL, user=self.user)
+        self.assertEqual(job.status, ReportJob.QUEUED)
+        # a queued job of the same report is reused
+        self.assertEqual(enqueue_report_job(self.day, ReportJob.MPR_EXCEL), job)
+        week_job = enqueue_report_job(self.day, ReportJob.WEEK_EXCEL)
+
+        self.assertEqual(claim_jobs(5), [job.id, week_job.id])
+        self.assertEqual(claim_jobs(5), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ReportJob.RUNNING)
+
+        self.assertEqual(requeue_stale_jobs(3600), 0)
+        ReportJob.objects.filter(id=job.id).update(
+            started=timezone.now() - timedelta(hours=2))
+        self.assertEqual(requeue_stale_jobs(3600), 1)
+        self.assertEqual(claim_jobs(5), [job.id])
+
+    def test_run_report_job(self):
+        job = enqueue_report_job(self.day, ReportJob.WEEK_EXCEL)
+        claim_jobs(1)
+        self.assertEqual(run_report_job(job.id), ReportJob.DONE)
+        job.refresh_from_db()
+        self.assertEqual(job.progress, 1.0)
+        self.assertGreater(job.result_file.size, 0)
+        self.assertIsNotNone(job.finished)
+
+        with mock.patch.dict(
+                'daily_report.job_backend.report_creators',
+                {ReportJob.MPR_EXCEL: mock.Mock(side_effect=ValueError('no data'))}):
+            job = enqueue_report_job(self.day, ReportJob.MPR_EXCEL)
+            claim_jobs(1)
+            self.assertEqual(run_report_job(job.id), ReportJob.FAILED)
+
+        job.refresh_from_db()
+        self.assertEqual(job.message, 'ValueError: no data')
+
+    def test_job_from_snapshot(self):
+        enqueue_snapshots(self.day)
+        process_snapshot_queue()
+        with self.assertNumQueries(12):
+            job = enqueue_report_job(self.day, ReportJob.MPR_EXCEL)
+
+        self.assertEqual(job.status, ReportJob.DONE)
+        self.assertIsNotNone(job.result_file_id)
+
+    def test_delete_old_jobs(self):
+        job = enqueue_report_job(self.day, ReportJob.MPR_EXCEL)
+        claim_jobs(1)
+        run_report_job(job.id)
+        self.assertEqual(delete_old_jobs(7), 0)
+        ReportJob.objects.filter(id=job.id).update(
+            finished=timezone.now() - timedelta(days=8))
+        self.assertEqual(delete_old_jobs(7), 1)
+        self.assertEqual(Blob.objects.count(), 0)
+
+    def test_job_views(self):
+        self.client.login(username='john', password='secret123')
+        url = reverse('report_job', args=[self.day.id, ReportJob.WEEK_EXCEL])
+        self.assertEqual(self.client.get(url).status_code, 405)
+        self.assertEqual(self.client.post(
+            reverse('report_job', args=[self.day.id, 'daily_excel'])).status_code, 404)
+
+        response = self.client.post(url)
+        self.assertEqual(response.status_code, 202)
+        job_status = response.json()
+        self.assertEqual(job_status['status'], ReportJob.QUEUED)
+        self.assertIsNone(job_status['download_url'])
+        download_url = reverse('report_job_download', args=[job_status['job_id']])
+        self.assertEqual(self.client.get(download_url).status_code, 404)
+
+        call_command('run_report_worker', '--once', '--workers', '1', stdout=io.StringIO())
+        job_status = self.client.get(job_status['status_url']).json()
+        self.assertEqual(job_status['status'], ReportJob.DONE)
+        self.assertEqual(job_status['download_url'], download_url)
+
+        response = self.client.get(download_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('csr_week_report.xlsx', response['Content-Disposition'])
+        job = ReportJob.objects.get(id=job_status['job_id'])
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            b''.join(Blob.objects.read_chunks(job.result_file_id)))
+
+
+@mock.patch('daily_report.job_backend.run_report_job', run_test_job)
+class ReportPoolTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(days=10)
+
+    def setUp(self):
+        day = Daily.objects.select_related('project').first()
+        self.job_ids = [
+            ReportJob.objects.create(daily=day, kind=ReportJob.MPR_EXCEL).id
+            for _ in range(4)]
+        self.statuses = {}
+
+    def process_queue(self):
+        with mock.patch(
+                'daily_report.job_backend.create_pool',
+                wraps=job_backend.create_pool) as create_pool:
+            process_report_queue(
+                workers=2, once=True, interval=0.05,
+                report_status=lambda job_id, status: self.statuses.update(
+                    {job_id: status}))
+
+        return create_pool.call_count
+
+    def test_job_claimed_when_process_free(self):
+        job_actions.update({job_id: ('done', 0.0) for job_id in self.job_ids})
+        job_actions[self.job_ids[0]] = ('done', 1.0)
+        self.assertEqual(self.process_queue(), 1)
+        # the other jobs are run while the first job is still running
+        self.assertEqual(list(self.statuses), self.job_ids[1:] + self.job_ids[:1])
+        self.assertEqual(set(self.statuses.values()), {ReportJob.DONE})
+
+    def test_process_died(self):
+        job_actions.update({job_id: ('done', 0.0) for job_id in self.job_ids})
+        job_actions[self.job_ids[0]] = ('die', 0.0)
+        job_actions[self.job_ids[1]] = ('done', 1.0)
+        self.assertEqual(self.process_queue(), 2)
+
+        # the jobs of the broken pool fail, the next jobs are run in a new pool
+        self.assertEqual(self.statuses, {
+            self.job_ids[0]: ReportJob.FAILED, self.job_ids[1]: ReportJob.FAILED,
+            self.job_ids[2]: ReportJob.DONE, self.job_ids[3]: ReportJob.DONE,
+        })
+        job = ReportJob.objects.get(id=self.job_ids[0])
+        self.assertEqual(job.status, ReportJob.FAILED)
+        self.assertIn('stopped unexpectedly', job.message)
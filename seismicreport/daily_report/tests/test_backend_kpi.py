@@ -0,0 +1,75 @@
+from io import StringIO
+from datetime import date
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.core.cache import cache
+from django.core.management import call_command
+from daily_report.models.daily_models import DailyKpi
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.generate import generate_project
+
+
+class DailyKpiTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=35, skip_days=(5, 20))
+        self.r_iface = ReportInterface('')
+
+    def calc_series(self, production_date):
+        # the stored kpis do not change the totals, so they are not in the cache
+        cache.clear()
+        day, _ = self.r_iface.load_report_db(self.project, production_date)
+        report_totals = self.r_iface.calc_totals(day)
+        return report_totals.prod_series_by_type, report_totals.prod_series
+
+    def assert_series_equal(self, expected, actual):
+        self.assertEqual(set(expected), set(actual))
+        for key, val in expected.items():
+            if key == 'date_series':
+                np.testing.assert_array_equal(val, actual[key])
+                continue
+
+            np.testing.assert_allclose(
+                np.array(val, dtype=float), np.array(actual[key], dtype=float),
+                err_msg=key)
+
+    def test_kpi_series_equal_calculated_series(self):
+        production_date = date(2021, 2, 15)
+        expected = self.calc_series(production_date)
+        self.assertEqual(self.r_iface.rebuild_project_kpis(self.project), 33)
+        self.assertEqual(
+            DailyKpi.objects.filter(daily__project=self.project).count(), 33 * 3)
+
+        actual = self.calc_series(production_date)
+        day, _ = self.r_iface.load_report_db(self.project, production_date)
+        self.assertIsNotNone(
+            self.r_iface.get_kpi_series(day, None, actual[1]['date_series']))
+        for stype_name, series in expected[0].items():
+            self.assert_series_equal(series, actual[0][stype_name])
+        self.assert_series_equal(expected[1], actual[1])
+
+    def test_kpis_missing_for_a_day(self):
+        production_date = date(2021, 2, 10)
+        expected = self.calc_series(production_date)
+        self.r_iface.rebuild_project_kpis(self.project)
+        DailyKpi.objects.filter(
+            daily__production_date=date(2021, 1, 25), sourcetype=None).delete()
+
+        actual = self.calc_series(production_date)
+        self.assert_series_equal(expected[1], actual[1])
+
+    def test_rebuild_kpis_command(self):
+        out = StringIO()
+        call_command('rebuild_kpis', project='test', stdout=out)
+        self.assertIn('kpis rebuilt for 33 days', out.getvalue())
+        kpi = DailyKpi.objects.get(
+            daily__production_date=date(2021, 1, 20), sourcetype=None)
+        self.assertGreater(kpi.total_sp, 0)
+        self.assertIsNotNone(kpi.rate)
+
+    def test_combined_kpi_unique(self):
+        self.r_iface.rebuild_project_kpis(self.project)
+        kpi = DailyKpi.objects.get(
+            daily__production_date=date(2021, 1, 20), sourcetype=None)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            DailyKpi.objects.create(daily=kpi.daily, sourcetype=None)
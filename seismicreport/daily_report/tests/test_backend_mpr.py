@@ -0,0 +1,96 @@
+from datetime import date
+import numpy as np
+import pandas as pd
+from django.test import TestCase
+from daily_report.report_backend import ReportInterface
+from daily_report.models.daily_models import Daily
+from daily_report.benchmarks.generate import generate_project
+
+
+class MprDataTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # Feb 14 has no report
+        cls.project = generate_project(days=40, skip_days=(25,))
+
+    def setUp(self):
+        self.r_iface = ReportInterface('')
+        self.day = Daily.objects.select_related('project').get(
+            project=self.project, production_date=date(2021, 2, 20))
+
+    def test_single_query(self):
+        # the source and receiver types and the rows of the project
+        with self.assertNumQueries(3):
+            mpr_data = self.r_iface.calc_mpr_data(self.day)
+
+        self.assertEqual(set(mpr_data.tables), {'vib_a', 'vib_b', None})
+        # Jan 20 to Feb 20 without Feb 14
+        self.assertEqual(len(mpr_data.proj_df), 31)
+
+    def test_series_equal_calc_totals(self):
+        report_totals = self.r_iface.calc_totals(self.day)
+        mpr_data = self.r_iface.calc_mpr_data(self.day)
+        proj_df = mpr_data.proj_df
+        self.assertEqual(
+            list(proj_df['date'].dt.date), list(report_totals.prod_series['date_series']))
+        for key in ['sp_t1', 'skips', 'total_sp', 'tcf', 'ctm', 'appctm']:
+            np.testing.assert_allclose(
+                proj_df[key], np.array(report_totals.prod_series[f'{key}_series'],
+                                       dtype=float), err_msg=key)
+
+        for key in ['rec_hours', 'ops', 'standby', 'downtime', 'total_time']:
+            np.testing.assert_allclose(
+                proj_df[key], report_totals.time_series[f'{key}_series'], err_msg=key)
+
+        np.testing.assert_allclose(
+            proj_df['qc_field'],
+            np.array(report_totals.rcvr_series['qc_field_series'], dtype=float))
+
+        for name, prod_series in report_totals.prod_series_by_type.items():
+            table = mpr_data.tables[name]
+            np.testing.assert_allclose(table['ctm'], prod_series['ctm_series'][-19:])
+
+    def test_month_total_equal_calc_totals(self):
+        prod_total = self.r_iface.calc_totals(self.day).prod_total
+        month_total = self.r_iface.calc_mpr_data(self.day).month_total
+        for key in ['total', 'tcf', 'ctm', 'appctm', 'rate']:
+            self.assertAlmostEqual(
+                month_total[f'month_{key}'], prod_total[f'month_{key}'], msg=key)
+
+    def test_mpr_table(self):
+        mpr_data = self.r_iface.calc_mpr_data(self.day)
+        table = mpr_data.tables[None]
+        sums = mpr_data.sums[None]
+        self.assertEqual(len(table), 19)
+        self.assertNotIn('14-Feb-21', list(table['date']))
+        # the production day is taken from the date of the row, also after a day
+        # without a report
+        self.assertEqual(table['prod_day'].iloc[12], 25)
+        self.assertEqual(table['prod_day'].iloc[13], 27)
+        self.assertEqual(table['cum_total_sp'].iloc[-1], sums['total_sp'])
+        np.testing.assert_allclose(
+            table[[f'sp_t{i}_dist' for i in range(1, 6)]].sum(axis=1), 1.0)
+        # the combined source types are against 24 hours, a sourcetype against its
+        # recording hours
+        np.testing.assert_allclose(table['padtime'], table['rec_hours'] / 24)
+        self.assertAlmostEqual(sums['padtime'], sums['rec_hours'] / (24 * 20))
+        np.testing.assert_allclose(
+            mpr_data.tables['vib_a']['padtime'], table['rec_hours'] / 22.0)
+
+    def test_first_month(self):
+        day = Daily.objects.select_related('project').get(
+            project=self.project, production_date=date(2021, 1, 31))
+        table = self.r_iface.calc_mpr_data(day).tables['vib_a']
+        self.assertEqual(list(table['prod_day']), list(range(1, 13)))
+        self.assertEqual(table.index[0], pd.Timestamp(2021, 1, 20))
+
+    def test_project_without_sourcetypes(self):
+        project = generate_project(project_name='no source', days=10, sourcetypes=())
+        day = Daily.objects.select_related('project').get(
+            project=project, production_date=date(2021, 1, 29))
+        mpr_data = self.r_iface.calc_mpr_data(day)
+        self.assertEqual(list(mpr_data.tables), [None])
+        self.assertTrue(mpr_data.tables[None].empty)
+        self.assertEqual(mpr_data.sums[None]['total_sp'], 0)
+        self.assertTrue(mpr_data.proj_df.empty)
+        self.assertTrue(np.isnan(mpr_data.month_total['month_ctm']))
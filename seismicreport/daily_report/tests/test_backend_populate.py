@@ -0,0 +1,98 @@
+import tempfile
+from pathlib import Path
+from datetime import date, datetime
+from unittest import mock
+from django.test import TestCase
+from daily_report.report_backend import ReportInterface
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather, ToolBox,
+    DailyKpi, CumulativeTotals,
+)
+from daily_report.benchmarks.generate import create_report_file
+from daily_report.benchmarks.generate import generate_project
+
+
+def report_values(production_date, **values):
+    return {
+        'date': datetime.combine(production_date, datetime.min.time()),
+        'project': 'test', 'block': 'block 1',
+        'source_a': 'vib_a', 'source_b': 'vib_b',
+        'sp_t1_a': 1500, 'sp_t2_a': 800, 'sp_t4_a': 120, 'skips_a': 12,
+        'sp_t1_b': 900, 'sp_t3_b': 30, 'skips_b': 4,
+        'rec hours': 20.5, 'rec moveup': 0.5, 'logistics': 1.0, 'vibrator fault': 2.0,
+        'layout': 3000, 'pickup': 2800, 'node failure': 3, 'node qc': 0.95,
+        'comment 1': 'good production', 'comment 3': 'windy',
+        'toolbox 1': 'heat stress\n', 'toolbox 5': 'driving',
+        'weather condition': 'sunny', 'rain': 'no', 'temp min': 19.0, 'temp max': 33.0,
+        'hse stop cards': 8, 'hse drills': 1, 'headcount': 230, 'exposure hours': 2760,
+        **values,
+    }
+
+
+class PopulateReportTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=10)
+        self.r_iface = ReportInterface('')
+        self.report_dir = tempfile.TemporaryDirectory()
+        self.production_date = date(2021, 1, 30)
+
+    def tearDown(self):
+        self.report_dir.cleanup()
+
+    def report_file(self, **values):
+        file_name = str(Path(self.report_dir.name) / 'daily_report.xlsx')
+        create_report_file(file_name, report_values(self.production_date, **values))
+        return file_name
+
+    def test_populate_report(self):
+        report_file = self.report_file()
+        with self.assertNumQueries(36):
+            report_date = self.r_iface.populate_report(self.project, report_file)
+
+        self.assertEqual(report_date, self.production_date)
+        day = Daily.objects.get(project=self.project, production_date=report_date)
+        self.assertEqual(day.pm_comment, 'good production\nwindy')
+        self.assertEqual(day.block.block_name, 'block 1')
+        prod = SourceProduction.objects.get(daily=day, sourcetype__sourcetype_name='vib_a')
+        self.assertEqual(
+            [prod.sp_t1_flat, prod.sp_t2_rough, prod.sp_t3_facilities, prod.skips],
+            [1500, 800, 0, 12])
+        rcvr = ReceiverProduction.objects.get(daily=day)
+        self.assertEqual([rcvr.layout, rcvr.qc_field], [3000, 0.95])
+        self.assertEqual(TimeBreakdown.objects.get(daily=day).rec_hours, 20.5)
+        hse = HseWeather.objects.get(daily=day)
+        self.assertEqual([hse.stop, hse.rain, hse.temp_max], [8, 'no', 33.0])
+        self.assertEqual(
+            sorted(ToolBox.objects.filter(hse=hse).values_list('toolbox', flat=True)),
+            ['driving', 'heat stress'])
+        self.assertEqual(DailyKpi.objects.filter(daily=day).count(), 3)
+        self.assertTrue(CumulativeTotals.objects.filter(daily=day).exists())
+
+    def test_populate_report_update(self):
+        self.r_iface.populate_report(self.project, self.report_file())
+        report_file = self.report_file(**{'sp_t1_a': 1000, 'toolbox 5': None})
+        with self.assertNumQueries(39):
+            self.r_iface.populate_report(self.project, report_file)
+
+        day = Daily.objects.get(project=self.project, production_date=self.production_date)
+        prod = SourceProduction.objects.get(daily=day, sourcetype__sourcetype_name='vib_a')
+        self.assertEqual(prod.sp_t1_flat, 1000)
+        self.assertEqual(
+            list(ToolBox.objects.filter(hse__daily=day).values_list('toolbox', flat=True)),
+            ['heat stress'])
+
+    def test_populate_report_atomic(self):
+        report_file = self.report_file()
+        with mock.patch.object(
+                ReportInterface, 'update_daily_kpis', side_effect=ValueError):
+            with self.assertRaises(ValueError):
+                self.r_iface.populate_report(self.project, report_file)
+
+        self.assertFalse(Daily.objects.filter(
+            project=self.project, production_date=self.production_date).exists())
+
+    def test_populate_report_missing_sourcetype(self):
+        report_file = self.report_file(source_b='vib_c')
+        self.assertIsNone(self.r_iface.populate_report(self.project, report_file))
+        self.assertFalse(Daily.objects.filter(
+            project=self.project, production_date=self.production_date).exists())
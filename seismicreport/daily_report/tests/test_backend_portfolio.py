@@ -0,0 +1,82 @@
+from datetime import date
+import numpy as np
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from daily_report.report_backend import ReportInterface
+from daily_report.portfolio_backend import incident_keys
+from daily_report.aggregate_backend import PERIODS
+from daily_report.benchmarks.generate import generate_project
+
+
+class PortfolioTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(project_name='alpha', days=40)
+        generate_project(
+            project_name='bravo', days=20, start_date=date(2021, 2, 3),
+            sourcetypes=('vib_a',), seed=2)
+
+    def setUp(self):
+        self.r_iface = ReportInterface('')
+
+    def test_portfolio_equal_calc_totals(self):
+        portfolio = self.r_iface.calc_portfolio()
+        self.assertEqual([p['project'] for p in portfolio], ['alpha', 'bravo'])
+        self.assertEqual(
+            [p['production_date'] for p in portfolio],
+            [date(2021, 2, 28), date(2021, 2, 22)])
+
+        for project in portfolio:
+            day, _ = self.r_iface.load_report_db(
+                self.r_iface.get_project(project['project']), project['production_date'])
+            self.assertEqual(project['daily_id'], day.id)
+            report_totals = self.r_iface.calc_totals(day)
+            prod_total = report_totals.prod_total
+            times_total = report_totals.times_total
+            hse_total = report_totals.hse_total
+            for period in PERIODS:
+                totals = project['totals'][period]
+                msg = f'{project["project"]} {period}'
+                self.assertEqual(totals['vps'], prod_total[f'{period}_total'], msg=msg)
+                self.assertAlmostEqual(
+                    totals['appctm'], prod_total[f'{period}_appctm'], msg=msg)
+                self.assertAlmostEqual(
+                    totals['rec_hours'], times_total[f'{period}_rec_time'], msg=msg)
+                self.assertEqual(
+                    totals['incidents'],
+                    np.sum([hse_total[f'{period}_{key}'] for key in incident_keys]),
+                    msg=msg)
+
+    def test_constant_queries(self):
+        # latest reports, source types and the production, time and hse aggregates
+        with self.assertNumQueries(5):
+            self.r_iface.calc_portfolio()
+
+        for i in range(3):
+            generate_project(project_name=f'extra {i}', days=10, seed=3 + i)
+
+        with self.assertNumQueries(5):
+            portfolio = self.r_iface.calc_portfolio()
+
+        self.assertEqual(len(portfolio), 5)
+
+    def test_no_reports(self):
+        generate_project(project_name='charlie', days=0)
+        portfolio = self.r_iface.calc_portfolio()
+        self.assertNotIn('charlie', [p['project'] for p in portfolio])
+
+    def test_portfolio_views(self):
+        User.objects.create_user(username='john', password='secret123')
+        self.client.login(username='john', password='secret123')
+        response = self.client.get(reverse('portfolio_page'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'bravo')
+        self.assertNotContains(response, 'None')
+
+        response = self.client.get(reverse('portfolio_json'))
+        self.assertEqual(response.status_code, 200)
+        projects = response.json()['projects']
+        self.assertEqual(projects[1]['production_date'], '2021-02-22')
+        self.assertEqual(set(projects[1]['totals']), set(PERIODS))
+        self.assertGreater(projects[1]['totals']['proj']['vps'], 0)
@@ -0,0 +1,72 @@
+from datetime import date, timedelta
+import numpy as np
+from django.test import TestCase
+from daily_report.report_backend import ReportInterface
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather,
+)
+from daily_report.benchmarks.generate import generate_project
+
+PROJECT_DAYS = 365
+
+
+class ProjectSeriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(
+            days=PROJECT_DAYS, start_date=date(2021, 1, 1), skip_days=(100, 101))
+
+    def setUp(self):
+        self.r_iface = ReportInterface('')
+        self.day = Daily.objects.select_related('project').get(
+            project=self.project, production_date=date(2021, 12, 31))
+        self.dates = [
+            date(2021, 1, 1) + timedelta(days=i)
+            for i in range(PROJECT_DAYS) if i not in (100, 101)]
+
+    def test_prod_series(self):
+        sourcetype = self.project.sourcetypes.first()
+        # production rows and the stored kpis
+        with self.assertNumQueries(2):
+            proj_prod, prod_series = self.r_iface.calc_proj_prod_totals(
+                self.day, sourcetype)
+
+        self.assertEqual(list(prod_series['date_series']), self.dates)
+        sp_t1 = list(SourceProduction.objects.filter(sourcetype=sourcetype).order_by(
+            'daily__production_date').values_list('sp_t1_flat', flat=True))
+        self.assertEqual(list(prod_series['sp_t1_series']), sp_t1)
+        self.assertEqual(proj_prod['proj_sp_t1'], sum(sp_t1))
+
+    def test_time_series(self):
+        with self.assertNumQueries(1):
+            proj_time, time_series = self.r_iface.calc_proj_time_totals(self.day)
+
+        self.assertEqual(list(time_series['date_series']), self.dates)
+        rec_hours = list(TimeBreakdown.objects.filter(
+            daily__project=self.project).order_by('daily__production_date').values_list(
+                'rec_hours', flat=True))
+        np.testing.assert_allclose(time_series['rec_hours_series'], rec_hours)
+        self.assertAlmostEqual(proj_time['proj_rec_time'], sum(rec_hours))
+
+    def test_receiver_series(self):
+        receivertype = self.project.receivertypes.first()
+        with self.assertNumQueries(1):
+            proj_rcvr, rcvr_series = self.r_iface.project_receiver_total(
+                self.day, receivertype)
+
+        layout = list(ReceiverProduction.objects.filter(
+            receivertype=receivertype).order_by('daily__production_date').values_list(
+                'layout', flat=True))
+        self.assertEqual(rcvr_series['layout_series'], layout)
+        self.assertEqual(proj_rcvr['proj_layout'], sum(layout))
+
+    def test_hse_series(self):
+        with self.assertNumQueries(1):
+            proj_hse, hse_series = self.r_iface.proj_hse_totals(self.day)
+
+        self.assertEqual(list(hse_series['date_series']), self.dates)
+        stop = list(HseWeather.objects.filter(
+            daily__project=self.project).order_by('daily__production_date').values_list(
+                'stop', flat=True))
+        self.assertEqual(list(hse_series['stop_series']), stop)
+        self.assertEqual(proj_hse['proj_stop'], sum(stop))
@@ -0,0 +1,129 @@
+from datetime import date
+import numpy as np
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from daily_report.models.daily_models import Daily
+from daily_report.models.service_models import Service, ServiceTask, TaskQuantity
+from daily_report.service_backend import (
+    get_service_tasks, load_month_quantities, save_month_quantities,
+)
+from daily_report.benchmarks.generate import generate_project
+from .test_excel_reports import create_services
+
+
+def add_tasks(project, n_tasks):
+    ''' adds a service with n_tasks tasks to project
+        returns: list of the tasks
+    '''
+    service = Service.objects.create(
+        project=project, service_contract=f'extra contract {n_tasks}',
+        description=f'service {n_tasks}')
+    return [
+        ServiceTask.objects.create(service=service, task_name=f'task {t}')
+        for t in range(n_tasks)]
+
+
+class ServiceQuantitiesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(days=5)
+        create_services(cls.project)
+
+    def test_load_month_quantities(self):
+        service_tasks = get_service_tasks(self.project)
+        tasks = [task for _, s_tasks in service_tasks for task in s_tasks]
+        with self.assertNumQueries(1):
+            quantities = load_month_quantities(tasks, 2021, 2)
+
+        self.assertEqual(quantities.shape, (6, 28))
+        for task, row in zip(tasks, quantities):
+            expected = np.zeros(28)
+            for tq in task.get_monthly_task_quantities(2021, 2):
+                expected[tq.date.day - 1] = tq.quantity
+
+            np.testing.assert_array_equal(row, expected)
+
+        self.assertEqual(load_month_quantities([], 2021, 2).shape, (0, 28))
+
+    def test_get_service_tasks(self):
+        with self.assertNumQueries(2):
+            service_tasks = get_service_tasks(self.project, ordered=True)
+
+        self.assertEqual(
+            [service.service_contract for service, _ in service_tasks],
+            ['contract 0', 'contract 1'])
+        self.assertEqual(
+            [task.task_name for task in service_tasks[1][1]],
+            ['task 1.0', 'task 1.1', 'task 1.2'])
+
+    def test_save_month_quantities(self):
+        task = ServiceTask.objects.get(task_name='task 0.0')
+        # quantities on Feb 1, 4, 7
+        result = save_month_quantities({task.id: {
+            date(2021, 2, 1): 5.0,            # updated
+            date(2021, 2, 4): 0.0,            # deleted
+            date(2021, 2, 7): None,           # not changed
+            date(2021, 2, 10): 2.5,           # not changed, same quantity
+            date(2021, 2, 2): 3.0,            # created
+            date(2021, 2, 3): 0.001,          # not created
+            date(2021, 3, 2): 3.0,            # not in the month
+        }}, 2021, 2)
+        self.assertEqual(result, (1, 1, 1))
+        self.assertEqual(
+            dict(task.quantities.values_list('date', 'quantity')), {
+                date(2021, 2, 1): 5.0, date(2021, 2, 2): 3.0, date(2021, 2, 7): 1.75,
+                date(2021, 2, 10): 2.5, date(2021, 2, 13): 3.25, date(2021, 2, 16): 4.0,
+                date(2021, 2, 19): 4.75, date(2021, 2, 22): 5.5, date(2021, 2, 25): 6.25,
+                date(2021, 2, 28): 7.0,
+            })
+
+    def test_save_constant_queries(self):
+        for n_tasks in [2, 12]:
+            tasks = add_tasks(self.project, n_tasks)
+            TaskQuantity.objects.bulk_create([
+                TaskQuantity(task=task, date=date(2021, 2, day), quantity=1.0)
+                for task in tasks for day in [1, 2]])
+            task_quantities = {
+                task.id: {
+                    date(2021, 2, 1): 0.0, date(2021, 2, 2): 2.0,
+                    **{date(2021, 2, day): 1.0 for day in range(3, 29)},
+                } for task in tasks}
+
+            # savepoint, read, delete, update, create and release of the savepoint
+            with self.assertNumQueries(6):
+                result = save_month_quantities(task_quantities, 2021, 2)
+
+            self.assertEqual(result, (n_tasks, n_tasks, 26 * n_tasks))
+            quantities = load_month_quantities(tasks, 2021, 2)
+            self.assertEqual(quantities[:, 0].sum(), 0)
+            self.assertEqual(quantities[:, 1:].sum(), 28 * n_tasks)
+
+    def test_monthly_services_view(self):
+        day = Daily.objects.get(project=self.project, production_date=date(2021, 1, 22))
+        User.objects.create_user(username='john', password='secret123')
+        self.client.login(username='john', password='secret123')
+        url = reverse('monthly_service_page', args=[day.id, 2021, 2])
+        query_counts = []
+        for n_tasks in [1, 8]:
+            tasks = add_tasks(self.project, n_tasks)
+            post_data = {
+                f'{task.id}-2021-02-{d:02}': f'{d / 2}'
+                for task in tasks for d in range(1, 29)}
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post(url, post_data)
+
+            self.assertEqual(response.status_code, 302)
+            query_counts.append(len(queries))
+            self.assertEqual(
+                load_month_quantities(tasks, 2021, 2).sum(), n_tasks * 203.0)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+
+            self.assertEqual(response.status_code, 200)
+            query_counts.append(len(queries))
+
+        self.assertEqual(query_counts[:2], query_counts[2:])
@@ -0,0 +1,141 @@
+import io
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.http import FileResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from daily_report.models.blob_models import Blob
+from daily_report.models.daily_models import Daily
+from daily_report.models.snapshot_models import SnapshotTask, ReportSnapshot
+from daily_report.models.weekly_models import Weekly
+from daily_report.snapshot_backend import (
+    collate_weekly_page_data, enqueue_snapshots, get_snapshot, get_snapshot_data,
+    process_snapshot_queue,
+)
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import assert_dict_equal
+
+
+# unused blobs are deleted at once, the graphs are rendered in a scratch directory
+@override_settings(BLOB_GRACE_PERIOD=0, MEDIA_ROOT=tempfile.mkdtemp())
+class SnapshotTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(days=20)
+        User.objects.create_user(username='john', password='secret123')
+
+    def setUp(self):
+        self.day = Daily.objects.get(production_date=date(2021, 1, 30))
+        self.latest_day = Daily.objects.get(production_date=date(2021, 2, 8))
+        self.client.login(username='john', password='secret123')
+
+    def test_process_queue(self):
+        enqueue_snapshots(self.day)
+        enqueue_snapshots(self.day)
+        self.assertEqual(SnapshotTask.objects.count(), 1)
+
+        self.assertEqual(process_snapshot_queue(), 1)
+        self.assertEqual(SnapshotTask.objects.count(), 0)
+        # the snapshots of the queued day and of the latest day of the project
+        for day in [self.day, self.latest_day]:
+            for kind, _ in ReportSnapshot.KINDS:
+                self.assertIsNotNone(get_snapshot(day, kind), msg=f'{day} {kind}')
+
+        snapshot_data = get_snapshot_data(self.day, ReportSnapshot.WEEKLY_PAGE)
+        live_data = collate_weekly_page_data(self.day)
+        assert_dict_equal(self, live_data['totals_prod'], snapshot_data['totals_prod'])
+        self.assertEqual(live_data['days'], snapshot_data['days'])
+        self.assertEqual(Blob.objects.count(), 4)
+
+    def test_snapshot_not_current(self):
+        enqueue_snapshots(self.day)
+        process_snapshot_queue()
+        # a later day does not change the reports of the day
+        Daily.objects.get(production_date=date(2021, 2, 1)).save()
+        self.assertIsNotNone(get_snapshot(self.day, ReportSnapshot.WEEKLY_PAGE))
+        self.assertIsNone(get_snapshot(self.latest_day, ReportSnapshot.WEEKLY_PAGE))
+
+        self.day.sourceproduction_set.first().save()
+        self.assertIsNone(get_snapshot(self.day, ReportSnapshot.WEEKLY_PAGE))
+        self.assertIsNone(get_snapshot_data(self.day, ReportSnapshot.WEEKLY_PAGE))
+
+    def test_stale_snapshots_deleted(self):
+        enqueue_snapshots(self.day)
+        process_snapshot_queue()
+        self.assertEqual(ReportSnapshot.objects.count(), 6)
+
+        # the snapshots of the days after a modified day are deleted by the next run
+        earlier_day = Daily.objects.get(production_date=date(2021, 1, 25))
+        earlier_day.save()
+        enqueue_snapshots(earlier_day)
+        process_snapshot_queue()
+        self.assertFalse(ReportSnapshot.objects.filter(daily=self.day).exists())
+        self.assertEqual(ReportSnapshot.objects.count(), 6)
+        self.assertEqual(Blob.objects.count(), 4)
+
+    def test_settings_change_stamp(self):
+        enqueue_snapshots(self.day)
+        process_snapshot_queue()
+        sourcetype = self.project.sourcetypes.first()
+        sourcetype.mpr_vibes += 1
+        sourcetype.save()
+        self.assertIsNone(get_snapshot(self.day, ReportSnapshot.MPR_EXCEL))
+
+    def test_week_comment_changes_version(self):
+        Weekly.objects.create(
+            project=self.project, week_report_date=self.day.production_date,
+            csr_week_comment='good week')
+        enqueue_snapshots(self.day)
+        process_snapshot_queue()
+        response = self.client.post(
+            reverse('weekly_page', args=[self.day.id]), {'button_pressed': 'delete'})
+        self.assertEqual(response.status_code, 302)
+        self.assertIsNone(get_snapshot(self.day, ReportSnapshot.WEEK_EXCEL))
+        self.assertTrue(SnapshotTask.objects.filter(daily=self.day).exists())
+
+    def test_views_serve_snapshots(self):
+        call_command('run_snapshot_worker', '--once', stdout=io.StringIO())
+        enqueue_snapshots(self.day)
+        call_command('run_snapshot_worker', '--once', stdout=io.StringIO())
+
+        with mock.patch(
+                'daily_report.views.weekly_views.collate_weekly_page_data',
+                side_effect=AssertionError('not from snapshot')):
+            response = self.client.get(reverse('weekly_page', args=[self.day.id]))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context['totals_prod']['proj_total'],
+            collate_weekly_page_data(self.day)['totals_prod']['proj_total'])
+
+        for url_name, kind in [
+                ('csr_week_excel_report', ReportSnapshot.WEEK_EXCEL),
+                ('mpr_page', ReportSnapshot.MPR_EXCEL)]:
+            response = self.client.get(reverse(url_name, args=[self.day.id]))
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIsInstance(response, FileResponse)
+            snapshot = get_snapshot(self.day, kind)
+            self.assertEqual(
+                b''.join(response.streaming_content),
+                b''.join(Blob.objects.read_chunks(snapshot.excel_file_id)))
+
+        # a change of a later day does not affect the snapshots of the day, a change of
+        # the day itself does
+        self.latest_day.save()
+        response = self.client.get(reverse('mpr_page', args=[self.day.id]))
+        self.assertNotIsInstance(response, FileResponse)
+        self.day.save()
+        response = self.client.get(reverse('mpr_page', args=[self.day.id]))
+        self.assertIsInstance(response, FileResponse)
+        response = self.client.get(reverse('weekly_page', args=[self.day.id]))
+        self.assertEqual(response.status_code, 200)
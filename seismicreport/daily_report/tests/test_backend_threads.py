@@ -0,0 +1,73 @@
+from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from django.db import connection
+from django.test import TransactionTestCase, override_settings
+from daily_report.report_backend import ReportInterface
+from daily_report.models.daily_models import Daily
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import assert_dict_equal
+
+THREADS = 8
+REPORTS = 48
+
+
+# no caching of the totals, so that every thread calculates the totals
+@override_settings(TOTALS_CACHE_TIMEOUT=0)
+class SharedInterfaceThreadTests(TransactionTestCase):
+    ''' a ReportInterface shared by threads must give the same results as sequential
+        calculations, for two projects with different source types
+    '''
+    def setUp(self):
+        self.projects = [
+            generate_project(project_name='north', days=30),
+            generate_project(
+                project_name='south', days=30, sourcetypes=('vib_c',), seed=2),
+        ]
+        self.projects[1].sourcetypes.update(mpr_rec_hours=20.0)
+        self.r_iface = ReportInterface('')
+        self.reports = [
+            (project, date(2021, 1, 25) + timedelta(days=i % 20))
+            for i, project in zip(range(REPORTS), self.projects * REPORTS)
+        ]
+
+    def calc_totals(self, project, production_date):
+        try:
+            day = Daily.objects.select_related('project').get(
+                project=project, production_date=production_date)
+            return self.r_iface.calc_totals(day)
+
+        finally:
+            if not self.sequential:
+                connection.close()
+
+    def assert_totals_equal(self, expected, actual):
+        self.assertEqual(expected.graph_key, actual.graph_key)
+        self.assertEqual(expected.mpr_rec_hours, actual.mpr_rec_hours)
+        for expected_totals, actual_totals in zip(expected.totals[1:], actual.totals[1:]):
+            assert_dict_equal(self, expected_totals, actual_totals)
+
+        for stype_name, prod_total in expected.prod_total_by_type.items():
+            assert_dict_equal(self, prod_total, actual.prod_total_by_type[stype_name])
+
+        for key in ['date_series', 'total_sp_series', 'appctm_series', 'rate_series']:
+            np.testing.assert_array_equal(
+                expected.prod_series[key], actual.prod_series[key], err_msg=key)
+
+    def test_threads_share_interface(self):
+        self.sequential = True
+        expected = [self.calc_totals(*report) for report in self.reports]
+
+        self.sequential = False
+        with ThreadPoolExecutor(max_workers=THREADS) as executor:
+            actual = list(executor.map(lambda report: self.calc_totals(*report),
+                                       self.reports))
+
+        for (project, production_date), expected_totals, actual_totals in zip(
+                self.reports, expected, actual):
+            self.assertEqual(
+                actual_totals.graph_key, f'{project.id}/{production_date}')
+            self.assert_totals_equal(expected_totals, actual_totals)
+
+        self.assertEqual(
+            {totals.mpr_rec_hours for totals in actual}, {20.0, 22.0})
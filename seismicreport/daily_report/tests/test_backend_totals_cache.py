@@ -0,0 +1,90 @@
+from datetime import date
+from django.test import TestCase
+from daily_report.report_backend import ReportInterface
+from daily_report.models.project_models import Project, SourceType
+from daily_report.models.daily_models import Daily, TimeBreakdown, HseWeather, ToolBox
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import assert_dict_equal
+
+
+class TotalsCacheTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=35, skip_days=(5, 20))
+        self.production_date = date(2021, 2, 15)
+        self.day = Daily.objects.get(
+            project=self.project, production_date=self.production_date)
+
+    def calc_totals(self):
+        return ReportInterface('').calc_totals(self.day)
+
+    def data_version(self):
+        return Project.objects.get(id=self.project.id).data_version
+
+    def assert_totals_equal(self, expected, actual):
+        prod_total_by_type, *totals = expected.totals
+        self.assertEqual(set(prod_total_by_type), set(actual.prod_total_by_type))
+        for stype_name, prod_total in prod_total_by_type.items():
+            assert_dict_equal(self, prod_total, actual.prod_total_by_type[stype_name])
+
+        for expected_totals, actual_totals in zip(totals, actual.totals[1:]):
+            assert_dict_equal(self, expected_totals, actual_totals)
+
+    def test_totals_from_cache(self):
+        expected = self.calc_totals()
+        # only the data version is queried
+        with self.assertNumQueries(1):
+            actual = self.calc_totals()
+
+        self.assert_totals_equal(expected, actual)
+        self.assertEqual(actual.graph_key, expected.graph_key)
+        self.assertEqual(actual.mpr_rec_hours, expected.mpr_rec_hours)
+        self.assertEqual(
+            list(actual.prod_series['date_series']),
+            list(expected.prod_series['date_series']))
+
+    def test_child_row_saved(self):
+        self.calc_totals()
+        version = self.data_version()
+        tb = TimeBreakdown.objects.get(daily=self.day)
+        tb.rec_hours += 2
+        tb.save()
+        self.assertEqual(self.data_version(), version + 1)
+
+        times_total = self.calc_totals().times_total
+        self.assertAlmostEqual(times_total['day_rec_time'], tb.rec_hours)
+
+        hse = HseWeather.objects.get(daily=self.day)
+        ToolBox.objects.create(hse=hse, toolbox='new toolbox')
+        self.assertEqual(self.data_version(), version + 2)
+        hse_total = self.calc_totals().hse_total
+        self.assertIn('new toolbox', hse_total['toolbox_text'])
+
+    def test_daily_deleted(self):
+        prod_total = self.calc_totals().prod_total
+        version = self.data_version()
+        Daily.objects.get(
+            project=self.project, production_date=date(2021, 2, 1)).delete()
+        self.assertGreater(self.data_version(), version)
+
+        prod_total_deleted = self.calc_totals().prod_total
+        self.assertLess(prod_total_deleted['proj_total'], prod_total['proj_total'])
+
+    def test_sourcetype_and_project_saved(self):
+        prod_total = self.calc_totals().prod_total
+        sourcetype = SourceType.objects.get(project=self.project, sourcetype_name='vib_a')
+        sourcetype.mpr_vibes += 2
+        sourcetype.save()
+        prod_total_vibes = self.calc_totals().prod_total
+        self.assertGreater(prod_total_vibes['day_ctm'], prod_total['day_ctm'])
+
+        # a project instance with an outdated version does not set back the version
+        outdated_project = Project.objects.get(id=self.project.id)
+        self.day.save()
+        version = self.data_version()
+        outdated_project.standby_rate = 0.5
+        outdated_project.save()
+        self.assertEqual(outdated_project.data_version, version + 1)
+        self.assertEqual(self.data_version(), version + 1)
+        self.day = Daily.objects.get(id=self.day.id)
+        prod_total_rate = self.calc_totals().prod_total
+        self.assertNotEqual(prod_total_rate['proj_rate'], prod_total_vibes['proj_rate'])
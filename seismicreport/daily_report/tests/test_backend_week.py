@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+import numpy as np
+from django.test import TestCase
+from daily_report.models.daily_models import Daily
+from daily_report.report_backend import ReportInterface
+from daily_report.week_backend import WeekInterface
+from seismicreport.vars import WEEKDAYS, WEEKS
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import assert_dict_equal
+
+
+def legacy_collate_weekdata(report_day):
+    ''' week data collated with calc_totals for each day and week
+    '''
+    r_iface = ReportInterface('')
+    project = report_day.project
+    days = {}
+    start_date = report_day.production_date - timedelta(days=WEEKDAYS-1)
+    for wd in reversed(range(0, WEEKDAYS)):
+        report_date = start_date + timedelta(days=wd)
+        day = Daily.objects.filter(project=project, production_date=report_date).first()
+        days[wd] = {'date': report_date}
+        _, days[wd]['prod'], days[wd]['times'], days[wd]['rcvr'], _ = (
+            r_iface.calc_totals(day).totals)
+        try:
+            days[wd]['prod']['day_vp_hour'] = (round(
+                days[wd]['prod']['day_total'] / days[wd]['times']['day_rec_time']))
+
+        except (ValueError, KeyError):
+            days[wd]['prod']['day_vp_hour'] = np.nan
+
+    weeks = {}
+    start_date = report_day.production_date - timedelta(days=(WEEKS-1)*WEEKDAYS)
+    for wk in range(0, WEEKS):
+        report_date = start_date + timedelta(days=WEEKDAYS*wk)
+        day = Daily.objects.filter(project=project, production_date=report_date).first()
+        weeks[wk] = {'dates': (report_date - timedelta(days=(WEEKDAYS-1)), report_date)}
+        _, weeks[wk]['prod'], weeks[wk]['times'], weeks[wk]['rcvr'], _ = (
+            r_iface.calc_totals(day).totals)
+        try:
+            weeks[wk]['prod']['week_vp_hour'] = (round(
+                weeks[wk]['prod']['week_total'] / weeks[wk]['times']['week_rec_time']))
+
+        except (ValueError, KeyError):
+            weeks[wk]['prod']['week_vp_hour'] = np.nan
+
+    return days, weeks
+
+
+class CollateWeekdataTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=70, skip_days=(30, 44, 52, 53))
+        self.w_iface = WeekInterface('')
+
+    def assert_period_equal(self, expected, actual, period):
+        for key in ['prod', 'times', 'rcvr']:
+            assert_dict_equal(
+                self, {k: v for k, v in expected[key].items()
+                       if k.startswith(f'{period}_')}, actual[key])
+
+    def test_weekdata_equal_legacy_weekdata(self):
+        for report_date in [date(2021, 1, 22), date(2021, 3, 1), date(2021, 3, 20)]:
+            report_day = Daily.objects.get(production_date=report_date)
+            expected_days, expected_weeks = legacy_collate_weekdata(report_day)
+            days, weeks = self.w_iface.collate_weekdata(report_day)
+
+            self.assertEqual(list(expected_days), list(days))
+            for wd, day in days.items():
+                self.assertEqual(expected_days[wd]['date'], day['date'])
+                self.assert_period_equal(expected_days[wd], day, 'day')
+
+            self.assertEqual(list(expected_weeks), list(weeks))
+            for wk, week in weeks.items():
+                self.assertEqual(expected_weeks[wk]['dates'], week['dates'])
+                self.assert_period_equal(expected_weeks[wk], week, 'week')
+
+    def test_weekdata_number_of_queries(self):
+        report_day = Daily.objects.select_related('project').get(
+            production_date=date(2021, 3, 20))
+        with self.assertNumQueries(6):
+            self.w_iface.collate_weekdata(report_day)
@@ -0,0 +1,48 @@
+import tempfile
+from django.test import TestCase, override_settings
+from daily_report.models.daily_models import Daily, ToolBox
+from daily_report.models.service_models import ServiceTask
+from daily_report.report_backend import ReportInterface
+from daily_report.benchmarks.generate import generate_project
+from daily_report.benchmarks.suite import run_suite, compare_results
+
+
+class BenchmarkSuiteTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.media_root.cleanup()
+
+    def test_generate_project(self):
+        project = generate_project(
+            days=40, sourcetypes=('vib_a', 'vib_b', 'vib_c'), receivertypes=('a', 'b'),
+            service_tasks=7, toolboxes=2)
+        self.assertEqual(Daily.objects.filter(project=project).count(), 40)
+        self.assertEqual(project.sourcetypes.count(), 3)
+        self.assertEqual(project.receivertypes.count(), 2)
+        self.assertEqual(ServiceTask.objects.filter(service__project=project).count(), 7)
+        self.assertEqual(ToolBox.objects.filter(hse__daily__project=project).count(), 80)
+
+        day = Daily.objects.filter(project=project).latest('production_date')
+        self.assertGreater(ReportInterface('').calc_totals(day).prod_total['proj_total'], 0)
+
+    def test_run_suite(self):
+        with override_settings(MEDIA_ROOT=self.media_root.name):
+            results = run_suite(days=15, repeats=1)
+
+        self.assertEqual(results['settings']['days'], 15)
+        self.assertEqual(set(results['results']), {
+            'calc_totals', 'collate_weekdata', 'calc_mpr_data', 'calc_portfolio',
+            'create_daily_graphs', 'create_weekly_graphs', 'excel_daily_report',
+            'excel_weekly_report', 'excel_mpr_report', 'excel_services_report',
+            'read_report_cells', 'populate_report'})
+        for result in results['results'].values():
+            self.assertEqual(set(result), {'queries', 'wall_time', 'peak_memory_mb'})
+            self.assertGreater(result['wall_time'], 0)
+
+        # the populated days follow the last generated day
+        self.assertEqual(Daily.objects.count(), 17)
+        lines = compare_results(results, results)
+        self.assertEqual(len(lines), 13)
+        self.assertIn('1.00x', lines[1])
@@ -0,0 +1,183 @@
+''' tests of the excel reports with named styles, written row by row on write only
+    worksheets for the mpr and services reports, against the expected workbooks in
+    golden/, which were written cell by cell with a font and alignment for each cell
+    by the reports before. The graphs are not part of the expected workbooks.
+'''
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+import numpy as np
+from openpyxl import Workbook, load_workbook
+from django.conf import settings
+from django.test import TestCase, override_settings
+from daily_report.models.service_models import Service, ServiceTask, TaskQuantity
+from daily_report.report_backend import ReportInterface
+from daily_report.excel_mpr_backend import ExcelMprReport
+from daily_report.excel_services_backend import ExcelServiceReport
+from daily_report.excel_daily_backend import (
+    ExcelDayReport, collate_excel_dailyreport_data,
+)
+from daily_report.excel_weekly_backend import (
+    ExcelWeekReport, collate_excel_weekreport_data,
+)
+from seismicreport.utils.utils_excel import save_excel, report_styles, get_border
+from daily_report.benchmarks.generate import generate_project
+from .fixtures import GOLDEN_DIR
+
+def create_services(project):
+    for s in range(2):
+        service = Service.objects.create(
+            project=project, service_contract=f'contract {s}',
+            description=f'service {s}')
+        for t in range(3):
+            task = ServiceTask.objects.create(service=service, task_name=f'task {s}.{t}')
+            TaskQuantity.objects.bulk_create([
+                TaskQuantity(task=task, date=date(2021, 2, d), quantity=d * (t + 1) / 4)
+                for d in range(1 + s + t, 29, 3)
+            ])
+
+
+def style_values(cell):
+    ''' returns: tuple of the style attributes of cell set by the reports
+    '''
+    sides = [getattr(cell.border, side) for side in ['left', 'right', 'top', 'bottom']]
+    border = tuple(side.style if side else None for side in sides)
+    font = (cell.font.name, cell.font.bold, cell.font.size)
+    fill = (cell.fill.fill_type, cell.fill.fgColor.rgb)
+    alignment = (
+        cell.alignment.horizontal, cell.alignment.vertical, cell.alignment.wrap_text)
+    return border, font, fill, alignment, cell.number_format
+
+
+# the graphs of the daily and weekly reports are rendered in a scratch directory
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExcelReportTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(settings.MEDIA_ROOT)
+        super().tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(days=40, skip_days=(25,))
+        create_services(cls.project)
+        cls.single_project = generate_project(
+            project_name='single', days=40, sourcetypes=('vib_a',), seed=2)
+        create_services(cls.single_project)
+
+    def get_day(self, project, report_date):
+        day, _ = ReportInterface('').load_report_db(project, report_date)
+        return day
+
+    def assert_value_equal(self, expected, actual, msg):
+        if isinstance(expected, float) and np.isnan(expected):
+            self.assertTrue(np.isnan(actual), msg=msg)
+
+        elif isinstance(expected, float):
+            self.assertAlmostEqual(expected, actual, places=9, msg=msg)
+
+        else:
+            self.assertEqual(expected, actual, msg=msg)
+
+    def assert_sheet_equal(self, expected, actual):
+        self.assertEqual(
+            expected.sheet_view.showGridLines, actual.sheet_view.showGridLines)
+        self.assertEqual(expected.freeze_panes, actual.freeze_panes)
+        self.assertEqual(
+            {str(cr) for cr in expected.merged_cells.ranges},
+            {str(cr) for cr in actual.merged_cells.ranges})
+        self.assertEqual(
+            {c: d.width for c, d in expected.column_dimensions.items()},
+            {c: d.width for c, d in actual.column_dimensions.items()})
+
+        max_row = max(expected.max_row, actual.max_row)
+        max_col = max(expected.max_column, actual.max_column)
+        for row in range(1, max_row + 1):
+            for col in range(1, max_col + 1):
+                e_cell = expected.cell(row=row, column=col)
+                a_cell = actual.cell(row=row, column=col)
+                msg = f'{expected.title}!{e_cell.coordinate}'
+                e_style = style_values(e_cell)
+                a_style = style_values(a_cell)
+                self.assertEqual(e_style[0], a_style[0], msg=msg)
+                if e_cell.value is None:
+                    # the expected reports format the columns of the table beyond the
+                    # rows with values
+                    self.assertIsNone(a_cell.value, msg=msg)
+                    continue
+
+                self.assert_value_equal(e_cell.value, a_cell.value, msg)
+                self.assertEqual(e_style, a_style, msg=msg)
+
+    def assert_workbook_equal(self, expected_file, actual_file):
+        expected = load_workbook(expected_file)
+        actual = load_workbook(actual_file)
+        self.assertEqual(expected.sheetnames, actual.sheetnames)
+        for sheet_name in expected.sheetnames:
+            self.assert_sheet_equal(expected[sheet_name], actual[sheet_name])
+
+    def test_mpr_report_equal_golden(self):
+        # the expected reports take the production day of a row from the position of
+        # the row in the month, which is correct only for a month without a missing
+        # report before the report date
+        for project, report_date, file_name in [
+                (self.project, date(2021, 2, 13), 'mpr_report.xlsx'),
+                (self.single_project, date(2021, 2, 20), 'mpr_report_single.xlsx')]:
+            day = self.get_day(project, report_date)
+            self.assert_workbook_equal(
+                GOLDEN_DIR / file_name, ExcelMprReport(day).create_mprreport())
+
+    def test_service_report_equal_golden(self):
+        day = self.get_day(self.project, date(2021, 2, 20))
+        for year, month in [(2021, 2), (2021, 1)]:
+            self.assert_workbook_equal(
+                GOLDEN_DIR / f'service_report_{year}_{month:02}.xlsx',
+                ExcelServiceReport(day).create_servicereport(year, month))
+
+    def test_day_report_equal_golden(self):
+        day = self.get_day(self.project, date(2021, 2, 20))
+        report_data = collate_excel_dailyreport_data(day)
+        self.assert_workbook_equal(
+            GOLDEN_DIR / 'day_report.xlsx',
+            ExcelDayReport(
+                report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT
+            ).create_dailyreport())
+
+    def test_week_report_equal_golden(self):
+        day = self.get_day(self.project, date(2021, 2, 20))
+        report_data = collate_excel_weekreport_data(day)
+        self.assert_workbook_equal(
+            GOLDEN_DIR / 'week_report.xlsx',
+            ExcelWeekReport(
+                report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT
+            ).create_weekreport())
+
+    def test_named_styles(self):
+        day = self.get_day(self.project, date(2021, 2, 20))
+        report_data = collate_excel_weekreport_data(day)
+        wb = load_workbook(ExcelWeekReport(
+            report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT).create_weekreport())
+        # the cells with a value refer to a named style of the registry
+        for ws in wb.worksheets:
+            for row in ws.iter_rows():
+                for cell in row:
+                    if cell.value is not None:
+                        self.assertIn(cell.style, report_styles, msg=cell.coordinate)
+
+        # the same border object is used for the same sides
+        self.assertIs(get_border(top='thin'), get_border(top='thin'))
+
+    def test_save_excel_spools_to_disk(self):
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('rows')
+        for r in range(2000):
+            ws.append([r, r * 0.5, f'row {r}'])
+
+        # a workbook larger than the spool size is written to a file on disk
+        with mock.patch('seismicreport.utils.utils_excel.EXCEL_SPOOL_SIZE', 10_000):
+            f_excel = save_excel(wb)
+
+        self.assertTrue(f_excel._rolled)
+        self.assertEqual(load_workbook(f_excel)['rows']['C2000'].value, 'row 1999')
+        f_excel.close()
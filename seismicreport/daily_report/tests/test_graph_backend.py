@@ -0,0 +1,165 @@
+import os
+import tempfile
+from pathlib import Path
+from datetime import date
+from unittest import mock
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.test import TestCase, override_settings
+from daily_report.report_backend import ReportInterface
+import daily_report.graph_render as graph_render
+from seismicreport.utils.file_cache import FileCache
+from daily_report.models.daily_models import Daily
+from daily_report.benchmarks.generate import generate_project
+
+
+class GraphCacheTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=20)
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.r_iface = ReportInterface(self.media_dir.name)
+
+    def tearDown(self):
+        self.media_dir.cleanup()
+
+    def create_daily_graphs(self, production_date):
+        day, _ = self.r_iface.load_report_db(self.project, production_date)
+        return self.r_iface.create_daily_graphs(self.r_iface.calc_totals(day))
+
+    @override_settings(GRAPH_WORKERS=1)
+    def test_graphs_rendered_once(self):
+        with mock.patch.object(
+                graph_render, 'render_graph', wraps=graph_render.render_graph) as render:
+            graph_files = self.create_daily_graphs(date(2021, 1, 30))
+            self.assertEqual(render.call_count, 4)
+            self.assertEqual(graph_files, self.create_daily_graphs(date(2021, 1, 30)))
+            self.assertEqual(render.call_count, 4)
+
+        for graph_file in graph_files.values():
+            self.assertEqual(Path(graph_file).read_bytes()[1:4], b'PNG')
+
+        graph_urls = self.r_iface.get_graph_urls(graph_files)
+        self.assertEqual(
+            graph_urls['daily_prod'],
+            f'/media/images/graphs/{Path(graph_files["daily_prod"]).name}')
+
+    def test_graphs_keyed_by_report(self):
+        graph_files_1 = self.create_daily_graphs(date(2021, 1, 30))
+        graph_files_2 = self.create_daily_graphs(date(2021, 1, 31))
+        for graph_name, graph_file in graph_files_1.items():
+            self.assertNotEqual(graph_file, graph_files_2[graph_name])
+
+    @override_settings(GRAPH_CACHE_SIZE=1)
+    def test_graphs_cache_size(self):
+        graph_files = self.create_daily_graphs(date(2021, 1, 30))
+        cached_files = list((Path(self.media_dir.name) / 'images/graphs').iterdir())
+        self.assertEqual(cached_files, [graph_files['app_ctm_ratio']])
+
+    @override_settings(GRAPH_WORKERS=2)
+    def test_graphs_rendered_in_process_pool(self):
+        day, _ = self.r_iface.load_report_db(self.project, date(2021, 1, 30))
+        report_totals = self.r_iface.calc_totals(day)
+        graphs_data = self.r_iface.get_daily_graphs_data(report_totals)
+        graphs_png = graph_render.render_graphs(graphs_data, workers=2)
+        self.assertEqual(
+            graphs_png, graph_render.render_graphs(graphs_data, workers=1))
+
+        graph_files = self.r_iface.create_daily_graphs(report_totals)
+        for graph_name, graph_file in graph_files.items():
+            self.assertEqual(Path(graph_file).read_bytes(), graphs_png[graph_name])
+
+
+class DailyChartTests(TestCase):
+    def setUp(self):
+        self.project = generate_project(days=20)
+        self.media_dir = tempfile.TemporaryDirectory()
+        self.settings_media = override_settings(MEDIA_ROOT=self.media_dir.name)
+        self.settings_media.enable()
+        User.objects.create_user(username='john', password='secret123')
+        self.client.login(username='john', password='secret123')
+        self.day = Daily.objects.get(
+            project=self.project, production_date=date(2021, 1, 30))
+
+    def tearDown(self):
+        self.settings_media.disable()
+        self.media_dir.cleanup()
+
+    def chart_url(self, chart_name):
+        return reverse('daily_chart', args=[self.day.id, chart_name])
+
+    def test_chart_equals_report_graph(self):
+        r_iface = ReportInterface(self.media_dir.name)
+        day, _ = r_iface.load_report_db(self.project, self.day.production_date)
+        graph_files = r_iface.create_daily_graphs(r_iface.calc_totals(day))
+        for graph_name, graph_file in graph_files.items():
+            response = self.client.get(self.chart_url(graph_name))
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response['Content-Type'], 'image/png')
+            self.assertEqual(response.content, Path(graph_file).read_bytes())
+
+    def test_chart_file_evicted(self):
+        r_iface = ReportInterface(self.media_dir.name)
+        graph_files = r_iface.create_daily_graphs(r_iface.calc_totals(self.day))
+        png = Path(graph_files['rec_hours']).read_bytes()
+        # the file is removed by another process between the lookup and the read
+        with mock.patch(
+                'seismicreport.utils.file_cache.FileCache.get',
+                return_value=Path(self.media_dir.name) / 'evicted.png'):
+            response = self.client.get(self.chart_url('rec_hours'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, png)
+
+    def test_chart_from_cached_totals(self):
+        self.client.get(self.chart_url('daily_prod'))
+        with mock.patch.object(
+                ReportInterface, 'calc_proj_time_totals',
+                side_effect=AssertionError('series calculated again')):
+            response = self.client.get(self.chart_url('cumul_prod'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_chart_not_modified(self):
+        response = self.client.get(self.chart_url('daily_prod'))
+        etag = response['ETag']
+        self.assertIn('no-cache', response['Cache-Control'])
+
+        response = self.client.get(self.chart_url('daily_prod'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        # a change in an earlier day changes the graph
+        Daily.objects.get(
+            project=self.project, production_date=date(2021, 1, 25)).save()
+        response = self.client.get(self.chart_url('daily_prod'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        # but not a change in a later day
+        etag = response['ETag']
+        Daily.objects.get(
+            project=self.project, production_date=date(2021, 2, 5)).save()
+        response = self.client.get(self.chart_url('daily_prod'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unknown_chart(self):
+        self.assertEqual(self.client.get(self.chart_url('no_chart')).status_code, 404)
+        self.assertEqual(self.client.get(
+            reverse('daily_chart', args=[0, 'daily_prod'])).status_code, 404)
+
+
+class FileCacheTests(TestCase):
+    def test_least_recently_used_evicted(self):
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = FileCache(cache_dir, max_size=30, suffix='.bin')
+            cache.put('a', b'a' * 10)
+            cache.put('b', b'b' * 10)
+            cache.put('c', b'c' * 10)
+            # b is the least recently used
+            for key, access_time in [('a', 1000), ('b', 100), ('c', 500)]:
+                os.utime(cache.path(key), (access_time, access_time))
+
+            cache.put('d', b'd' * 10)
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual(cache.get('a').read_bytes(), b'a' * 10)
+            self.assertIsNotNone(cache.get('c'))
+            self.assertIsNotNone(cache.get('d'))
@@ -0,0 +1,96 @@
+from datetime import date
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory, modify_settings
+from django.urls import reverse
+from daily_report.models.daily_models import Daily
+from seismicreport.utils.metrics import Metrics, MetricsMiddleware, metrics, span
+from daily_report.benchmarks.generate import generate_project
+
+
+class MetricsTests(TestCase):
+    def test_percentiles(self):
+        store = Metrics(window=100)
+        for i in range(200):
+            store.record('calc', i / 1000)
+
+        summary = store.summary()['calc']
+        self.assertEqual(summary['count'], 200)
+        self.assertAlmostEqual(summary['sum'], sum(range(200)) / 1000)
+        # only the last 100 durations are in the window
+        self.assertAlmostEqual(summary['p50'], 0.1495)
+        self.assertAlmostEqual(summary['p99'], 0.19801)
+
+        text = store.prometheus_text()
+        self.assertIn('seismicreport_span_seconds{span="calc",quantile="0.95"} 0.194', text)
+        self.assertIn('seismicreport_span_seconds_count{span="calc"} 200', text)
+
+    def test_span_without_request(self):
+        metrics.reset()
+        with span('outer'):
+            with span('inner'):
+                pass
+
+        self.assertEqual(set(metrics.summary()), {'outer', 'inner'})
+        self.assertEqual(metrics.recent_requests(), [])
+
+    def test_nested_spans(self):
+        metrics.reset()
+
+        def get_response(request):
+            with span('outer'):
+                Daily.objects.count()
+                with span('inner'):
+                    Daily.objects.count()
+
+            Daily.objects.count()
+            return HttpResponse()
+
+        MetricsMiddleware(get_response)(RequestFactory().get('/report/'))
+        record = metrics.recent_requests()[0]
+        self.assertEqual(record.sql_count, 3)
+        self.assertEqual(
+            [(s.name, s.depth, s.sql_count) for s in record.spans],
+            [('outer', 0, 2), ('inner', 1, 1)])
+        self.assertEqual(
+            set(metrics.summary()), {'outer', 'inner', 'request unresolved'})
+
+
+@modify_settings(MIDDLEWARE={'prepend': 'seismicreport.utils.metrics.MetricsMiddleware'})
+class MetricsRequestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_project(days=10)
+        User.objects.create_user(username='john', password='secret123')
+        User.objects.create_user(username='staff', password='secret123', is_staff=True)
+
+    def setUp(self):
+        metrics.reset()
+
+    def test_request_spans(self):
+        self.client.login(username='john', password='secret123')
+        day = Daily.objects.get(production_date=date(2021, 1, 25))
+        response = self.client.get(reverse('daily_page', args=[day.id]))
+        self.assertEqual(response.status_code, 200)
+
+        record = metrics.recent_requests()[0]
+        self.assertEqual(record.path, reverse('daily_page', args=[day.id]))
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.sql_count, 0)
+        names = [s.name for s in record.spans]
+        self.assertIn('calc_totals', names)
+        self.assertLessEqual(
+            sum(s.sql_count for s in record.spans if s.depth == 0), record.sql_count)
+        self.assertIn('request daily_page', metrics.summary())
+
+    def test_metrics_staff_only(self):
+        self.client.login(username='john', password='secret123')
+        self.assertEqual(self.client.get(reverse('metrics_page')).status_code, 302)
+        self.assertEqual(self.client.get(reverse('metrics_prometheus')).status_code, 302)
+
+        self.client.login(username='staff', password='secret123')
+        response = self.client.get(reverse('metrics_page'))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(reverse('metrics_prometheus'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'span="request metrics_page"')
@@ -0,0 +1,100 @@
+import re
+import unittest
+from datetime import date
+from django.test import TestCase
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, TimeBreakdown, HseWeather,
+)
+from daily_report.report_backend import ReportInterface
+from daily_report.portfolio_backend import (
+    get_portfolio_filters, get_grouped_rows, incident_keys,
+)
+from daily_report.week_backend import WeekInterface
+from seismicreport.vars import source_prod_schema, time_breakdown_schema
+from daily_report.benchmarks.generate import generate_project
+
+
+def get_query_plan(sql):
+    ''' returns: list of the lines of the query plan of sql
+    '''
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # the tables are too small for the planner to prefer an index, with
+            # sequential scans disabled a sequential scan means there is no index
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}')
+            return [row[0] for row in cursor.fetchall()]
+
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def is_sequential_scan(plan_line):
+    if connection.vendor == 'postgresql':
+        return 'Seq Scan' in plan_line
+
+    # sqlite: a scan of a table without an index, e.g. 'SCAN daily_report_daily'
+    return bool(re.match(r'^SCAN (TABLE )?\w+$', plan_line.strip()))
+
+
+@unittest.skipUnless(
+    connection.vendor in ['sqlite', 'postgresql'], 'query plans for sqlite/ postgresql')
+class PeriodQueryPlanTests(TestCase):
+    ''' the period queries must use the indexes on the project, sourcetype and
+        production date and not scan the tables
+    '''
+    @classmethod
+    def setUpTestData(cls):
+        cls.project = generate_project(days=40)
+        generate_project(project_name='other', days=40, seed=2)
+
+    def setUp(self):
+        self.r_iface = ReportInterface('')
+        self.day, _ = self.r_iface.load_report_db(self.project, date(2021, 2, 10))
+        self.sourcetypes = list(self.project.sourcetypes.all())
+        self.receivertype = self.project.receivertypes.first()
+
+    def assert_no_sequential_scans(self, func, *args):
+        with CaptureQueriesContext(connection) as queries:
+            func(*args)
+
+        self.assertTrue(queries.captured_queries)
+        for query in queries.captured_queries:
+            plan = get_query_plan(query['sql'])
+            self.assertFalse(
+                any(is_sequential_scan(line) for line in plan),
+                msg=f'\n{query["sql"]}\n' + '\n'.join(plan))
+
+    def test_period_aggregates(self):
+        self.assert_no_sequential_scans(
+            self.r_iface.aggregate_prod_totals, self.day, self.sourcetypes)
+        self.assert_no_sequential_scans(self.r_iface.aggregate_time_totals, self.day)
+        self.assert_no_sequential_scans(
+            self.r_iface.aggregate_receiver_totals, self.day, self.receivertype)
+        self.assert_no_sequential_scans(self.r_iface.aggregate_hse_totals, self.day)
+
+    def test_portfolio_aggregates(self):
+        period_filters = get_portfolio_filters(self.r_iface.get_latest_reports())
+        for model, group_keys, fields in [
+                (SourceProduction, ['daily__project', 'sourcetype'], source_prod_schema),
+                (TimeBreakdown, ['daily__project'], time_breakdown_schema),
+                (HseWeather, ['daily__project'], incident_keys)]:
+            self.assert_no_sequential_scans(
+                get_grouped_rows, model, group_keys, fields, period_filters)
+
+    def test_cumulative_totals_and_kpis(self):
+        self.r_iface.update_cumulative_totals(self.project)
+        self.r_iface.rebuild_project_kpis(self.project)
+        self.assert_no_sequential_scans(self.r_iface.get_cumulative_rows, self.day)
+        self.assert_no_sequential_scans(
+            self.r_iface.get_kpi_series, self.day, None, [self.day.production_date])
+
+    def test_weekly_window(self):
+        self.assert_no_sequential_scans(WeekInterface('').load_window, self.day)
+
+    def test_sequential_scan_detected(self):
+        with self.assertRaises(AssertionError):
+            self.assert_no_sequential_scans(
+                lambda: list(Daily.objects.filter(pm_comment='no index')))
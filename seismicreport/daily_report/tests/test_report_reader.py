@@ -0,0 +1,60 @@
+import tempfile
+from pathlib import Path
+from datetime import date
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+from daily_report.report_reader import read_report_cells, read_report, report_cells
+from daily_report.benchmarks.generate import create_report_file
+from .test_backend_populate import report_values
+
+
+def legacy_report_cells(file_name):
+    ''' cells of the report read with pandas
+    '''
+    day_df = pd.read_excel(file_name, header=None)
+    day_cells = {}
+    for kw, (r, c) in report_cells.items():
+        try:
+            day_cells[kw] = day_df.iat[r, c]
+
+        except IndexError:
+            day_cells[kw] = np.nan
+
+    return day_cells
+
+
+class ReportReaderTests(SimpleTestCase):
+    def setUp(self):
+        self.report_dir = tempfile.TemporaryDirectory()
+        self.file_name = Path(self.report_dir.name) / 'daily_report.xlsx'
+
+    def tearDown(self):
+        self.report_dir.cleanup()
+
+    def test_cells_equal_pandas_cells(self):
+        create_report_file(self.file_name, report_values(date(2021, 2, 1)))
+        expected = legacy_report_cells(self.file_name)
+        day_cells = read_report_cells(self.file_name)
+        self.assertEqual(set(expected), set(day_cells))
+        for kw, value in expected.items():
+            if pd.isnull(value):
+                self.assertTrue(np.isnan(day_cells[kw]), msg=kw)
+
+            else:
+                self.assertEqual(value, day_cells[kw], msg=kw)
+
+        self.assertEqual(day_cells['project'], 'test')
+        self.assertEqual(day_cells['sp_t1_a'], 1500)
+        self.assertEqual(day_cells['date'].date(), date(2021, 2, 1))
+
+    def test_invalid_workbook(self):
+        self.file_name.write_text('daily report')
+        _, day_cells, errors = read_report(self.file_name)
+        self.assertIsNone(day_cells)
+        self.assertTrue(errors[0].startswith('cannot read workbook'))
+
+        create_report_file(self.file_name, report_values(
+            date(2021, 2, 1), date='no date', project=None))
+        _, _, errors = read_report(self.file_name)
+        self.assertEqual(errors, ['no project', 'invalid date: no date'])
@@ -0,0 +1,102 @@
+''' module to cache the results of calc_totals in the Django cache. The cache key
+    includes the data version of the project, which is incremented when a daily
+    report or a source or receiver type of the project is saved or deleted, so a
+    cached result is never used after the data of the project has changed
+'''
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.db.models.signals import pre_save, post_save, post_delete
+from django.dispatch import receiver
+from daily_report.models.project_models import Project, SourceType, ReceiverType
+from daily_report.models.daily_models import (
+    Daily, SourceProduction, ReceiverProduction, TimeBreakdown, HseWeather, ToolBox,
+)
+from seismicreport.utils.plogger import Logger
+
+logger = Logger.getlogger()
+
+
+def bump_data_version(**project_filter):
+    Project.objects.filter(**project_filter).update(data_version=F('data_version') + 1)
+
+
+@receiver(pre_save, sender=Project)
+def bump_project_version(sender, instance, **kwargs):
+    ''' the version is incremented in the database when the project is saved, so that
+        a project instance with an outdated version does not set it back
+    '''
+    if instance.pk:
+        instance.data_version = F('data_version') + 1
+
+
+@receiver(post_save, sender=Project)
+def refresh_project_version(sender, instance, created, **kwargs):
+    if not created:
+        instance.refresh_from_db(fields=['data_version'])
+
+
+@receiver(post_save, sender=Daily)
+@receiver(post_delete, sender=Daily)
+@receiver(post_save, sender=SourceType)
+@receiver(post_delete, sender=SourceType)
+@receiver(post_save, sender=ReceiverType)
+@receiver(post_delete, sender=ReceiverType)
+def bump_version_project_data(sender, instance, **kwargs):
+    bump_data_version(id=instance.project_id)
+
+
+# the rows of a daily report are deleted and bulk created together with a save of the
+# daily, only a save of a single row needs to increment the version. Receivers for
+# post_delete would prevent the rows being deleted in a single query. The daily is
+# marked modified as well, as the report snapshots depend on its last modified time.
+@receiver(post_save, sender=SourceProduction)
+@receiver(post_save, sender=ReceiverProduction)
+@receiver(post_save, sender=TimeBreakdown)
+@receiver(post_save, sender=HseWeather)
+def bump_version_daily_data(sender, instance, **kwargs):
+    bump_data_version(dailies__id=instance.daily_id)
+    Daily.objects.filter(id=instance.daily_id).update(last_modified=timezone.now())
+
+
+@receiver(post_save, sender=ToolBox)
+def bump_version_toolbox(sender, instance, **kwargs):
+    bump_data_version(dailies__hseweather__id=instance.hse_id)
+    Daily.objects.filter(hseweather__id=instance.hse_id).update(
+        last_modified=timezone.now())
+
+
+class Mixin:
+
+    @staticmethod
+    def get_totals_cache_key(daily):
+        ''' returns: key for the totals of daily at the current data version of the
+                     project, None if there is no daily
+        '''
+        if not daily:
+            return None
+
+        data_version = Project.objects.filter(id=daily.project_id).values_list(
+            'data_version', flat=True).first()
+        return f'report_totals:{daily.project_id}:{daily.production_date}:{data_version}'
+
+    @staticmethod
+    def get_cached_totals(cache_key):
+        ''' returns: ReportTotals from the cache or None if not in the cache
+        '''
+        if not cache_key:
+            return None
+
+        report_totals = cache.get(cache_key)
+        if report_totals is not None:
+            logger.info(f'totals from cache: {cache_key}')
+
+        return report_totals
+
+    @staticmethod
+    def set_cached_totals(cache_key, report_totals):
+        if not cache_key:
+            return
+
+        cache.set(cache_key, report_totals, settings.TOTALS_CACHE_TIMEOUT)
@@ -3,6 +3,7 @@
 from django.urls import path
 from daily_report.views import (
      project_views, daily_views, weekly_views, mpr_views, service_views,
+     portfolio_views, metrics_views, job_views,
 )
 
 
@@ -13,6 +14,8 @@ urlpatterns = [
          project_views.download_pdf_workorder, name='download'),
     path('daily_report/daily_page/<int:daily_id>/',
          daily_views.DailyView.as_view(), name='daily_page'),
+    path('daily_report/chart/<int:daily_id>/<str:chart_name>.png',
+         daily_views.daily_chart, name='daily_chart'),
     path('daily_report/sourcetype_page/<int:daily_id>/',
          daily_views.SourcetypeView.as_view(), name='sourcetype_page'),
     path('daily_report/csr_excel_report/<int:daily_id>/',
@@ -29,4 +32,17 @@ urlpatterns = [
          service_views.MonthlyServiceView.as_view(), name='monthly_service_page'),
     path('daily_report/services_excel_report/<int:daily_id>/<int:year>/<int:month>/',
          service_views.services_excel_report, name='services_excel_report'),
+    path('daily_report/portfolio_page/',
+         portfolio_views.PortfolioView.as_view(), name='portfolio_page'),
+    path('daily_report/portfolio_json/',
+         portfolio_views.portfolio_json, name='portfolio_json'),
+    path('daily_report/report_job/<int:daily_id>/<str:kind>/',
+         job_views.enqueue_report, name='report_job'),
+    path('daily_report/report_job_status/<int:job_id>/',
+         job_views.report_status, name='report_job_status'),
+    path('daily_report/report_job_download/<int:job_id>/',
+         job_views.download_report, name='report_job_download'),
+    path('metrics/', metrics_views.metrics_page, name='metrics_page'),
+    path('metrics/prometheus/',
+         metrics_views.metrics_prometheus, name='metrics_prometheus'),
 ]
@@ -1,18 +1,26 @@
+import tempfile
 from datetime import timedelta
 from django.conf import settings
-from django.http import FileResponse
-from django.shortcuts import render, redirect
+from django.http import FileResponse, HttpResponse, Http404
+from django.shortcuts import render, redirect, get_object_or_404
+from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.utils.datastructures import MultiValueDictKeyError
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 from django.views.generic import View
 from daily_report.models.daily_models import Daily
 from daily_report.forms.project_forms import ProjectControlForm
 from daily_report.forms.daily_forms import DailyForm
 from daily_report.report_backend import ReportInterface
+from daily_report.graph_backend import DAILY_GRAPHS
+from daily_report.import_backend import save_upload_files
 from daily_report.excel_daily_backend import (
     ExcelDayReport, collate_excel_dailyreport_data
 )
+from daily_report.snapshot_backend import enqueue_snapshots, enqueue_latest_snapshots
 from seismicreport.vars import RIGHT_ARROW, LEFT_ARROW
 from seismicreport.utils.plogger import Logger
 from seismicreport.utils.get_ip import get_client_ip
@@ -52,21 +60,20 @@ class DailyView(View):
                 'projects': day.project.project_name,
                 'report_date':day.production_date.strftime('%#d %b %Y'),
             })
-            (
-                _,
-                totals_production,
-                totals_time,
-                totals_receiver,
-                totals_hse
-             ) = self.rprt_iface.calc_totals(day)
-
-            self.rprt_iface.create_daily_graphs()
+            report_totals = self.rprt_iface.calc_totals(day)
+
+            # the graphs are rendered when the browser requests them from daily_chart
+            graph_urls = {
+                graph_name: reverse('daily_chart', args=[day.id, graph_name])
+                for graph_name in DAILY_GRAPHS
+            }
             context = {
+                'graph_urls': graph_urls,
                 'form_daily': self.form_daily(initial=day_initial),
-                'totals_production': totals_production,
-                'totals_receiver': totals_receiver,
-                'totals_time': totals_time,
-                'totals_hse': totals_hse,
+                'totals_production': report_totals.prod_total,
+                'totals_receiver': report_totals.rcvr_total,
+                'totals_time': report_totals.times_total,
+                'totals_hse': report_totals.hse_total,
                 'arrow_symbols': self.arrow_symbols,
                 'form_project_control': form_project_control,
             }
@@ -122,6 +129,7 @@ class DailyView(View):
 
             csr_comment = ''
             staff_selected = []
+            data_changed = False
             if button_pressed == 'submit':
                 daily_form = self.form_daily(request.POST)
                 if daily_form.is_valid():
@@ -133,6 +141,7 @@ class DailyView(View):
                 report_file = request.FILES['daily_report_file']
                 report_date = self.rprt_iface.save_report_file(project, report_file)
                 if report_date:
+                    data_changed = True
                     logger.info(
                         f'user {user.username} (ip: {ip_address}) '
                         f'uploaded {report_file} for {report_date} '
@@ -142,6 +151,34 @@ class DailyView(View):
             except MultiValueDictKeyError:
                 pass
 
+            # batch of reports as workbooks and/ or zip files, read in this process so
+            # the request does not start a pool of processes, large batches are
+            # imported with the management command import_reports
+            batch_files = request.FILES.getlist('batch_report_files')
+            if project and batch_files:
+                with tempfile.TemporaryDirectory() as upload_dir:
+                    file_names, results = save_upload_files(batch_files, upload_dir)
+                    results += self.rprt_iface.import_report_files(
+                        project, file_names, workers=1)
+
+                imported_dates = [result['date'] for result in results if result['date']]
+                logger.info(
+                    f'user {user.username} (ip: {ip_address}) '
+                    f'imported {len(imported_dates)} of {len(results)} reports '
+                    f'for {project.project_name}'
+                )
+                for result in results:
+                    message = f'{result["file"]}: {result["message"]}'
+                    if result['date']:
+                        messages.info(request, message)
+
+                    else:
+                        messages.warning(request, message)
+
+                if imported_dates:
+                    report_date = max(imported_dates)
+                    data_changed = True
+
             day, _ = self.rprt_iface.load_report_db(project, report_date)
             if day and button_pressed == 'delete':
                 logger.info(
@@ -152,18 +189,23 @@ class DailyView(View):
                 day.delete()
                 day = None
                 report_date = string_to_date('1900-01-01')
+                enqueue_latest_snapshots(project)
 
             else:
                 if day and button_pressed == "submit":
                     day.csr_comment = csr_comment
                     day.staff.set(staff_selected)
                     day.save()
+                    data_changed = True
                     logger.info(
                         f'user {user.username} (ip: {ip_address}) made comment '
                         f'in report {day.production_date} '
                         f'for {day.project.project_name}'
                     )
 
+                if day and data_changed:
+                    enqueue_snapshots(day)
+
             request.session['selected_project'] = project_name
             request.session['report_date'] = date_to_string(report_date)
 
@@ -196,20 +238,14 @@ class SourcetypeView(View):
                 'projects': day.project.project_name,
                 'report_date':day.production_date.strftime('%#d %b %Y'),
             })
-            (
-                totals_production_by_type,
-                totals_production,
-                _,
-                _,
-                _,
-             ) = self.rprt_iface.calc_totals(day)
+            report_totals = self.rprt_iface.calc_totals(day)
 
             context = {
                 'daily_id': daily_id,
                 'form_daily': self.form_daily(initial=day_initial),
                 'form_project_control': form_project_control,
-                'totals_production_by_type': totals_production_by_type,
-                'totals_production': totals_production,
+                'totals_production_by_type': report_totals.prod_total_by_type,
+                'totals_production': report_totals.prod_total,
                 'arrow_symbols': self.arrow_symbols,
             }
 
@@ -262,6 +298,40 @@ class SourcetypeView(View):
         return redirect('sourcetype_page', day_id)
 
 
+def get_chart_etag(request, daily_id, chart_name):
+    try:
+        day = Daily.objects.get(id=daily_id)
+
+    except Daily.DoesNotExist:
+        return None
+
+    return ReportInterface.get_graph_etag(day, chart_name)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=get_chart_etag)
+def daily_chart(request, daily_id, chart_name):
+    ''' renders the graph chart_name of the daily report, browsers must revalidate
+        the graph with its etag, which changes when the data of the graph changes
+    '''
+    if chart_name not in DAILY_GRAPHS:
+        raise Http404('Unknown chart')
+
+    day = get_object_or_404(Daily.objects.select_related('project'), id=daily_id)
+    r_iface = ReportInterface(settings.MEDIA_ROOT)
+    # the totals of the daily page are cached, so the charts of the page do not
+    # calculate the project series again
+    report_totals = r_iface.calc_totals(day)
+    graph_data = r_iface.get_daily_graphs_data(report_totals).get(chart_name)
+    if not graph_data:
+        raise Http404('No data for chart')
+
+    return HttpResponse(
+        r_iface.get_graph_png(chart_name, graph_data, report_totals.graph_key),
+        content_type='image/png')
+
+
 def csr_excel_report(request, daily_id):
 
     r_iface = ReportInterface('')
@@ -0,0 +1,48 @@
+from django.http import JsonResponse, Http404
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.contrib.auth.decorators import login_required
+from django.views.decorators.http import require_POST
+from daily_report.models.daily_models import Daily
+from daily_report.models.job_models import ReportJob
+from daily_report.job_backend import enqueue_report_job, REPORT_FILE_NAMES
+from daily_report.snapshot_backend import excel_file_response
+
+
+def job_status(job):
+    return {
+        'job_id': job.id,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.message,
+        'status_url': reverse('report_job_status', args=[job.id]),
+        'download_url': (
+            reverse('report_job_download', args=[job.id])
+            if job.status == ReportJob.DONE else None),
+    }
+
+
+@login_required
+@require_POST
+def enqueue_report(request, daily_id, kind):
+    if kind not in REPORT_FILE_NAMES:
+        raise Http404(f'no report {kind}')
+
+    day = get_object_or_404(Daily.objects.select_related('project'), id=daily_id)
+    job = enqueue_report_job(day, kind, user=request.user)
+    return JsonResponse(job_status(job), status=202)
+
+
+@login_required
+def report_status(request, job_id):
+    return JsonResponse(job_status(get_object_or_404(ReportJob, id=job_id)))
+
+
+@login_required
+def download_report(request, job_id):
+    job = get_object_or_404(ReportJob, id=job_id)
+    if job.status != ReportJob.DONE or not job.result_file_id:
+        raise Http404(f'report job {job_id} is {job.status}')
+
+    return excel_file_response(job.result_file_id, REPORT_FILE_NAMES[job.kind])
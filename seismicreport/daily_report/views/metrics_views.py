@@ -0,0 +1,24 @@
+import os
+from django.shortcuts import render
+from django.http import HttpResponse
+from django.contrib.auth.decorators import user_passes_test
+from seismicreport.utils.metrics import metrics, PERCENTILES
+
+staff_required = user_passes_test(lambda user: user.is_active and user.is_staff)
+
+
+@staff_required
+def metrics_page(request):
+    context = {
+        'spans': metrics.summary(),
+        'percentiles': [f'p{p}' for p in PERCENTILES],
+        'requests': metrics.recent_requests(),
+        'pid': os.getpid(),
+    }
+    return render(request, 'daily_report/metrics_page.html', context)
+
+
+@staff_required
+def metrics_prometheus(request):
+    return HttpResponse(
+        metrics.prometheus_text(), content_type='text/plain; version=0.0.4')
@@ -3,7 +3,9 @@ from django.shortcuts import redirect
 from django.contrib.auth.decorators import login_required
 from daily_report.report_backend import ReportInterface
 from daily_report.models.daily_models import Daily
+from daily_report.models.snapshot_models import ReportSnapshot
 from daily_report.excel_mpr_backend import ExcelMprReport
+from daily_report.snapshot_backend import snapshot_file_response
 
 
 @login_required
@@ -19,6 +21,10 @@ def mpr_excel_report(request, daily_id):
     except Daily.DoesNotExist:
         return redirect('daily_page', 0)
 
+    response = snapshot_file_response(day, ReportSnapshot.MPR_EXCEL, 'mpr_report.xlsx')
+    if response is not None:
+        return response
+
     mpr_report = ExcelMprReport(day)
 
     # note FileResponse will close the file/ buffer - do not use with block
@@ -0,0 +1,26 @@
+from django.shortcuts import render
+from django.http import JsonResponse
+from django.utils.decorators import method_decorator
+from django.contrib.auth.decorators import login_required
+from django.views.generic import View
+from daily_report.report_backend import ReportInterface
+from daily_report.aggregate_backend import PERIODS
+
+
+@method_decorator(login_required, name='dispatch')
+class PortfolioView(View):
+
+    template_portfolio_page = 'daily_report/portfolio_page.html'
+    ri = ReportInterface('')
+
+    def get(self, request):
+        context = {
+            'portfolio': self.ri.calc_portfolio(),
+            'periods': PERIODS,
+        }
+        return render(request, self.template_portfolio_page, context)
+
+
+@login_required
+def portfolio_json(request):
+    return JsonResponse({'projects': ReportInterface('').calc_portfolio()})
@@ -1,6 +1,5 @@
-import io
-from django.shortcuts import render
-from django.http import FileResponse
+from django.shortcuts import render, get_object_or_404
+from django.http import HttpResponse, StreamingHttpResponse, Http404
 from django.utils.decorators import method_decorator
 from django.utils.datastructures import MultiValueDictKeyError
 from django.contrib.auth.decorators import login_required
@@ -9,6 +8,7 @@ from daily_report.forms.project_forms import (
     ProjectControlForm, BlockControlForm, SourceTypeControlForm, ReceiverTypeControlForm,
     ProjectForm, BlockForm, SourceTypeForm, ReceiverTypeForm
 )
+from daily_report.models.blob_models import Blob
 from daily_report.models.project_models import Project
 from daily_report.project_backend import ProjectInterface
 from daily_report.report_backend import ReportInterface
@@ -170,6 +170,8 @@ class ProjectView(View):
 
                 if form_project.is_valid():
                     form_project.save(commit=True)
+                    # rates depend on the project parameters
+                    self.ri.rebuild_project_kpis(self.project)
                     # in case the name of the project has been changed
                     self.selected_project = form_project.cleaned_data.get('project_name')
                     # disable button pressed
@@ -192,6 +194,8 @@ class ProjectView(View):
 
                 if form_sourcetype.is_valid():
                     form_sourcetype.save(commit=True)
+                    # ctm depends on the sourcetype parameters
+                    self.ri.rebuild_project_kpis(self.project)
                     # in case the name of the sourcetype has been changed
                     self.selected_sourcetype = form_sourcetype.cleaned_data.get(
                         'sourcetype_name')[:NAME_LENGTH]
@@ -343,6 +347,9 @@ class ProjectView(View):
             self.sourcetype, self.selected_sourcetype = self.pi.delete_sourcetype(
                 self.sourcetype)
 
+        self.ri.rebuild_project_kpis(self.project)
+        self.ri.update_cumulative_totals(self.project)
+
         self.new_sourcetype_name = ''
         self.button_pressed = ''
 
@@ -361,9 +368,55 @@ class ProjectView(View):
 
 
 
+def parse_range(range_header, size):
+    ''' parses a single byte range "bytes=start-end", "bytes=start-" or
+        "bytes=-suffix" of a content of size bytes
+        returns: tuple start and end (inclusive), None if there is no valid single
+                 range, or (None, None) if the range cannot be satisfied
+    '''
+    unit, _, byte_range = range_header.partition('=')
+    if unit.strip() != 'bytes' or ',' in byte_range:
+        return None
+
+    start, sep, end = byte_range.strip().partition('-')
+    if not sep or not (start + end).isdigit():
+        return None
+
+    if not start:
+        start, end = max(size - int(end), 0), size - 1
+
+    else:
+        start, end = int(start), min(int(end), size - 1) if end else size - 1
+
+    if start > end or start >= size:
+        return None, None
+
+    return start, end
+
+
 def download_pdf_workorder(request, project_name):
-    project = Project.objects.get(project_name=project_name)
-    f_pdf = io.BytesIO(project.pdf_work_order)
-    f_pdf.seek(0)
-    # note FileResponse will close the file/ buffer - do not use with block
-    return FileResponse(f_pdf, content_type='application/pdf', as_attachment=False)
+    ''' streams the pdf work order of the project in chunks, a single byte range of
+        the Range header is served as partial content
+    '''
+    project = get_object_or_404(Project, project_name=project_name)
+    if not project.pdf_work_order_id:
+        raise Http404(f'no work order for project {project_name}')
+
+    size = project.pdf_work_order.size
+    byte_range = parse_range(request.headers.get('Range', ''), size)
+    if byte_range == (None, None):
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    start, end = byte_range or (0, size - 1)
+    response = StreamingHttpResponse(
+        Blob.objects.read_chunks(project.pdf_work_order_id, start, end),
+        content_type='application/pdf', status=206 if byte_range else 200)
+    if byte_range:
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+    response['Content-Length'] = str(end - start + 1)
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = f'inline; filename="{project_name}.pdf"'
+    return response
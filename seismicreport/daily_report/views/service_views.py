@@ -1,4 +1,3 @@
-import calendar
 from django.shortcuts import render, redirect
 from django.http import FileResponse
 from django.utils.decorators import method_decorator
@@ -6,13 +5,14 @@ from django.contrib.auth.decorators import login_required
 from django.views.generic import View
 from django.db.utils import IntegrityError
 from  daily_report.models.project_models import Project
-from daily_report.models.service_models import (
-    Service, ServiceTask, TaskQuantity,
-)
+from daily_report.models.service_models import Service, ServiceTask
 from daily_report.models.daily_models import Daily
 from daily_report.forms.service_forms import MonthDaysForm
 from daily_report.report_backend import ReportInterface
 from daily_report.excel_services_backend import ExcelServiceReport
+from daily_report.service_backend import (
+    get_month_dates, get_service_tasks, load_month_quantities, save_month_quantities,
+)
 from seismicreport.vars import NAME_LENGTH, DESCR_LENGTH, RIGHT_ARROW, LEFT_ARROW
 from seismicreport.utils.utils_funcs import date_to_string, string_to_date
 from seismicreport.utils.plogger import Logger
@@ -218,32 +218,34 @@ class MonthlyServiceView(View):
         except Daily.DoesNotExist:
             return redirect('daily_page', daily_id)
 
-        dayrange = range(1, calendar.monthrange(year, month)[1] + 1)
+        dates = get_month_dates(year, month)
         _my = string_to_date('-'.join([str(year), str(month), '1']))
         services = {
             'project': project.project_name,
             'year': _my.strftime('%Y'),
             'month':_my.strftime('%B')
         }
-        for service in project.services.all().order_by('service_contract'):
+        # the quantities of all tasks of the month in a single query
+        service_tasks = get_service_tasks(project, ordered=True)
+        tasks = [task for _, s_tasks in service_tasks for task in s_tasks]
+        quantities = dict(zip(
+            [task.id for task in tasks], load_month_quantities(tasks, year, month)))
+        for service, s_tasks in service_tasks:
             services[service.id] = {}
             services[service.id]['name'] = service.description
             services[service.id]['tasks'] = {}
-            for task in service.tasks.all().order_by('task_name'):
+            for task in s_tasks:
                 services[service.id]['tasks'][task.id] = {}
                 services[service.id]['tasks'][task.id]['name'] = task.task_name
 
-                day_qties = task.get_monthly_task_quantities(year, month)
-                initial = {f'{year}-{month:02}-{day:02}': 0 for day in dayrange}
-                total = 0
-                for dq in day_qties:
-                    total += dq.quantity
-                    initial[f'{year}-{month:02}-{dq.date.day:02}'] = dq.quantity
-
+                day_qties = quantities[task.id].tolist()
+                initial = {
+                    date_to_string(date): qty or 0 for date, qty in zip(dates, day_qties)}
                 services[service.id]['tasks'][task.id]['form_task'] = (
                     self.form_days(year, month, initial=initial, prefix=task.id)
                 )
-                services[service.id]['tasks'][task.id]['total'] = total
+                services[service.id]['tasks'][task.id]['total'] = sum(
+                    qty for qty in day_qties if qty)
 
         context = {
             'daily_id': daily_id,
@@ -283,54 +285,23 @@ class MonthlyServiceView(View):
 
                 redirect('monthly_service_page', daily_id, year, month)
 
-            for task in [task for srv in project.services.all()
-                         for task in srv.tasks.all()]:
-                form_tsk_qts = self.form_days(year, month, request.POST, prefix=task.id)
+            task_quantities = {}
+            for _, s_tasks in get_service_tasks(project):
+                for task in s_tasks:
+                    form_tsk_qts = self.form_days(
+                        year, month, request.POST, prefix=task.id)
 
-                if form_tsk_qts.is_valid():
-                    tsk_qts = form_tsk_qts.cleaned_data
-                    self.update_task_quantity(task, tsk_qts)
+                    if form_tsk_qts.is_valid():
+                        task_quantities[task.id] = {
+                            string_to_date(task_date).date(): qty
+                            for task_date, qty in form_tsk_qts.cleaned_data.items()
+                        }
 
-                else:
-                    continue
+            # all changes are saved in a single transaction
+            save_month_quantities(task_quantities, year, month)
 
         return redirect('monthly_service_page', daily_id, year, month)
 
-    @staticmethod
-    def update_task_quantity(task, task_qts: dict) -> None:
-        for task_date, qty in task_qts.items():
-            # check quantity (float) and date ('YYYY-MM-DD')
-            if qty is None or not isinstance(qty, float) or task_date is None:
-                continue
-
-            if not string_to_date(task_date):
-                continue
-
-            # create/ update TaskQuantity object
-            try:
-                tq = TaskQuantity.objects.get(
-                    task=task,
-                    date=task_date,
-                )
-
-                if abs(float(qty)) < 0.01:
-                    tq.delete()
-
-                else:
-                    tq.quantity = float(qty)
-                    tq.save()
-
-            except TaskQuantity.DoesNotExist:
-                if abs(float(qty)) < 0.01:
-                    continue
-
-                else:
-                    tq = TaskQuantity.objects.create(
-                        task=task,
-                        date=task_date,
-                        quantity=float(qty)
-                    )
-
 
 def services_excel_report(request, daily_id, year, month):
     try:
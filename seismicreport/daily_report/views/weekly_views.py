@@ -5,13 +5,18 @@ from django.utils.decorators import method_decorator
 from django.contrib.auth.decorators import login_required
 from django.views.generic import View
 from daily_report.models.daily_models import Daily
+from daily_report.models.snapshot_models import ReportSnapshot
 from daily_report.forms.weekly_forms import WeeklyForm
 from daily_report.report_backend import ReportInterface
 from daily_report.week_backend import WeekInterface
 from daily_report.excel_weekly_backend import (
     ExcelWeekReport, collate_excel_weekreport_data,
 )
-from seismicreport.vars import AVG_PERIOD, SS_2
+from daily_report.snapshot_backend import (
+    collate_weekly_page_data, enqueue_snapshots, get_snapshot_data,
+    snapshot_file_response,
+)
+from seismicreport.vars import SS_2
 from seismicreport.utils.plogger import Logger
 from seismicreport.utils.get_ip import get_client_ip
 
@@ -24,7 +29,6 @@ class WeeklyView(View):
 
     form_week = WeeklyForm
     template_weekly_page = 'daily_report/weekly_page.html'
-    r_iface = ReportInterface(settings.MEDIA_ROOT)
     w_iface = WeekInterface(settings.MEDIA_ROOT)
 
     def get(self, request, daily_id):
@@ -36,39 +40,14 @@ class WeeklyView(View):
             return redirect('daily_page', daily_id)
 
         week_initial = self.w_iface.get_week_values(day)
-        (
-            _,
-            totals_prod,
-            totals_time,
-            _,
-            totals_hse
-        ) = self.r_iface.calc_totals(day)
-        days, weeks = self.w_iface.collate_weekdata(day)
-
-        if day.project.planned_vp > 0:
-            proj_complete = (
-                (totals_prod['proj_total'] + totals_prod['proj_skips']) /
-                day.project.planned_vp
-            )
-
-        else:
-            proj_complete = 0
-
-        est_complete = self.r_iface.calc_est_completion_date(
-            day, AVG_PERIOD, day.project.planned_vp, proj_complete)
-
-        totals_prod['proj_area'] = day.project.planned_area * proj_complete
-        totals_prod['proj_complete'] = proj_complete
-        totals_prod['est_complete'] = est_complete
+        weekly_data = get_snapshot_data(day, ReportSnapshot.WEEKLY_PAGE)
+        if weekly_data is None:
+            weekly_data = collate_weekly_page_data(day)
 
         context = {
             'daily_id': daily_id,
             'SS_2': SS_2,
-            'totals_prod': totals_prod,
-            'totals_time': totals_time,
-            'totals_hse': totals_hse,
-            'days': days,
-            'weeks': weeks,
+            **weekly_data,
             'form_week': self.form_week(initial=week_initial),
         }
 
@@ -102,6 +81,8 @@ class WeeklyView(View):
             elif button_pressed == 'delete':
                 self.w_iface.delete_week_report(day)
 
+            enqueue_snapshots(day)
+
         return redirect('weekly_page', daily_id)
 
 
@@ -118,6 +99,11 @@ def csr_week_excel_report(request, daily_id):
     except Daily.DoesNotExist:
         return redirect('daily_page', 0)
 
+    response = snapshot_file_response(
+        day, ReportSnapshot.WEEK_EXCEL, 'csr_week_report.xlsx')
+    if response is not None:
+        return response
+
     report_data = collate_excel_weekreport_data(day)
     csr_week_report = ExcelWeekReport(
         report_data, settings.MEDIA_ROOT, settings.STATIC_ROOT)
@@ -3,14 +3,19 @@
 from datetime import timedelta
 import numpy as np
 from django.core.exceptions import ObjectDoesNotExist
-from daily_report.models.daily_models import Person, Daily
+from daily_report.models.daily_models import (
+    Person, Daily, SourceProduction, ReceiverProduction, TimeBreakdown,
+)
 from daily_report.models.weekly_models import Weekly
 from daily_report.report_backend import ReportInterface
-from seismicreport.vars import WEEKDAYS, WEEKS
+from seismicreport.vars import (
+    WEEKDAYS, WEEKS, source_prod_schema, receiver_prod_schema, time_breakdown_schema,
+)
 from seismicreport.utils.plogger import timed, Logger
 
 
 logger = Logger.getlogger()
+rcvr_sum_keys = [key for key in receiver_prod_schema if key != 'qc_field']
 
 
 class WeekInterface:
@@ -88,28 +93,160 @@ class WeekInterface:
         week.delete()
 
 
+    @staticmethod
+    def load_window(report_day):
+        ''' loads the production, time breakdown and receiver data of the WEEKS weeks
+            up to and including the report day as arrays indexed by the day number
+            in the window
+        '''
+        project = report_day.project
+        window_days = WEEKS * WEEKDAYS
+        start_date = report_day.production_date - timedelta(days=window_days-1)
+        date_filter = {
+            'daily__project': project,
+            'daily__production_date__gte': start_date,
+            'daily__production_date__lte': report_day.production_date,
+        }
+
+        def day_index(production_date):
+            return (production_date - start_date).days
+
+        def new_arrays(keys, dtype):
+            arrays = {key: np.zeros(window_days, dtype=dtype) for key in keys}
+            arrays['count'] = np.zeros(window_days, dtype=int)
+            return arrays
+
+        window = {
+            'start_date': start_date,
+            'dailies': {
+                daily.production_date: daily for daily in Daily.objects.filter(
+                    project=project, production_date__gte=start_date,
+                    production_date__lte=report_day.production_date,
+                ).select_related('project')
+            },
+            'sourcetypes': list(project.sourcetypes.all()),
+            'receivertype': project.receivertypes.first(),
+            'source': {},
+            'time': new_arrays(time_breakdown_schema, float),
+            'receiver': new_arrays(
+                rcvr_sum_keys + ['qc_sum', 'qc_values', 'qc_count'], int),
+        }
+        window['receiver']['qc_sum'] = np.zeros(window_days)
+
+        for row in SourceProduction.objects.filter(**date_filter).values(
+                'daily__production_date', 'sourcetype_id', *source_prod_schema):
+            arrays = window['source'].setdefault(
+                row['sourcetype_id'], new_arrays(source_prod_schema, int))
+            i = day_index(row['daily__production_date'])
+            arrays['count'][i] += 1
+            for key in source_prod_schema:
+                arrays[key][i] += row[key]
+
+        for row in TimeBreakdown.objects.filter(**date_filter).values(
+                'daily__production_date', *time_breakdown_schema):
+            i = day_index(row['daily__production_date'])
+            window['time']['count'][i] += 1
+            for key in time_breakdown_schema:
+                window['time'][key][i] += row[key]
+
+        for row in ReceiverProduction.objects.filter(
+                receivertype=window['receivertype'], **date_filter).values(
+                    'daily__production_date', *receiver_prod_schema):
+            i = day_index(row['daily__production_date'])
+            window['receiver']['count'][i] += 1
+            for key in rcvr_sum_keys:
+                window['receiver'][key][i] += row[key]
+
+            # qc field is averaged over days with a value other than zero
+            if row['qc_field'] is not None:
+                window['receiver']['qc_sum'][i] += row['qc_field']
+                window['receiver']['qc_values'][i] += 1
+
+            if row['qc_field']:
+                window['receiver']['qc_count'][i] += 1
+
+        return window
+
+    def calc_window_totals(self, window, report_date, period):
+        ''' calculates the production, time breakdown and receiver totals for the
+            period (day or week) ending on the report date from the window arrays.
+            If there is no daily report on the report date, the totals are empty.
+            returns: production, time breakdown and receiver totals for the period
+        '''
+        def period_keys(totals):
+            return {key: val for key, val in totals.items()
+                    if key.startswith(f'{period}_')}
+
+        def window_row(arrays, keys):
+            row = {f'{period}_count': np.sum(arrays['count'][start:end])}
+            for key in keys:
+                row[f'{period}_{key}'] = np.sum(arrays[key][start:end])
+
+            return row
+
+        day = window['dailies'].get(report_date)
+        receivertype = window['receivertype'] if day else None
+        end = (report_date - window['start_date']).days + 1
+        start = end - (1 if period == 'day' else WEEKDAYS)
+
+        time_row = window_row(window['time'], time_breakdown_schema) if day else {}
+        times_total = self.rprt_iface.aggregate_time_totals(day, row=time_row)
+
+        rcvr_row = {}
+        if day:
+            rcvr_row = window_row(window['receiver'], rcvr_sum_keys)
+            qc_sum = np.sum(window['receiver']['qc_sum'][start:end])
+            qc_values = np.sum(window['receiver']['qc_values'][start:end])
+            if period == 'day':
+                rcvr_row['day_qc_field'] = qc_sum if qc_values > 0 else None
+
+            else:
+                qc_count = np.sum(window['receiver']['qc_count'][start:end])
+                rcvr_row[f'{period}_qc_field'] = (
+                    qc_sum / qc_count if qc_count > 0 else None)
+
+        rcvr_total = self.rprt_iface.aggregate_receiver_totals(
+            day, receivertype, row=rcvr_row)
+
+        if day:
+            prod_total_by_type = self.rprt_iface.aggregate_prod_totals(
+                day, window['sourcetypes'], rows={
+                    stype_id: window_row(arrays, source_prod_schema)
+                    for stype_id, arrays in window['source'].items()
+                })
+            for stype in window['sourcetypes']:
+                prod_total_by_type[stype.sourcetype_name] = (
+                    self.rprt_iface.calc_period_totals(
+                        day, stype, times_total,
+                        prod_total_by_type[stype.sourcetype_name], periods=[period]
+                    ))
+
+            prod_total = self.rprt_iface.calc_combined_production(
+                day, times_total, prod_total_by_type, periods=[period])
+
+        else:
+            prod_total = {f'{period}_{key[:5]}': np.nan for key in source_prod_schema}
+            prod_total[f'{period}_total'] = np.nan
+
+        return period_keys(prod_total), period_keys(times_total), period_keys(rcvr_total)
+
     @timed(logger, print_log=True)
     def collate_weekdata(self, report_day):
+        ''' collates the production, time breakdown and receiver totals for the days
+            of the week and the weeks before the report day. The data of all weeks is
+            loaded once and the totals are summed from the window arrays
+        '''
+        window = self.load_window(report_day)
 
         # get the production figures for the days in the week
         days = {}
-        project = report_day.project
         start_date = report_day.production_date - timedelta(days=WEEKDAYS-1)
         for wd in reversed(range(0, WEEKDAYS)):
             report_date = start_date + timedelta(days=wd)
             days[wd] = {}
             days[wd]['date'] = report_date
-            try:
-                day = Daily.objects.get(project=project, production_date=report_date)
-            except Daily.DoesNotExist:
-                day = None
-            (
-                _,
-                days[wd]['prod'],
-                days[wd]['times'],
-                days[wd]['rcvr'],
-                _
-            ) = self.rprt_iface.calc_totals(day)
+            days[wd]['prod'], days[wd]['times'], days[wd]['rcvr'] = (
+                self.calc_window_totals(window, report_date, 'day'))
 
             try:
                 days[wd]['prod']['day_vp_hour'] = (round(
@@ -119,26 +256,16 @@ class WeekInterface:
             except (ValueError, KeyError):
                 days[wd]['prod']['day_vp_hour'] = np.nan
 
-        # get the weekly production figures for the 6 weeks before
+        # get the weekly production figures for the 6 weeks before, a week is
+        # skipped if there is no report on the last day of the week
         weeks = {}
         start_date = report_day.production_date - timedelta(days=(WEEKS-1)*WEEKDAYS)
         for wk in range(0, WEEKS):
             report_date = start_date + timedelta(days=WEEKDAYS*wk)
             weeks[wk] = {}
             weeks[wk]['dates'] = (report_date - timedelta(days=(WEEKDAYS-1)), report_date)
-            try:
-                day = Daily.objects.get(project=project, production_date=report_date)
-            except Daily.DoesNotExist:
-                # skip this week
-                day = None
-
-            (
-                _,
-                weeks[wk]['prod'],
-                weeks[wk]['times'],
-                weeks[wk]['rcvr'],
-                _
-            ) = self.rprt_iface.calc_totals(day)
+            weeks[wk]['prod'], weeks[wk]['times'], weeks[wk]['rcvr'] = (
+                self.calc_window_totals(window, report_date, 'week'))
 
             try:
                 weeks[wk]['prod']['week_vp_hour'] = (round(
@@ -52,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # outermost, to count the queries of all other middleware
+    'seismicreport.utils.metrics.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -117,6 +119,31 @@ USE_TZ = True
 # Media files
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(os.path.dirname(BASE_DIR), 'media')
+# maximum size in bytes of the graphs cache in MEDIA_ROOT/images/graphs
+GRAPH_CACHE_SIZE = config('GRAPH_CACHE_SIZE', default=100_000_000, cast=int)
+# number of processes to render the graphs and for the management command
+# import_reports to read a batch of daily reports
+GRAPH_WORKERS = config('GRAPH_WORKERS', default=4, cast=int)
+IMPORT_WORKERS = config('IMPORT_WORKERS', default=4, cast=int)
+# number of processes of the report worker to create the queued excel reports
+REPORT_WORKERS = config('REPORT_WORKERS', default=2, cast=int)
+# seconds an unused blob is kept after it is stored, before it can be deleted
+BLOB_GRACE_PERIOD = config('BLOB_GRACE_PERIOD', default=3600, cast=int)
+# maximum number and total extracted bytes of the workbooks in an imported zip file
+IMPORT_ZIP_MAX_FILES = config('IMPORT_ZIP_MAX_FILES', default=1000, cast=int)
+IMPORT_ZIP_MAX_SIZE = config('IMPORT_ZIP_MAX_SIZE', default=500_000_000, cast=int)
+
+# cache for the calculated report totals, a file based cache shares the totals between
+# the processes of the web server
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='seismicreport'),
+    }
+}
+# seconds the report totals are kept in the cache
+TOTALS_CACHE_TIMEOUT = config('TOTALS_CACHE_TIMEOUT', default=3600, cast=int)
 
 
 # Static files (CSS, JavaScript, Images)
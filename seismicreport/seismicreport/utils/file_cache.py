@@ -0,0 +1,119 @@
+''' size bounded on-disk cache of files keyed by a content hash, the least
+    recently used files are removed when the cache exceeds its maximum size
+'''
+import os
+import hashlib
+import tempfile
+from datetime import date
+from pathlib import Path
+import numpy as np
+
+
+def update_hash(hasher, obj):
+    ''' updates hasher with the contents of obj, which can be a (nested) dict, list or
+        tuple of numpy arrays, dates, strings and numbers. Numpy arrays are hashed
+        by their bytes as repr truncates large arrays
+    '''
+    if isinstance(obj, dict):
+        for key, val in obj.items():
+            update_hash(hasher, key)
+            update_hash(hasher, val)
+
+    elif isinstance(obj, (list, tuple)):
+        hasher.update(f'{type(obj).__name__}:{len(obj)}'.encode())
+        for val in obj:
+            update_hash(hasher, val)
+
+    elif isinstance(obj, np.ndarray):
+        if obj.dtype == object:
+            update_hash(hasher, obj.tolist())
+
+        else:
+            hasher.update(f'{obj.dtype}:{obj.shape}'.encode())
+            hasher.update(np.ascontiguousarray(obj).tobytes())
+
+    elif isinstance(obj, date):
+        hasher.update(obj.isoformat().encode())
+
+    else:
+        hasher.update(repr(obj).encode())
+
+
+def content_hash(*objs):
+    hasher = hashlib.sha1()
+    for obj in objs:
+        update_hash(hasher, obj)
+
+    return hasher.hexdigest()
+
+
+class FileCache:
+
+    def __init__(self, cache_dir, max_size, suffix=''):
+        self.cache_dir = Path(cache_dir)
+        self.max_size = max_size
+        self.suffix = suffix
+
+    def path(self, key):
+        return self.cache_dir / f'{key}{self.suffix}'
+
+    def get(self, key):
+        ''' returns: path of the cached file or None if not in the cache, the access
+            time of the file is updated for the least recently used eviction
+        '''
+        path = self.path(key)
+        try:
+            os.utime(path)
+
+        except FileNotFoundError:
+            return None
+
+        return path
+
+    def put(self, key, data: bytes):
+        ''' stores data in the cache, the file is written to a temporary file first
+            so that other processes never read a partial file
+            returns: path of the cached file
+        '''
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.path(key)
+        fd, tmp_name = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as tmp_file:
+            tmp_file.write(data)
+
+        # mkstemp creates the file only readable for the owner
+        os.chmod(tmp_name, 0o644)
+        os.replace(tmp_name, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep=None):
+        ''' removes the least recently used files, except file keep, until the size of
+            the cache is within its maximum size
+        '''
+        files = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                try:
+                    stat = entry.stat()
+
+                except FileNotFoundError:
+                    continue
+
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        cache_size = sum(size for _, size, _ in files)
+        for _, size, file_path in sorted(files):
+            if cache_size <= self.max_size:
+                break
+
+            if keep and file_path == str(keep):
+                continue
+
+            try:
+                os.remove(file_path)
+
+            except FileNotFoundError:
+                pass
+
+            cache_size -= size
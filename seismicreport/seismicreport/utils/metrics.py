@@ -0,0 +1,201 @@
+'''  metrics is a module to instrument requests and the functions decorated with
+     plogger.timed
+
+     span - context manager that times a block of code as a named span
+     MetricsMiddleware - collects the number and time of the sql queries and the
+                         nested spans of each request
+     metrics - in memory store of the rolling durations by span name, with their
+               percentiles and the recent requests
+
+     The store is in the memory of the process, so it only has the requests and
+     spans of its own process: with several web server workers each has its own
+     metrics, and the spans of the functions run in the process pools of the
+     graphs, the imports and the report worker are kept in the pool processes
+     and never seen. Spans of functions run in threads of the process are kept in
+     the percentiles, but are not nested under the request, as the request is only
+     known in its own thread.
+'''
+from collections import deque
+from contextvars import ContextVar
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import threading
+import time
+import numpy as np
+
+# number of durations kept per span name for the percentiles
+SPAN_WINDOW = 1000
+# number of recent requests kept with their spans
+RECENT_REQUESTS = 50
+PERCENTILES = (50, 95, 99)
+
+_current_request = ContextVar('current_request', default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    depth: int
+    duration: float = 0.0
+    sql_count: int = 0
+    sql_time: float = 0.0
+
+
+@dataclass
+class RequestRecord:
+    path: str
+    method: str
+    status: int = 0
+    duration: float = 0.0
+    sql_count: int = 0
+    sql_time: float = 0.0
+    depth: int = 0
+    spans: list = field(default_factory=list)
+
+
+class Metrics:
+    ''' thread safe store of the durations by span name and of the recent requests
+    '''
+    def __init__(self, window=SPAN_WINDOW, recent_requests=RECENT_REQUESTS):
+        self.window = window
+        self.lock = threading.Lock()
+        self.durations = {}
+        self.counts = {}
+        self.sums = {}
+        self.requests = deque(maxlen=recent_requests)
+
+    def record(self, name, duration):
+        with self.lock:
+            self.durations.setdefault(name, deque(maxlen=self.window)).append(duration)
+            self.counts[name] = self.counts.get(name, 0) + 1
+            self.sums[name] = self.sums.get(name, 0.0) + duration
+
+    def record_request(self, request_record):
+        with self.lock:
+            self.requests.append(request_record)
+
+    def summary(self):
+        ''' returns: dict by span name of the total count and sum of the durations
+                     and the percentiles of the durations in the rolling window
+        '''
+        with self.lock:
+            durations = {name: list(values) for name, values in self.durations.items()}
+            counts = dict(self.counts)
+            sums = dict(self.sums)
+
+        summary = {}
+        for name in sorted(durations):
+            quantiles = np.percentile(durations[name], PERCENTILES)
+            summary[name] = {
+                'count': counts[name],
+                'sum': sums[name],
+                **{f'p{p}': float(q) for p, q in zip(PERCENTILES, quantiles)},
+            }
+
+        return summary
+
+    def recent_requests(self):
+        with self.lock:
+            return list(reversed(self.requests))
+
+    def reset(self):
+        with self.lock:
+            self.durations.clear()
+            self.counts.clear()
+            self.sums.clear()
+            self.requests.clear()
+
+    def prometheus_text(self):
+        ''' returns: the span durations in the Prometheus text exposition format
+        '''
+        lines = [
+            '# HELP seismicreport_span_seconds duration of the timed functions and '
+            'requests of this process',
+            '# TYPE seismicreport_span_seconds summary',
+        ]
+        for name, values in self.summary().items():
+            label = name.replace('\\', '\\\\').replace('"', '\\"')
+            for p in PERCENTILES:
+                lines.append(
+                    f'seismicreport_span_seconds{{span="{label}",quantile="{p / 100}"}} '
+                    f'{values[f"p{p}"]:.6f}')
+
+            lines.append(f'seismicreport_span_seconds_sum{{span="{label}"}} '
+                         f'{values["sum"]:.6f}')
+            lines.append(f'seismicreport_span_seconds_count{{span="{label}"}} '
+                         f'{values["count"]}')
+
+        return '\n'.join(lines) + '\n'
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def span(name):
+    ''' times the block as span name, nested under the current request if any
+    '''
+    request_record = _current_request.get()
+    if request_record is None:
+        start = time.perf_counter()
+        try:
+            yield
+
+        finally:
+            metrics.record(name, time.perf_counter() - start)
+
+        return
+
+    record = Span(name=name, depth=request_record.depth)
+    request_record.spans.append(record)
+    request_record.depth += 1
+    sql_count, sql_time = request_record.sql_count, request_record.sql_time
+    start = time.perf_counter()
+    try:
+        yield
+
+    finally:
+        record.duration = time.perf_counter() - start
+        record.sql_count = request_record.sql_count - sql_count
+        record.sql_time = request_record.sql_time - sql_time
+        request_record.depth -= 1
+        metrics.record(name, record.duration)
+
+
+class MetricsMiddleware:
+    ''' collects the sql queries and the spans of each request, the request itself
+        is recorded as span "request <url name>"
+    '''
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        from django.db import connection
+
+        request_record = RequestRecord(path=request.path, method=request.method)
+
+        def count_queries(execute, sql, params, many, context):
+            start = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+
+            finally:
+                request_record.sql_count += 1
+                request_record.sql_time += time.perf_counter() - start
+
+        token = _current_request.set(request_record)
+        start = time.perf_counter()
+        try:
+            with connection.execute_wrapper(count_queries):
+                response = self.get_response(request)
+
+        finally:
+            request_record.duration = time.perf_counter() - start
+            _current_request.reset(token)
+
+        request_record.status = response.status_code
+        match = getattr(request, 'resolver_match', None)
+        url_name = match.url_name if match and match.url_name else 'unresolved'
+        metrics.record(f'request {url_name}', request_record.duration)
+        metrics.record_request(request_record)
+        return response
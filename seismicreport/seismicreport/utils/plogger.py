@@ -1,10 +1,12 @@
 from functools import wraps
 import logging
 import time
+from seismicreport.utils.metrics import span
 '''  plogger is a module with logging tools which can be either called directly
      or to be used as decorators
 
-     timed - logs the time duration of a decorated function
+     timed - logs the time duration of a decorated function and records it as a
+             span in seismicreport.utils.metrics
      func_args - logs the arguments (*args, **kwargs) and results of a
                  decorated function
 
@@ -62,7 +64,8 @@ def timed(func, logger, print_log=False):
     @wraps(func)
     def wrapper(*args, **kwargs):
         start = time.time()
-        result = func(*args, **kwargs)
+        with span(func.__name__):
+            result = func(*args, **kwargs)
         end = time.time()
         log_str = f'==> {func.__name__} ran in {round(end - start, 3)} s'
         logger.info(log_str)
@@ -1,59 +1,50 @@
 
 ''' module with utilities for excel
 '''
-import io
-import re
-from openpyxl.styles import Border, Side, PatternFill
+import tempfile
+from functools import lru_cache
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, Side, PatternFill
 from openpyxl.utils.cell import get_column_letter, column_index_from_string
 from openpyxl.formatting.rule import CellIsRule
 
-
-def set_vertical_cells(ws, loc_init: str, values: list, font, alignment):
-    # loc_init: format "A0" multiple capital letters followd by multiple numbers
-    loc = re.match(r'^([A-Z]+)([0-9]+)$', loc_init)
-    row_init = int(loc.group(2))
-    col_init = loc.group(1)
-    for i, value in enumerate(values):
-        loc = col_init + str(row_init + i)
-        cell = ws[loc]
-        cell.value = value
-        cell.font = font
-        cell.alignment = alignment
-
-
-def set_horizontal_cells(ws, loc_init: str, values: list, font, alignment):
-    # loc_init: format "A0" multiple capital letters followd by multiple numbers
-    loc = re.match(r'^([A-Z]+)([0-9]+)$', loc_init)
-    row_init = int(loc.group(2))
-    col_init_num = column_index_from_string(loc.group(1))
-    for i, value in enumerate(values):
-        loc = get_column_letter(col_init_num + i) + str(row_init)
-        cell = ws[loc]
-        cell.value = value
-        cell.font = font
-        cell.alignment = alignment
-
-
-def format_vertical(ws, loc_range: str, num_format: str):
-    # loc_range: format "A10:D10" multiple capital letters followd by multiple numbers
-    loc = re.match(r'^([A-Z]+)([0-9]+):([A-Z]+)([0-9]+)$', loc_range)
-    row_start_num = int(loc.group(2))
-    row_end_num = int(loc.group(4))
-    col_init = loc.group(1)
-    for row in range(row_start_num, row_end_num + 1):
-        loc = col_init + str(row)
-        ws[loc].number_format = num_format
-
-
-def format_horizontal(ws, loc_range: str, num_format: str):
-    # loc_range: format "A10:D10" multiple capital letters followd by multiple numbers
-    loc = re.match(r'^([A-Z]+)([0-9]+):([A-Z]+)([0-9]+)$', loc_range)
-    row_init = int(loc.group(2))
-    col_start_num = column_index_from_string(loc.group(1))
-    col_end_num = column_index_from_string(loc.group(3))
-    for col in range(col_start_num, col_end_num + 1):
-        loc = get_column_letter(col) + str(row_init)
-        ws[loc].number_format = num_format
+EXCEL_SPOOL_SIZE = 2 * 1024 * 1024
+
+fontname = 'Tahoma'
+font_large_bold = Font(name=fontname, bold=True, size=11)
+font_large_bold_red = Font(name=fontname, bold=True, size=11, color='00FF0000')
+font_normal = Font(name=fontname, size=9)
+font_bold = Font(name=fontname, bold=True, size=9)
+lightblue = 'D8EFF8'
+fill_lightblue = PatternFill(
+    start_color=lightblue, end_color=lightblue, fill_type='solid')
+align_header = Alignment(horizontal='center', vertical='top', wrap_text=True)
+
+# named styles of the excel reports, registered once for each workbook with
+# register_styles. Cells refer to a named style by name, instead of each cell
+# adding its own font and alignment to the styles of the workbook.
+report_styles = {
+    'title': {'font': font_large_bold},
+    'title_center': {
+        'font': font_large_bold, 'alignment': Alignment(horizontal='center')},
+    'title_right': {
+        'font': font_large_bold, 'alignment': Alignment(horizontal='right')},
+    'title_red': {'font': font_large_bold_red},
+    'bold': {'font': font_bold},
+    'bold_left': {'font': font_bold, 'alignment': Alignment(horizontal='left')},
+    'bold_right': {'font': font_bold, 'alignment': Alignment(horizontal='right')},
+    'bold_center': {'font': font_bold, 'alignment': Alignment(horizontal='center')},
+    'bold_header': {'font': font_bold, 'alignment': align_header},
+    'bold_header_fill': {
+        'font': font_bold, 'alignment': align_header, 'fill': fill_lightblue},
+    'bold_fill': {'font': font_bold, 'fill': fill_lightblue},
+    'normal': {'font': font_normal},
+    'normal_left': {'font': font_normal, 'alignment': Alignment(horizontal='left')},
+    'normal_right': {'font': font_normal, 'alignment': Alignment(horizontal='right')},
+    'normal_center': {'font': font_normal, 'alignment': Alignment(horizontal='center')},
+    'normal_wrap': {
+        'font': font_normal, 'alignment': Alignment(vertical='top', wrap_text=True)},
+}
 
 
 def conditional_format(ws, cell_loc: str, format_vals: tuple, colors: tuple):
@@ -81,59 +72,165 @@ def conditional_format(ws, cell_loc: str, format_vals: tuple, colors: tuple):
                 formula=[format_vals[1]], fill=PatternFill(bgColor=colors[2])))
 
 
-def set_outer_border(ws, cell_range, style='thin'):
-    cells =ws[cell_range]
-    row = None
-    for i, row in enumerate(cells):
-        if i == 0:
-            for col in row:
-                col.border = col.border + Border(top=Side(style=style))
+def set_column_widths(ws, start_column: str, widths: list):
+    col_num = column_index_from_string(start_column)
+    for width in widths:
+        loc = get_column_letter(col_num)
+        ws.column_dimensions[loc].width = width
+        col_num += 1
+
 
-        row[0].border = row[0].border + Border(left=Side(style=style))
-        row[-1].border = row[-1].border + Border(right=Side(style=style))
+def register_styles(wb):
+    ''' registers the named styles of report_styles with the workbook, a named style
+        is bound to a workbook so new style objects are created for each workbook
+    '''
+    for name, attributes in report_styles.items():
+        if name not in wb.named_styles:
+            wb.add_named_style(NamedStyle(name=name, **attributes))
 
-    for col in row:
-        col.border = col.border + Border(bottom=Side(style=style))
 
+@lru_cache(maxsize=None)
+def get_fill(color):
+    return PatternFill(start_color=color, end_color=color, fill_type='solid')
 
-def set_border(ws, cell_range, style='thin'):
-    border = Border(
-        left=Side(border_style=style), right=Side(border_style='thin'),
-        top=Side(border_style='thin'), bottom=Side(border_style='thin'),
+
+@lru_cache(maxsize=None)
+def get_border(left=None, right=None, top=None, bottom=None):
+    ''' returns: border with the style of each side (None for no side), the same
+                 border object is returned for the same sides
+    '''
+    return Border(
+        left=Side(style=left), right=Side(style=right), top=Side(style=top),
+        bottom=Side(style=bottom),
     )
-    rows = ws[cell_range]
-    for row in  rows:
-        for cell in row:
+
+
+def get_border_sides(border):
+    ''' returns: dict with the style of the left, right, top and bottom side
+    '''
+    sides = {}
+    for name in ['left', 'right', 'top', 'bottom']:
+        side = getattr(border, name)
+        sides[name] = side.style if side else None
+
+    return sides
+
+
+def set_row(ws, row, col, values, style, number_format=None):
+    ''' sets values in row from column col onwards with a named style of
+        report_styles and optionally a number format
+    '''
+    for c, value in enumerate(values, col):
+        cell = ws.cell(row=row, column=c, value=value)
+        cell.style = style
+        if number_format:
+            cell.number_format = number_format
+
+
+def set_column(ws, row, col, values, style, number_format=None):
+    ''' sets values in column col from row onwards with a named style of
+        report_styles and optionally a number format
+    '''
+    for r, value in enumerate(values, row):
+        cell = ws.cell(row=r, column=col, value=value)
+        cell.style = style
+        if number_format:
+            cell.number_format = number_format
+
+
+def format_range(ws, min_row, min_col, max_row, max_col, number_format=None,
+                 style=None, fill=None):
+    ''' sets a named style, number format and/or fill color of the cells in the
+        range, the named style is set first as it replaces the format and fill
+    '''
+    for cells in ws.iter_rows(
+            min_row=min_row, min_col=min_col, max_row=max_row, max_col=max_col):
+        for cell in cells:
+            if style:
+                cell.style = style
+
+            if number_format:
+                cell.number_format = number_format
+
+            if fill:
+                cell.fill = get_fill(fill)
+
+
+def set_border_range(ws, min_row, min_col, max_row, max_col, style='thin'):
+    ''' sets a border on all sides of the cells in the range
+    '''
+    border = get_border(style, style, style, style)
+    for cells in ws.iter_rows(
+            min_row=min_row, min_col=min_col, max_row=max_row, max_col=max_col):
+        for cell in cells:
             cell.border = border
 
 
-def set_color(ws, cell_range, color=None):
-    color_fill = PatternFill(start_color=color, end_color=color, fill_type='solid')
-    rows = ws[cell_range]
-    for row in rows:
-        for cell in row:
-            cell.fill = color_fill
+def set_outer_border_range(ws, min_row, min_col, max_row, max_col, style='thin'):
+    ''' sets an outer border around the range, the other sides of the borders of
+        the cells on the outline are kept
+    '''
+    for r in range(min_row, max_row + 1):
+        for c in range(min_col, max_col + 1):
+            edges = {
+                'left': c == min_col, 'right': c == max_col,
+                'top': r == min_row, 'bottom': r == max_row,
+            }
+            if not any(edges.values()):
+                continue
+
+            cell = ws.cell(row=r, column=c)
+            sides = get_border_sides(cell.border)
+            for name, is_edge in edges.items():
+                if is_edge:
+                    sides[name] = style
+
+            cell.border = get_border(**sides)
+
+
+def styled_cell(ws, value, style, number_format=None):
+    ''' returns: cell for a write only worksheet with a named style of report_styles
+                 and optionally a number format
+    '''
+    cell = WriteOnlyCell(ws, value=value)
+    cell.style = style
+    if number_format:
+        cell.number_format = number_format
 
+    return cell
 
-def set_column_widths(ws, start_column: str, widths: list):
-    col_num = column_index_from_string(start_column)
-    for width in widths:
-        loc = get_column_letter(col_num)
-        ws.column_dimensions[loc].width = width
-        col_num += 1
+
+def set_outer_border_rows(ws, rows, n_cols, style='thin'):
+    ''' sets an outer border around a block of rows for a write only worksheet.
+        The rows are padded to n_cols and values on the border are replaced by
+        cells with the border.
+        returns: the rows
+    '''
+    for i, row in enumerate(rows):
+        row.extend([None] * (n_cols - len(row)))
+        top, bottom = i == 0, i == len(rows) - 1
+        for c in range(n_cols):
+            left, right = c == 0, c == n_cols - 1
+            if not (top or bottom or left or right):
+                continue
+
+            cell = row[c]
+            if not isinstance(cell, Cell):
+                cell = WriteOnlyCell(ws, value=cell)
+
+            cell.border = get_border(*[
+                style if is_edge else None for is_edge in [left, right, top, bottom]])
+            row[c] = cell
+
+    return rows
 
 
 def save_excel(wb):
-    ''' method to save excel data to a BytesIO buffer
+    ''' method to save excel data to a spooled temporary file, which is kept in
+        memory up to EXCEL_SPOOL_SIZE bytes and otherwise written to disk. The
+        file is closed by the FileResponse that streams it.
     '''
-    f_excel = io.BytesIO()
+    f_excel = tempfile.SpooledTemporaryFile(max_size=EXCEL_SPOOL_SIZE)
     wb.save(f_excel)
     f_excel.seek(0)
     return f_excel
-
-
-def get_row_column(colrow: str):
-    loc = re.match(r'^([A-Z]+)([0-9]+)$', colrow)
-    row = int(loc.group(2))
-    col = loc.group(1)
-    return row, col
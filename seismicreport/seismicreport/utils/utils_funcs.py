@@ -39,6 +39,15 @@ def calc_ratio(a, b):
     else:
         return a / b
 
+
+def calc_ratio_array(a, b):
+    ''' calculates element wise ratio a/b, gives np.nan where b is zero
+    '''
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return np.where(b == 0, np.nan, a / b)
+
 def calc_avg(a, b):
     if np.isnan(a) or np.isnan(b) or b == 0:
         return np.nan